@@ -75,7 +75,12 @@ def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now):
     }
 
 
-def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now):
+def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now,
+                         min_score=4, conviction_score=7, floor_tolerance=0.002):
+    """
+    Threshold & toleransi bisa di-override (mis. oleh backtest_engine / optimizer);
+    default = nilai live.
+    """
     q_score = quantum_res.get('total', 0)
 
     # Ambil Level dari Engine
@@ -101,8 +106,8 @@ def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now):
     plan = {"entry": 0, "sl": 0, "tp1": 0, "tp2": 0}
 
     # --- LOGIKA BULLISH (BUY) ---
-    if q_score >= 4:
-        judgement = "HIGH CONVICTION BUY" if q_score >= 7 else "BULLISH BIAS"
+    if q_score >= min_score:
+        judgement = "HIGH CONVICTION BUY" if q_score >= conviction_score else "BULLISH BIAS"
         color = "#00ffcc"
 
         # ENTRY: Pilih yang paling rasional antara FVG Mid atau Golden Ratio
@@ -120,8 +125,8 @@ def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now):
         action = "Institutions are loading. Set buy limits at the gap."
 
     # --- LOGIKA BEARISH (SELL) ---
-    elif q_score <= -4:
-        judgement = "HIGH CONVICTION SELL" if q_score <= -7 else "BEARISH BIAS"
+    elif q_score <= -min_score:
+        judgement = "HIGH CONVICTION SELL" if q_score <= -conviction_score else "BEARISH BIAS"
         color = "#ff4b4b"
 
         plan['entry'] = unfilled_bear[0]['mid'] if unfilled_bear else golden
@@ -144,11 +149,11 @@ def generate_ai_judgment(quantum_res, fib_data, smc_zones, p_now):
 
     return {
         "judgement": judgement,
-        "confidence": 90 if (q_score >= 7 and abs(p_now - golden) / golden < 0.002) else 50,
+        "confidence": 90 if (q_score >= conviction_score and abs(p_now - golden) / golden < floor_tolerance) else 50,
         "color": color,
         "action": action,
         "q_val": q_score,
         "plan": plan,
         "smc_logic": smc_desc,
-        "is_floor": abs(p_now - golden) / golden < 0.002 if golden > 0 else False
+        "is_floor": abs(p_now - golden) / golden < floor_tolerance if golden > 0 else False
     }
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Alert Daemon: service headless untuk sinyal Telegram & heartbeat harian.
+Evaluasi pipeline untuk watchlist dengan jadwal sendiri (tidak butuh tab
+browser terbuka), state dedupe disimpan ke disk supaya restart / banyak
+viewer tidak bikin double-send. Dashboard cukup jadi viewer.
+
+Jalankan dari root repo: python alert_daemon.py [--once] [--interval 60]
+Kredensial: env TELEGRAM_TOKEN & TELEGRAM_CHAT_ID, fallback .streamlit/secrets.toml.
+Watchlist: env HAITERM_WATCHLIST / HAITERM_ALERT_TFS (dipisah koma), default semua asset & timeframe.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytz
+
+from alert_dispatcher import REJECTED, SENT, alert_dispatcher, escape_markdown
+from data_provider import fetch_forex_data, fetch_macro_data, get_forex_list, get_news_digest
+from mtf_builder import BASE_INTERVAL, TIMEFRAMES
+from pipeline import run_analysis
+from telemetry import telemetry
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".haiterm_cache")
+STATE_PATH = os.environ.get("HAITERM_ALERT_STATE", os.path.join(CACHE_DIR, "alert_state.json"))
+LOCK_PATH = STATE_PATH + ".lock"
+
+ALERT_INTERVAL = 60            # detik antar evaluasi watchlist
+SIGNAL_MIN_SCORE = 6           # trigger sama seperti dulu di main.py: |skor| >= 6 + area Golden
+HEARTBEAT_HOUR = 22            # 22:00 WIB
+STATE_RETENTION = 7 * 86400    # key dedupe lebih tua dari ini dibuang
+MAX_DELIVERY_ATTEMPTS = 3      # gagal sementara (5xx, timeout, 429) sebanyak ini -> alert di-park
+
+TZ_JKT = pytz.timezone('Asia/Jakarta')
+
+
+# --- 1. CONFIG ---
+def get_telegram_credentials():
+    """(token, chat_id) dari env, fallback ke st.secrets. None kalau tidak ada."""
+    token = os.environ.get("TELEGRAM_TOKEN")
+    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
+    if token and chat_id:
+        return token, chat_id
+    try:
+        import streamlit as st
+
+        return st.secrets["telegram_token"], st.secrets["telegram_chat_id"]
+    except Exception as e:
+        print(f"Telegram Credentials Error: {e}")
+        return None
+
+
+def _env_list(name, default):
+    raw = os.environ.get(name, "")
+    items = [x.strip() for x in raw.split(",") if x.strip()]
+    return items or list(default)
+
+
+# --- 2. PERSISTENT DEDUPE STATE ---
+class AlertState:
+    """
+    Key alert yang sudah selesai {key: epoch} (terkirim atau di-park) plus jumlah percobaan
+    kirim yang gagal per key {key: [n, epoch]}, ditulis atomik ke JSON.
+    """
+
+    def __init__(self, path=STATE_PATH, retention=STATE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._sent = {}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # save dipanggil dari loop daemon & worker dispatcher
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data.get("sent"), dict):
+                data = {"sent": data}  # format lama: {key: epoch}
+            self._sent = {str(k): float(v) for k, v in data["sent"].items()}
+            self._attempts = {str(k): [int(n), float(ts)] for k, (n, ts) in data.get("attempts", {}).items()}
+        except FileNotFoundError:
+            self._sent, self._attempts = {}, {}
+        except Exception as e:
+            print(f"Alert State Load Error: {e}")
+            self._sent, self._attempts = {}, {}
+
+    def save(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            self._sent = {k: v for k, v in self._sent.items() if v >= cutoff}
+            self._attempts = {k: v for k, v in self._attempts.items() if v[1] >= cutoff}
+            data = {"sent": dict(self._sent), "attempts": dict(self._attempts)}
+        try:
+            with self._save_lock:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Alert State Save Error: {e}")
+
+    def seen(self, key):
+        with self._lock:
+            return key in self._sent
+
+    def mark(self, key):
+        with self._lock:
+            self._sent[key] = time.time()
+            self._attempts.pop(key, None)
+
+    def record_failure(self, key):
+        """Catat satu percobaan gagal; return jumlah gagal key ini sejauh ini."""
+        with self._lock:
+            n = self._attempts.get(key, [0, 0.0])[0] + 1
+            self._attempts[key] = [n, time.time()]
+            return n
+
+
+class SingleInstanceLock:
+    """Lock file OS-level: hanya satu daemon aktif per gudang state."""
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self._fh = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fh = open(self.path, "a+")
+        try:
+            try:
+                import fcntl
+
+                fcntl.flock(self._fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:  # Windows
+                import msvcrt
+
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._fh.close()
+            self._fh = None
+            return False
+        return True
+
+    def release(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+# --- 3. DAEMON ---
+def format_signal(ticker, tf, last_close, analysis):
+    # Field interpolasi di-escape: satu karakter Markdown liar membuat Telegram menolak pesan (400)
+    return f"⚛️ *{escape_markdown(ticker.replace('=X', ''), '*')}* ({escape_markdown(tf)}) | `{last_close:,.5f}`\n" \
+           f"Verdict: *{escape_markdown(analysis['verdict'], '*')}*\n" \
+           f"Action: {escape_markdown(analysis['action'])}"
+
+
+class AlertDaemon:
+    def __init__(self, tickers=None, timeframes=None, interval=ALERT_INTERVAL, state=None):
+        self.tickers = tickers or _env_list("HAITERM_WATCHLIST", get_forex_list())
+        self.timeframes = timeframes or _env_list("HAITERM_ALERT_TFS", TIMEFRAMES)
+        self.interval = interval
+        self.state = state or AlertState()
+        self.credentials = get_telegram_credentials()
+        self._pending = set()  # key yang sedang di antrean dispatcher
+        self._pending_lock = threading.Lock()
+
+    def _is_handled(self, key):
+        with self._pending_lock:
+            return key in self._pending or self.state.seen(key)
+
+    def _on_delivery(self, key, status):
+        """
+        Callback dispatcher: key ditandai (dan disimpan ke disk) setelah Telegram menerima pesan.
+        Ditolak permanen (4xx) atau gagal sementara MAX_DELIVERY_ATTEMPTS kali -> di-park
+        (ditandai selesai supaya tidak dikirim ulang tiap putaran); selain itu dicoba lagi.
+        """
+        with self._pending_lock:
+            self._pending.discard(key)
+        if status == SENT:
+            self.state.mark(key)
+        elif status == REJECTED:
+            print(f"Alert Parked ({key}): rejected by Telegram, not retrying")
+            self.state.mark(key)
+        else:
+            attempts = self.state.record_failure(key)
+            if attempts >= MAX_DELIVERY_ATTEMPTS:
+                print(f"Alert Parked ({key}): delivery failed {attempts}x")
+                self.state.mark(key)
+            else:
+                print(f"Alert Delivery Failed ({key}), retry {attempts}/{MAX_DELIVERY_ATTEMPTS} next pass")
+        self.state.save()
+
+    def send(self, key, message):
+        """Antrekan alert `key`; dedupe ditandai dari hasil kirim (lihat _on_delivery)."""
+        if self.credentials is None:
+            print(f"Alert Skipped (no Telegram credentials): {message}")
+            return False
+        token, chat_id = self.credentials
+        with self._pending_lock:
+            self._pending.add(key)
+        alert_dispatcher.submit(token, chat_id, message, on_result=lambda status: self._on_delivery(key, status))
+        return True
+
+    def check_heartbeat(self, now_jkt=None):
+        """Heartbeat sekali per hari di jam 22 WIB (restart di tengah jam tidak mengirim ulang)."""
+        now_jkt = now_jkt or datetime.now(TZ_JKT)
+        key = f"hb_{now_jkt.strftime('%Y%m%d')}"
+        if now_jkt.hour == HEARTBEAT_HOUR and not self._is_handled(key):
+            self.send(key, "📡 *SYSTEM CHECK*: Masih cari yang OK nih...")
+
+    def evaluate_ticker(self, ticker, macro):
+        """Pipeline semua timeframe satu ticker; kirim sinyal baru (sekali per bar)."""
+        df_base = fetch_forex_data(ticker, "max", BASE_INTERVAL)
+        if df_base is None or df_base.empty:
+            print(f"Alert Daemon Skip: no price data for {ticker}")
+            return 0
+
+        news = get_news_digest(ticker)
+        sent = 0
+        for tf in self.timeframes:
+            res = run_analysis(ticker, tf, df_base, macro, news)
+            if res is None:
+                continue
+            analysis = res['analysis']
+            if abs(analysis['q_val']) < SIGNAL_MIN_SCORE or not analysis['is_near']:
+                continue
+
+            key = f"signal_{ticker}_{tf}_{res['df_active'].index[-1]}"
+            if self._is_handled(key):
+                continue
+            if self.send(key, format_signal(ticker, tf, res['last_close'], analysis)):
+                sent += 1
+        return sent
+
+    def run_once(self):
+        started = time.monotonic()
+        telemetry.begin_run("daemon")
+        macro = fetch_macro_data()
+        sent = 0
+        for ticker in self.tickers:
+            try:
+                with telemetry.span("daemon.evaluate", ticker=ticker):
+                    sent += self.evaluate_ticker(ticker, macro)
+            except Exception as e:
+                print(f"Alert Daemon Error ({ticker}): {e}")
+        self.check_heartbeat()
+        # State per alert sudah disimpan saat terkirim; ini hanya membuang key kedaluwarsa
+        self.state.save()
+        telemetry.flush()
+        print(f"[{datetime.now(TZ_JKT):%H:%M:%S} WIB] {len(self.tickers)} assets x {len(self.timeframes)} TF "
+              f"evaluated in {time.monotonic() - started:.1f}s, {sent} signal(s) queued")
+        return sent
+
+    def run_forever(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Alert Daemon Loop Error: {e}")
+            time.sleep(self.interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless HAITERM alert service.")
+    parser.add_argument("--once", action="store_true", help="satu putaran lalu keluar")
+    parser.add_argument("--interval", type=int, default=ALERT_INTERVAL)
+    args = parser.parse_args()
+
+    # Sink telemetry sendiri (haiterm-daemon.prom, telemetry-daemon.jsonl), terpisah dari dashboard
+    telemetry.set_role(os.environ.get("HAITERM_ROLE", "daemon"))
+    lock = SingleInstanceLock()
+    if not lock.acquire():
+        raise SystemExit(f"Another alert daemon is already running ({LOCK_PATH}).")
+    try:
+        daemon = AlertDaemon(interval=args.interval)
+        if args.once:
+            daemon.run_once()
+        else:
+            daemon.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        alert_dispatcher.flush(timeout=30)
+        lock.release()
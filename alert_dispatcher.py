@@ -0,0 +1,220 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telemetry import telemetry
+
+# Bisa diarahkan ke stub lokal (telegram_stub.py) untuk tes offline
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+TELEGRAM_MAX_CHARS = 4096
+
+# Hasil _send
+SENT = "sent"
+REJECTED = "rejected"  # 4xx selain 429: isi/kredensial ditolak, retry apa adanya tidak membantu
+FAILED = "failed"      # 5xx / timeout / 429 sampai retry habis
+
+_MARKDOWN_SPECIAL = ("_", "*", "`", "[")
+
+
+def escape_markdown(text, entity=None):
+    """
+    Amankan teks untuk parse_mode="Markdown" (legacy). Di luar entity karakter khusus di-escape
+    dengan backslash; di dalam entity (`entity` = delimiternya, mis. "*") escape tidak berlaku,
+    jadi delimiter itu dibuang supaya entity tidak tertutup di tengah jalan.
+    """
+    text = str(text)
+    if entity is not None:
+        return text.replace(entity, "")
+    for ch in _MARKDOWN_SPECIAL:
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+
+class AlertDispatcher:
+    """
+    Pengirim notifikasi Telegram di background worker:
+    - session HTTP di-pool (koneksi TLS dipakai ulang)
+    - retry terbatas dengan exponential backoff (hormati `retry_after` dari 429)
+    - rate limit per chat (1 pesan/detik, 20 pesan/menit)
+    - alert yang masuk dalam jendela 1 detik digabung jadi satu pesan; kalau gabungan ditolak
+      (400, mis. Markdown rusak di salah satu pesan), anggotanya dikirim ulang satu per satu
+    """
+
+    def __init__(self, api_base=TELEGRAM_API_BASE, max_retries=3, backoff=1.0, timeout=10,
+                 merge_window=1.0, min_interval=1.0, per_minute=20):
+        self.api_base = api_base.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.merge_window = merge_window
+        self.min_interval = min_interval
+        self.per_minute = per_minute
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._queue = queue.Queue()
+        self._sent_log = {}  # chat_id -> deque timestamp kirim (60 detik terakhir)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.stats = {"queued": 0, "sent": 0, "merged": 0, "retries": 0, "failed": 0}
+
+    # --- 1. PUBLIC API ---
+    def submit(self, token, chat_id, text, parse_mode="Markdown", on_result=None):
+        """
+        Masukkan alert ke antrean dan langsung kembali (non-blocking).
+        `on_result(status)` dipanggil dari worker setelah pesan diproses: SENT, REJECTED
+        (4xx permanen) atau FAILED (gangguan sementara, retry habis).
+        """
+        self._ensure_worker()
+        self.stats["queued"] += 1
+        self._queue.put({"token": token, "chat_id": chat_id, "text": text, "parse_mode": parse_mode,
+                         "on_result": on_result, "queued_at": time.monotonic()})
+
+    def flush(self, timeout=None):
+        """Tunggu sampai antrean kosong (dipakai daemon saat shutdown / tes)."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if end is not None and time.monotonic() > end:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # --- 2. WORKER ---
+    def _ensure_worker(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="haiterm-alerts", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+
+            # Kumpulkan alert lain yang masuk di jendela merge yang sama
+            deadline = first["queued_at"] + self.merge_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            results = {}
+            try:
+                for key, items in self._group(batch).items():
+                    token, chat_id, parse_mode = key
+                    self.stats["merged"] += len(items) - 1
+                    for chunk, members in self._chunks(items):
+                        status = self._deliver(token, chat_id, chunk, parse_mode)
+                        if status == REJECTED and len(members) > 1:
+                            # Satu pesan rusak jangan sampai menggagalkan semua alert di chunk
+                            for item in members:
+                                results[id(item)] = self._deliver(token, chat_id, item["text"], parse_mode)
+                            continue
+                        results.update((id(item), status) for item in members)
+            except Exception as e:
+                print(f"Alert Dispatcher Error: {e}")
+            finally:
+                for item in batch:
+                    self._report(item, results.get(id(item), FAILED))
+                    self._queue.task_done()
+
+    def _deliver(self, token, chat_id, text, parse_mode):
+        self._wait_rate_limit(chat_id)
+        status = self._send(token, chat_id, text[:TELEGRAM_MAX_CHARS], parse_mode)
+        self.stats["sent" if status == SENT else "failed"] += 1
+        return status
+
+    @staticmethod
+    def _report(item, status):
+        if item["on_result"] is None:
+            return
+        try:
+            item["on_result"](status)
+        except Exception as e:
+            print(f"Alert Callback Error: {e}")
+
+    @staticmethod
+    def _group(batch):
+        groups = {}
+        for item in batch:
+            key = (item["token"], item["chat_id"], item["parse_mode"])
+            groups.setdefault(key, []).append(item)
+        return groups
+
+    @staticmethod
+    def _chunks(items):
+        """
+        Gabung pesan dengan pemisah, dipecah per batas 4096 karakter Telegram.
+        Yield (teks chunk, item di dalamnya); tiap item masuk tepat satu chunk.
+        """
+        chunk, members = "", []
+        for item in items:
+            text = item["text"][:TELEGRAM_MAX_CHARS]
+            candidate = f"{chunk}\n\n{text}" if chunk else text
+            if len(candidate) > TELEGRAM_MAX_CHARS:
+                yield chunk, members
+                candidate, members = text, []
+            chunk = candidate
+            members.append(item)
+        if chunk:
+            yield chunk, members
+
+    def _wait_rate_limit(self, chat_id):
+        log = self._sent_log.setdefault(chat_id, deque())
+        now = time.monotonic()
+        while log and now - log[0] > 60:
+            log.popleft()
+
+        wait = 0.0
+        if log:
+            wait = max(wait, log[-1] + self.min_interval - now)
+        if len(log) >= self.per_minute:
+            wait = max(wait, log[0] + 60 - now)
+        if wait > 0:
+            time.sleep(wait)
+        log.append(time.monotonic())
+
+    def _send(self, token, chat_id, text, parse_mode):
+        url = f"{self.api_base}/bot{token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * (2 ** attempt)
+            try:
+                with telemetry.span("telegram.send", outbound=True, attempt=attempt):
+                    resp = self._session.post(url, data=payload, timeout=self.timeout)
+                if resp.status_code == 200:
+                    return SENT
+                if resp.status_code == 429:
+                    try:
+                        delay = float(resp.json().get("parameters", {}).get("retry_after", delay))
+                    except ValueError:
+                        pass
+                elif resp.status_code < 500:
+                    # 4xx selain 429 (token salah, chat tidak ada): retry tidak akan membantu
+                    print(f"Gagal kirim Telegram: HTTP {resp.status_code} {resp.text[:200]}")
+                    return REJECTED
+            except requests.RequestException as e:
+                print(f"Gagal kirim Telegram: {e}")
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                time.sleep(delay)
+
+        return FAILED
+
+
+# Instance global: satu worker & satu pool koneksi per proses
+alert_dispatcher = AlertDispatcher()
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from telemetry import payload_size, telemetry
+
+
+class Stage:
+    __slots__ = ("name", "fn", "deps")
+
+    def __init__(self, name, fn, deps):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class AnalysisDAG:
+    """
+    Pipeline analisa sebagai DAG stage bernama. Tiap stage di-memo pada
+    content key input-nya (key input mentah + key stage yang jadi dependensi),
+    jadi rerun hanya menghitung stage yang inputnya berubah. Memo dipakai
+    bersama semua sesi dalam satu proses.
+
+    Input `identity` (mis. ticker, tf) menentukan slot: tiap stage per view
+    (slot) hanya menyimpan `per_slot` versi terbaru, versi yang tergantikan
+    (bar/berita lama) langsung dibuang. Jadi isi memo ~ view x stage dan satu
+    pass scanner tidak menggusur hasil view lain. `maxsize` (default
+    per_slot x views x jumlah stage) hanya pengaman LRU global.
+    """
+
+    def __init__(self, maxsize=None, identity=(), views=1, per_slot=2):
+        self.identity = frozenset(identity)
+        self.views = views
+        self.per_slot = per_slot
+        self._maxsize = maxsize
+        self._stages = OrderedDict()
+        self._memo = OrderedDict()
+        self._slots = {}      # slot -> key terbaru (paling akhir = paling baru)
+        self._slot_of = {}    # key -> slot
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @property
+    def maxsize(self):
+        return self._maxsize or self.per_slot * self.views * max(len(self._stages), 1)
+
+    def stage(self, name, deps=()):
+        """Decorator: daftarkan fn(**deps) sebagai stage `name`. Urutan daftar = urutan topologis."""
+        def register(fn):
+            missing = [d for d in deps if d not in self._stages and not d.startswith("@")]
+            if missing:
+                raise ValueError(f"Stage '{name}' depends on unknown stage(s): {missing}")
+            self._stages[name] = Stage(name, fn, [d.lstrip("@") for d in deps])
+            self._stats[name] = {"hits": 0, "misses": 0, "seconds": 0.0}
+            return fn
+        return register
+
+    def _needed(self, targets):
+        if targets is None:
+            return list(self._stages)
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name not in self._stages:
+                continue
+            needed.add(name)
+            stack.extend(self._stages[name].deps)
+        return [name for name in self._stages if name in needed]
+
+    def run(self, inputs, targets=None):
+        """
+        `inputs` = {nama: (nilai, content key)} untuk input mentah (fetch, clock, dll).
+        Return dict nilai semua input + stage yang dijalankan.
+        """
+        values = {name: value for name, (value, _) in inputs.items()}
+        keys = {name: ("@" + name, key) for name, (_, key) in inputs.items()}
+        slots = {name: keys[name] if name in self.identity else ("@" + name,) for name in inputs}
+
+        for name in self._needed(targets):
+            stage = self._stages[name]
+            key = (name,) + tuple(keys[d] for d in stage.deps)
+            keys[name] = key
+            slots[name] = (name,) + tuple(slots[d] for d in stage.deps)
+
+            with self._lock:
+                hit = key in self._memo
+                if hit:
+                    self._memo.move_to_end(key)
+                    self._touch(slots[name], key)
+                    values[name] = self._memo[key]
+                    self._stats[name]["hits"] += 1
+            if hit:
+                telemetry.record(f"dag.{name}", 0.0, cache="hit")
+                continue
+
+            started = time.monotonic()
+            value = stage.fn(**{d: values[d] for d in stage.deps})
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._memo[key] = value
+                self._touch(slots[name], key)
+                while len(self._memo) > self.maxsize:
+                    self._evict(next(iter(self._memo)))
+                stats = self._stats[name]
+                stats["misses"] += 1
+                stats["seconds"] += elapsed
+            rows, nbytes = payload_size(value)
+            telemetry.record(f"dag.{name}", elapsed, cache="miss", rows=rows, nbytes=nbytes)
+            values[name] = value
+        return values
+
+    # Dipanggil dengan self._lock dipegang
+    def _touch(self, slot, key):
+        """Tandai `key` versi terbaru di slot-nya; buang versi lama di luar `per_slot`."""
+        recent = self._slots.setdefault(slot, [])
+        if key in recent:
+            recent.remove(key)
+        recent.append(key)
+        self._slot_of[key] = slot
+        while len(recent) > self.per_slot:
+            self._evict(recent[0])
+
+    def _evict(self, key):
+        self._memo.pop(key, None)
+        slot = self._slot_of.pop(key, None)
+        recent = self._slots.get(slot)
+        if recent is not None:
+            recent.remove(key)
+            if not recent:
+                del self._slots[slot]
+
+    def size(self):
+        with self._lock:
+            return len(self._memo)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self._slots.clear()
+            self._slot_of.clear()
@@ -1,26 +1,17 @@
 import streamlit as st
-from engine import calculate_fibonacci_levels
-from astrology_engine import get_astrology_status
 
 
-def render_astronacci_tab(ticker, df_active):
+def render_astronacci_tab(ticker, fib, astro):
     """
     Layout Tab Astronacci: Fokus pada Eksekusi Presisi dengan Filter 'WAIT' Area.
+    `fib` & `astro` dari hasil analisa bersama (stage fib & astro di pipeline), tidak dihitung ulang di sini.
     """
     # --- 1. DATA PREPARATION ---
-    astro = get_astrology_status()
-    fib = calculate_fibonacci_levels(df_active)
-    p_now = float(df_active['Close'].iloc[-1])
-
+    setup = astro['setup']
+    celestial = astro['celestial']
     # Filter Level: Buang 0% dan 100% sesuai request
     clean_fib = {lvl: val for lvl, val in fib.items() if "0%" not in lvl and "100%" not in lvl}
 
-    # Level Kunci
-    lv_382 = fib.get('38.2%', 0)
-    lv_500 = fib.get('50.0%', 0)
-    lv_618 = fib.get('61.8% (Golden)', 0)
-    lv_786 = fib.get('78.6%', 0)
-
     # --- 2. CELESTIAL MONITOR (STAY ON TOP) ---
     st.markdown(
         "<p style='font-family:Orbitron; font-size:11px; color:#555; letter-spacing:2px; margin-bottom:10px;'>CELESTIAL TIME CONFLUENCE</p>",
@@ -30,46 +21,24 @@ def render_astronacci_tab(ticker, df_active):
     with c1:
         st.markdown(f"""<div style="background:rgba(0,255,204,0.02); padding:15px; border-radius:10px; border:1px solid #00ffcc44; text-align:center;">
             <p style="color:#666; font-size:9px; margin:0;">LUNAR PHASE</p>
-            <b style="color:#00ffcc; font-family:Orbitron; font-size:18px;">{astro['next_event']}</b>
+            <b style="color:#00ffcc; font-family:Orbitron; font-size:18px;">{celestial['next_event']}</b>
         </div>""", unsafe_allow_html=True)
     with c2:
         st.markdown(f"""<div style="background:rgba(255,255,255,0.02); padding:15px; border-radius:10px; border:1px solid #333; text-align:center;">
             <p style="color:#666; font-size:9px; margin:0;">MERCURY STATUS</p>
-            <b style="color:#eee; font-family:Orbitron; font-size:18px;">{astro['mercury_status']}</b>
+            <b style="color:#eee; font-family:Orbitron; font-size:18px;">{celestial['mercury_status']}</b>
         </div>""", unsafe_allow_html=True)
     with c3:
         st.markdown(f"""<div style="background:rgba(255,215,0,0.02); padding:15px; border-radius:10px; border:1px solid #FFD70044; text-align:center;">
             <p style="color:#666; font-size:9px; margin:0;">REVERSAL WINDOW</p>
-            <b style="color:#FFD700; font-family:Orbitron; font-size:18px;">{astro['days_left']} Days</b>
+            <b style="color:#FFD700; font-family:Orbitron; font-size:18px;">{celestial['days_left']} Days</b>
         </div>""", unsafe_allow_html=True)
 
     st.divider()
 
     # --- 3. DYNAMIC SIGNAL LOGIC (WITH WAIT ZONE) ---
-    # Menghitung seberapa dekat harga dengan Golden Ratio (Threshold 0.15% untuk Forex)
-    distance_to_golden = abs(p_now - lv_618) / lv_618
-    is_near_golden = distance_to_golden < 0.0015
-
-    # Inisialisasi Default (WAIT)
-    signal_type = "WAIT"
-    signal_color = "#888888"
-    instruction = "Harga berada di zona netral. Tunggu konfirmasi di area Golden Ratio (61.8%)."
-    entry_lv, tp_lv, sl_lv = lv_618, 0, 0
-
-    if is_near_golden:
-        # Jika harga dekat Golden Ratio, baru cek Bias
-        if p_now > lv_618:  # Potensi Rebound
-            signal_type, signal_color = "BUY", "#00ffcc"
-            tp_lv, sl_lv = lv_382, lv_786
-            instruction = "ENTRY READY: Harga menyentuh Golden Ratio. Look for Rebound."
-        else:  # Potensi Rejection
-            signal_type, signal_color = "SELL", "#ff4b4b"
-            tp_lv, sl_lv = lv_786, lv_382
-            instruction = "ENTRY READY: Harga menyentuh Golden Ratio. Look for Rejection."
-    elif lv_500 < p_now < lv_382 or lv_786 < p_now < lv_618:
-        # Jika harga di antara level tapi tidak di Golden Ratio
-        signal_type, signal_color = "MONITOR", "#FFD700"
-        instruction = "Harga sedang bergerak antar level. Belum ada setup probabilitas tinggi."
+    signal_type, signal_color, instruction = setup['signal_type'], setup['signal_color'], setup['instruction']
+    entry_lv, tp_lv, sl_lv = setup['entry'], setup['tp'], setup['sl']
 
     # --- 4. SIGNAL COMMAND CENTER ---
     st.markdown(f"""
@@ -104,6 +73,9 @@ def render_astronacci_tab(ticker, df_active):
     st.markdown(
         "<p style='font-family:Orbitron; font-size:11px; color:#555; letter-spacing:2px; margin-bottom:15px;'>CORE FIBONACCI LEVELS</p>",
         unsafe_allow_html=True)
+    if not clean_fib:
+        st.info("Not enough bars for Fibonacci levels yet.")
+        return
     grid_cols = st.columns(len(clean_fib))
     for i, (lvl, val) in enumerate(clean_fib.items()):
         is_golden = "61.8%" in lvl
@@ -0,0 +1,416 @@
+"""
+Backtest Engine: replay histori tersimpan (BarStore) lewat pipeline live
+indikator -> Fibonacci -> SMC -> Quantum score -> ai_hub trade plan,
+tanpa lookahead, lalu simulasi limit entry + SL/TP secara vektor.
+Jalankan dari root repo: python backtest_engine.py EURUSD=X GC=F --tf 1h 4h
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ai_hub import generate_ai_judgment
+from bar_store import bar_store
+from engine import get_score_series_v10, hitung_indikator_lengkap
+from fibonacci_engine import FIB_COLUMNS, FIB_WINDOW, calculate_fibonacci_series
+from macro_feed import MACRO_BASKET
+from market_providers import market_provider
+from mtf_builder import BASE_INTERVAL, build_timeframes, higher_timeframes
+from smc_engine import deteksi_fvg_history, first_cross_index
+from swing_engine import SWING_MIN_PROMINENCE, SWING_STRENGTH
+
+SMC_LOOKBACK = 50  # sama dengan default deteksi_smc_v10
+WARMUP = 200       # bar awal dilewati sampai EMA200 stabil
+DXY_HISTORY = "10y"  # histori DXY harian untuk komponen Macro skor
+
+DEFAULT_PARAMS = {
+    # Stage analisa
+    "fib_mode": "swing",        # "swing" (leg fractal) / "window" (max/min fib_window candle)
+    "swing_strength": SWING_STRENGTH,  # candle kiri/kanan pivot fractal (mode swing)
+    "swing_prominence": SWING_MIN_PROMINENCE,  # filter pivot kecil (mode swing), 0 = semua pivot
+    "fib_window": FIB_WINDOW,   # mode swing: hanya fallback sebelum pivot pertama
+    "smc_lookback": SMC_LOOKBACK,
+    "score_tolerance": 0.001,   # toleransi Golden Floor di Quantum score
+    # Trigger sinyal (sama dengan trigger Telegram di main.py)
+    "min_score": 6,
+    "golden_tolerance": 0.001,  # None = tanpa filter Golden Ratio
+    # Threshold generate_ai_judgment
+    "plan_min_score": 4,
+    "conviction_score": 7,
+    "floor_tolerance": 0.002,
+    # Eksekusi
+    "target": "tp1",       # "tp1" / "tp2"
+    "entry_expiry": 24,    # limit order batal kalau tidak terisi dalam N bar
+    "allow_overlap": False,
+}
+
+TRADE_COLUMNS = ['signal_at', 'side', 'score', 'entry', 'sl', 'tp', 'filled', 'fill_at', 'fill_price',
+                 'exit_at', 'exit_price', 'outcome', 'r_multiple', 'bars_held']
+
+
+# --- 1. CAUSAL INPUTS (SEMUA BAR) ---
+def htf_bias_series(df_tf, frames, tf):
+    """
+    Bias HTF per bar tanpa lookahead: bar HTF yang sedang berjalan dinilai
+    dengan close bar `tf` saat itu (EMA50 HTF = EMA bar HTF yang sudah close
+    + update parsial), persis seperti yang dilihat hitung_htf_bias secara live.
+    """
+    close = df_tf['Close'].to_numpy(dtype=np.float64)
+    alpha = 2.0 / 51.0
+    bias = {}
+    for htf in higher_timeframes(tf):
+        df_htf = frames.get(htf)
+        if df_htf is None or df_htf.empty:
+            continue
+        j = np.searchsorted(df_htf.index.values, df_tf.index.values, side='right') - 1
+        ema_done = df_htf['Close'].ewm(span=50, adjust=False).mean().to_numpy()
+        ema_prev = ema_done[np.maximum(j - 1, 0)]
+        ema_now = np.where(j >= 1, (1 - alpha) * ema_prev + alpha * close, close)
+        bias[htf] = np.where(close > ema_now, 1, -1)
+    return bias
+
+
+def oldest_live_zone(zones, n, zone_type, lookback=SMC_LOOKBACK):
+    """
+    Per bar t: mid FVG `zone_type` tertua yang masih Unfilled dan terbentuk
+    dalam `lookback` candle terakhir (= unfilled_*[0] di generate_ai_judgment
+    kalau deteksi_smc_v10 dijalankan pada df[:t+1]). NaN kalau tidak ada.
+    """
+    mid = np.full(n, np.nan)
+    zones = zones[zones['type'] == zone_type]
+    if zones.empty:
+        return mid
+
+    formed = zones['formed_idx'].to_numpy()
+    mitig = zones['mitigated_idx'].to_numpy()
+    zone_mid = np.full(n, np.nan)
+    alive_until = np.full(n, -1)
+    zone_mid[formed] = zones['mid'].to_numpy()
+    alive_until[formed] = np.where(mitig >= 0, mitig - 1, n)
+
+    # Maksimal satu zona per tipe per bar: cek umur 0..lookback-3, yang tertua menang
+    t = np.arange(n)
+    for age in range(lookback - 2):
+        src = t - age
+        ok = src >= 0
+        src = np.maximum(src, 0)
+        live = ok & ~np.isnan(zone_mid[src]) & (alive_until[src] >= t)
+        mid[live] = zone_mid[src][live]
+    mid[:4] = np.nan  # deteksi_smc_v10 butuh minimal 5 candle
+    return mid
+
+
+def load_dxy_history(history=DXY_HISTORY):
+    """Close harian DXY dari provider aktif (ticker & sumber yang sama dengan MacroFeed), atau None."""
+    try:
+        closes = market_provider.download_macro([MACRO_BASKET["DXY"]], history)
+    except Exception as e:
+        print(f"Backtest DXY Error: {e}")
+        return None
+    if closes is None or closes.empty:
+        return None
+    series = closes.iloc[:, 0].dropna()
+    return series if not series.empty else None
+
+
+def resolve_dxy(dxy=None):
+    """
+    DXY untuk skor backtest. None = tarik histori harian dari provider (default, sama seperti
+    trigger live yang selalu memuat komponen Macro +/-2); False = sengaja tanpa makro.
+    Kalau histori tidak tersedia: peringatan keras lalu False.
+    """
+    if dxy is not None:
+        return dxy
+    dxy = load_dxy_history()
+    if dxy is None:
+        print("⚠️ Backtest Warning: DXY history unavailable, scoring WITHOUT the macro term "
+              "(trigger differs from the live Telegram trigger)")
+        return False
+    return dxy
+
+
+def align_daily(index, daily):
+    """
+    Seri harian per bar tanpa lookahead: close hari terakhir yang sudah selesai sebelum
+    tanggal bar (UTC). NaN untuk bar sebelum histori harian dimulai.
+    """
+    days = pd.DatetimeIndex(daily.index)
+    days = (days.tz_localize(None) if days.tz is not None else days).normalize()
+    bars = pd.DatetimeIndex(index)
+    bars = (bars.tz_convert(None) if bars.tz is not None else bars).normalize()
+    j = np.searchsorted(days.values, bars.values, side='left') - 1
+    values = daily.to_numpy(dtype=np.float64)
+    return np.where(j >= 0, values[np.maximum(j, 0)], np.nan)
+
+
+# --- 2. STAGES & PLANS ---
+# Tiap stage hanya bergantung pada parameter yang disebut, jadi hasilnya bisa
+# di-cache dan dipakai ulang (lihat optimizer.py).
+def prepare_frame(df_base, ticker, tf, base_tf=BASE_INTERVAL, dxy=None):
+    """
+    Stage tanpa parameter: frame `tf` + indikator, bias HTF, histori FVG, DXY per bar
+    (`dxy` Series harian di-align tanpa lookahead; skalar/array dipakai apa adanya).
+    None kalau histori kurang.
+    """
+    frames = build_timeframes(df_base, ticker, base_tf=base_tf)
+    df = frames.get(tf)
+    if df is None or len(df) <= WARMUP:
+        return None
+
+    # Repair NaN hanya ke depan (bfill akan bocor ke masa lalu)
+    df = hitung_indikator_lengkap(df.ffill())
+    if isinstance(dxy, pd.Series):
+        dxy = align_daily(df.index, dxy)
+    return {"df": df, "htf_bias": htf_bias_series(df, frames, tf), "zones": deteksi_fvg_history(df),
+            "dxy": None if dxy is None or dxy is False else dxy}
+
+
+def fib_stage(ctx, fib_window=FIB_WINDOW, fib_mode="swing", swing_strength=SWING_STRENGTH,
+              swing_prominence=SWING_MIN_PROMINENCE):
+    return calculate_fibonacci_series(ctx['df'], mode=fib_mode, window=fib_window,
+                                      left=swing_strength, right=swing_strength,
+                                      min_prominence=swing_prominence)
+
+
+def score_stage(ctx, fib, score_tolerance=0.001, dxy=None):
+    """
+    Quantum score per bar. Sentimen netral (0); makro dari `dxy` (skalar / array sejajar),
+    default DXY context (lihat prepare_frame). Bar tanpa data DXY: komponen makro 0.
+    """
+    if dxy is None:
+        dxy = ctx.get('dxy')
+    macro = {'dxy_val': dxy} if dxy is not None else {}
+    series = get_score_series_v10(ctx['df'], macro, 0, fib, ctx['htf_bias'], golden_tolerance=score_tolerance)
+    d = series['details']
+    score = d['Trend'] + d['Momentum'] + d['Sentiment'] + d['MTF Bonus']
+    if dxy is not None:
+        score = score + np.where(np.isnan(np.asarray(dxy, dtype=np.float64)), 0, d['Macro'])
+    return np.clip(score, -10, 10)
+
+
+def zone_stage(ctx, smc_lookback=SMC_LOOKBACK):
+    n = len(ctx['df'])
+    return (oldest_live_zone(ctx['zones'], n, 'BULLISH FVG', smc_lookback),
+            oldest_live_zone(ctx['zones'], n, 'BEARISH FVG', smc_lookback))
+
+
+def plan_signals(ctx, fib, score, zone_mids, **params):
+    """Trade plan generate_ai_judgment di setiap bar trigger (hanya data <= bar itu)."""
+    p = {**DEFAULT_PARAMS, **params}
+    close = ctx['df']['Close'].to_numpy(dtype=np.float64)
+    bull_mid, bear_mid = zone_mids
+
+    golden = fib['61.8% (Golden)'].to_numpy()
+    trigger = np.abs(score) >= p['min_score']
+    if p['golden_tolerance'] is not None:
+        with np.errstate(invalid='ignore'):
+            trigger &= np.abs(close - golden) / golden < p['golden_tolerance']
+    trigger[:WARMUP] = False
+
+    fib_values = fib.to_numpy()
+    rows = []
+    for t in np.flatnonzero(trigger):
+        fib_data = {} if np.isnan(fib_values[t]).any() else dict(zip(FIB_COLUMNS, fib_values[t]))
+        smc_zones = [{'type': name, 'status': 'Unfilled', 'mid': mid[t]}
+                     for name, mid in (('BULLISH FVG', bull_mid), ('BEARISH FVG', bear_mid))
+                     if not np.isnan(mid[t])]
+        judgment = generate_ai_judgment({'total': score[t]}, fib_data, smc_zones, close[t],
+                                        min_score=p['plan_min_score'],
+                                        conviction_score=p['conviction_score'],
+                                        floor_tolerance=p['floor_tolerance'])
+        plan = judgment['plan']
+        side = 1 if score[t] > 0 else -1
+        rows.append((t, side, score[t], plan['entry'], plan['sl'], plan[p['target']]))
+
+    signals = pd.DataFrame(rows, columns=['idx', 'side', 'score', 'entry', 'sl', 'tp'])
+    # Plan valid: SL & TP di sisi yang benar dari entry
+    valid = ((signals['entry'] > 0)
+             & (signals['side'] * (signals['entry'] - signals['sl']) > 0)
+             & (signals['side'] * (signals['tp'] - signals['entry']) > 0))
+    return signals[valid].reset_index(drop=True)
+
+
+def build_signals(df_base, ticker, tf, base_tf=BASE_INTERVAL, dxy=None, **params):
+    """
+    Semua stage berurutan untuk satu instrumen & timeframe. Return (df + indikator, signals).
+    `dxy`: lihat resolve_dxy (default histori DXY harian dari provider).
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    ctx = prepare_frame(df_base, ticker, tf, base_tf, resolve_dxy(dxy))
+    if ctx is None:
+        return None, pd.DataFrame()
+
+    fib = fib_stage(ctx, p['fib_window'], p['fib_mode'], p['swing_strength'], p['swing_prominence'])
+    score = score_stage(ctx, fib, p['score_tolerance'])
+    signals = plan_signals(ctx, fib, score, zone_stage(ctx, p['smc_lookback']), **p)
+    return ctx['df'], signals
+
+
+# --- 3. EXECUTION (VEKTOR) ---
+def _first_touch(df, starts, levels, side, adverse):
+    """
+    Bar pertama harga menyentuh level. Untuk buy: entry/stop dicek di Low,
+    target di High (kebalikannya untuk sell). `adverse` = level di arah rugi.
+    """
+    low, high = df['Low'].to_numpy(), df['High'].to_numpy()
+    out = np.empty(len(starts), dtype=np.int64)
+    buy = side > 0
+    down = buy == adverse  # level di bawah harga
+    for mask, values, below in ((down, low, True), (~down, high, False)):
+        if mask.any():
+            out[mask] = first_cross_index(values, starts[mask], levels[mask], below=below)
+    return out
+
+
+def simulate_trades(df, signals, **params):
+    """
+    Limit entry di plan['entry'] (isi di bar setelah sinyal, harga open kalau gap),
+    lalu SL vs TP mana yang tersentuh duluan. SL & TP di bar yang sama = SL (konservatif).
+    TP di bar fill hanya dihitung kalau bar dibuka melewati entry (fill di open); selain itu
+    urutan high/low di dalam bar tidak diketahui, jadi TP baru dicek mulai bar berikutnya.
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    if df is None or signals.empty:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    n = len(df)
+    open_ = df['Open'].to_numpy(dtype=np.float64)
+    close = df['Close'].to_numpy(dtype=np.float64)
+    sig = signals['idx'].to_numpy()
+    side = signals['side'].to_numpy()
+    entry, sl, tp = (signals[c].to_numpy(dtype=np.float64) for c in ('entry', 'sl', 'tp'))
+
+    fill = _first_touch(df, sig + 1, entry, side, adverse=True)
+    filled = (fill < n) & (fill <= sig + p['entry_expiry'])
+    fill_c = np.minimum(fill, n - 1)
+    # Buy limit terisi di entry, atau di open kalau bar dibuka di bawah entry
+    fill_price = np.where(side > 0, np.minimum(entry, open_[fill_c]), np.maximum(entry, open_[fill_c]))
+
+    stop = _first_touch(df, fill_c, sl, side, adverse=True)
+    gap_fill = side * (entry - open_[fill_c]) >= 0
+    target = _first_touch(df, np.where(gap_fill, fill_c, fill_c + 1), tp, side, adverse=False)
+    win = target < stop
+    closed = np.minimum(stop, target) < n
+    exit_idx = np.where(closed, np.minimum(stop, target), n - 1)
+    exit_c = np.minimum(exit_idx, n - 1)
+
+    # Stop yang di-gap lewat: keluar di open (lebih buruk dari SL)
+    stop_price = np.where(side > 0, np.minimum(sl, open_[exit_c]), np.maximum(sl, open_[exit_c]))
+    stop_price = np.where(exit_idx > fill_c, stop_price, sl)
+    exit_price = np.where(~closed, close[-1], np.where(win, tp, stop_price))
+
+    risk = np.abs(fill_price - sl)
+    r_multiple = side * (exit_price - fill_price) / np.where(risk > 0, risk, np.nan)
+
+    trades = pd.DataFrame({
+        'signal_at': df.index[sig],
+        'side': np.where(side > 0, 'BUY', 'SELL'),
+        'score': signals['score'].to_numpy(),
+        'entry': entry, 'sl': sl, 'tp': tp,
+        'filled': filled,
+        'fill_at': df.index[fill_c].where(filled),
+        'fill_price': np.where(filled, fill_price, np.nan),
+        'exit_at': df.index[exit_c].where(filled & closed),
+        'exit_price': np.where(filled, exit_price, np.nan),
+        'outcome': np.where(~filled, 'EXPIRED', np.where(~closed, 'OPEN', np.where(win, 'WIN', 'LOSS'))),
+        'r_multiple': np.where(filled, r_multiple, np.nan),
+        'bars_held': np.where(filled, exit_idx - fill_c, 0),
+    }, columns=TRADE_COLUMNS)
+
+    if not p['allow_overlap']:
+        # Satu posisi per instrumen: order pending/posisi aktif memblokir sinyal baru
+        busy_until = np.where(filled, exit_idx, np.minimum(sig + p['entry_expiry'], n - 1))
+        keep, free_from = [], -1
+        for k in range(len(sig)):
+            if sig[k] > free_from:
+                keep.append(k)
+                free_from = busy_until[k]
+        trades = trades.iloc[keep].reset_index(drop=True)
+    return trades
+
+
+# --- 4. REPORTING ---
+def summarize_trades(trades):
+    """Win rate, expectancy (R), profit factor & max drawdown kurva R. Trade 0R dihitung breakeven."""
+    total = len(trades)
+    filled = trades[trades['filled']] if total else trades
+    done = filled[filled['outcome'].isin(['WIN', 'LOSS'])] if total else trades
+    r = done['r_multiple'].to_numpy(dtype=np.float64) if total else np.empty(0)
+    wins, losses = r[r > 0], r[r < 0]
+
+    equity = np.r_[0.0, np.cumsum(r)]
+    drawdown = float((np.maximum.accumulate(equity) - equity).max())
+
+    return {
+        "signals": total,
+        "filled": len(filled),
+        "fill_rate": len(filled) / total if total else 0.0,
+        "trades": len(done),
+        "open": int((filled['outcome'] == 'OPEN').sum()) if total else 0,
+        "wins": len(wins),
+        "losses": len(losses),
+        "breakeven": int((r == 0).sum()),
+        "win_rate": len(wins) / len(r) if len(r) else 0.0,
+        "expectancy_r": float(r.mean()) if len(r) else 0.0,
+        "avg_win_r": float(wins.mean()) if len(wins) else 0.0,
+        "avg_loss_r": float(losses.mean()) if len(losses) else 0.0,
+        "profit_factor": float(wins.sum() / -losses.sum()) if losses.sum() < 0 else float("inf") if len(wins) else 0.0,
+        "total_r": float(r.sum()),
+        "max_drawdown_r": drawdown,
+    }
+
+
+def backtest(df_base, ticker, tf, base_tf=BASE_INTERVAL, dxy=None, **params):
+    """Backtest satu instrumen & timeframe. Return dict summary + trade list."""
+    df, signals = build_signals(df_base, ticker, tf, base_tf, dxy, **params)
+    trades = simulate_trades(df, signals, **params)
+    return {
+        "ticker": ticker,
+        "tf": tf,
+        "bars": 0 if df is None else len(df),
+        "summary": summarize_trades(trades),
+        "trades": trades,
+    }
+
+
+def run_backtest_suite(tickers=None, timeframes=("1h",), base_tf=BASE_INTERVAL, store=bar_store, dxy=None, **params):
+    """
+    Backtest semua ticker x timeframe dari histori bar yang sudah tersimpan di BarStore
+    (bar tidak di-download; DXY harian ditarik sekali, lihat resolve_dxy).
+    Return (tabel summary, dict {(ticker, tf): trades}).
+    """
+    if tickers is None:
+        from data_provider import get_forex_list
+        tickers = get_forex_list()
+    dxy = resolve_dxy(dxy)
+
+    rows, trade_lists = [], {}
+    for ticker in tickers:
+        df_base = store.load(ticker, base_tf)
+        if df_base is None or df_base.empty:
+            print(f"Backtest Skip: no stored {base_tf} bars for {ticker}")
+            continue
+        for tf in timeframes:
+            try:
+                res = backtest(df_base, ticker, tf, base_tf, dxy, **params)
+            except Exception as e:
+                print(f"Backtest Error ({ticker} {tf}): {e}")
+                continue
+            rows.append({"ticker": ticker, "tf": tf, "bars": res['bars'], **res['summary']})
+            trade_lists[(ticker, tf)] = res['trades']
+    return pd.DataFrame(rows), trade_lists
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay BarStore history through the HAITERM signal pipeline.")
+    parser.add_argument("tickers", nargs="*", help="default: semua asset di get_forex_list()")
+    parser.add_argument("--tf", nargs="+", default=["1h"])
+    parser.add_argument("--base", default=BASE_INTERVAL, help="interval seri dasar di BarStore")
+    parser.add_argument("--min-score", type=int, default=DEFAULT_PARAMS["min_score"])
+    parser.add_argument("--target", choices=["tp1", "tp2"], default=DEFAULT_PARAMS["target"])
+    args = parser.parse_args()
+
+    table, _ = run_backtest_suite(args.tickers or None, args.tf, args.base,
+                                  min_score=args.min_score, target=args.target)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.to_string(index=False) if not table.empty else "No stored history to replay.")
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# float32 dipakai kalau error pembulatannya di harga puncak <= 10% satu tick instrumen
+FLOAT32_TICK_FRACTION = 0.1
+
+
+def price_decimals(ticker):
+    """Presisi harga (jumlah desimal tick) per instrumen, gaya kuotasi broker."""
+    if ticker.endswith("=X"):
+        return 3 if "JPY" in ticker else 5
+    if ticker in ("GC=F", "BTC-USD", "ETH-USD"):
+        return 2
+    if ticker == "SI=F":
+        return 3
+    if ticker.startswith("^") or ticker == "DX-Y.NYB":
+        return 3
+    return 5
+
+
+def storage_dtype(ticker, values):
+    """
+    float32 kalau setengah jarak antar float32 di harga tertinggi seri masih jauh di bawah
+    tick instrumen (EURUSD, JPY, Gold, ETH), selain itu float64 (mis. BTC di atas ~20k).
+    """
+    values = np.asarray(values)
+    if values.size == 0:
+        return np.dtype(np.float32)
+    peak = np.nanmax(np.abs(values))
+    if not np.isfinite(peak):
+        return np.dtype(np.float64)
+    half_ulp = np.spacing(np.float32(peak)) / 2
+    tick = 10.0 ** -price_decimals(ticker)
+    return np.dtype(np.float32) if half_ulp <= FLOAT32_TICK_FRACTION * tick else np.dtype(np.float64)
+
+
+def frame_from_columns(columns, index):
+    """DataFrame yang kolomnya view langsung ke array (tanpa copy, satu block per kolom)."""
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+class BarSeries:
+    """
+    Kontainer bar kompak: array OHLC kontigu (float32 kalau presisi instrumen mengizinkan)
+    + index waktu. Adj Close / Volume tidak disimpan (tidak dipakai engine).
+    to_frame() memberi DataFrame yang kolomnya view ke array ini, jadi engine yang
+    membaca df['High'].to_numpy() bekerja langsung di memori kontainer.
+    """
+    __slots__ = ("ticker", "index", "open", "high", "low", "close", "decimals")
+
+    def __init__(self, index, open_, high, low, close, ticker=""):
+        self.ticker = ticker
+        self.index = index
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.decimals = price_decimals(ticker)
+
+    @classmethod
+    def from_frame(cls, df, ticker="", dtype=None):
+        dtype = dtype or storage_dtype(ticker, df['High'].to_numpy())
+        cols = [np.ascontiguousarray(df[col].to_numpy(), dtype=dtype) for col in OHLC_COLUMNS]
+        return cls(df.index, *cols, ticker=ticker)
+
+    def __len__(self):
+        return len(self.close)
+
+    @property
+    def dtype(self):
+        return self.close.dtype
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.open, self.high, self.low, self.close)) + self.index.nbytes
+
+    def slice(self, start=None, stop=None):
+        """Potongan bar sebagai view (tanpa copy)."""
+        s = slice(start, stop)
+        return BarSeries(self.index[s], self.open[s], self.high[s], self.low[s], self.close[s], self.ticker)
+
+    def to_frame(self):
+        return frame_from_columns(dict(zip(OHLC_COLUMNS, (self.open, self.high, self.low, self.close))), self.index)
+
+
+def is_compact(df, ticker):
+    return (list(df.columns) == OHLC_COLUMNS
+            and all(df[col].dtype == storage_dtype(ticker, df['High'].to_numpy()) for col in OHLC_COLUMNS))
+
+
+def compact_frame(df, ticker):
+    """
+    Versi kompak frame OHLC (lihat BarSeries). Frame yang sudah kompak dikembalikan apa adanya,
+    jadi aman dipanggil berulang di tiap lapisan (provider, BarStore).
+    """
+    if df is None or df.empty or is_compact(df, ticker):
+        return df
+    return BarSeries.from_frame(df, ticker).to_frame()
+
+
+def frame_nbytes(df):
+    """Memori satu frame (data + index), untuk perbandingan ukuran cache."""
+    return 0 if df is None else int(df.memory_usage(index=True, deep=False).sum())
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from bar_series import compact_frame
+
+# Lokasi default gudang bar (bisa dioverride lewat env untuk deployment/CI)
+STORE_DIR = os.environ.get(
+    "HAITERM_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".haiterm_cache", "bars")
+)
+
+
+def period_to_timedelta(period):
+    """Konversi period gaya Yahoo ('60d', '1mo', '1y') ke Timedelta."""
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period))
+    if not match:
+        return pd.Timedelta(days=60)
+    n, unit = int(match.group(1)), match.group(2)
+    days = {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit]
+    return pd.Timedelta(days=n * days)
+
+
+# Jangkauan tarikan penuh pertama ke provider (batas Yahoo untuk intraday 15m)
+INITIAL_PERIOD = "60d"
+
+
+class BarStore:
+    """
+    Gudang OHLC lokal: satu file Parquet (kolumnar) per ticker + interval.
+    Provider hanya ditanya bar yang lebih baru dari timestamp terakhir di disk,
+    lalu hasilnya di-append. Bacaan panas dilayani dari memori.
+    """
+
+    def __init__(self, root=STORE_DIR, min_sync_interval=30, persist=True, clock=None):
+        self.root = root
+        # Jeda minimum antar sinkronisasi ke provider (pengganti TTL st.cache_data)
+        self.min_sync_interval = min_sync_interval
+        # persist=False: hanya memori (provider replay); clock: jam provider untuk cek gap
+        self.persist = persist
+        self.clock = clock or (lambda: pd.Timestamp.now(tz="UTC"))
+        self._mem = {}
+        self._last_sync = {}
+        self._sync_errors = {}  # key -> alasan sinkronisasi terakhir gagal (data lama yang dilayani)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    # --- 1. STORAGE HELPERS ---
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker)
+        return os.path.join(self.root, f"{safe}__{interval}.parquet")
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def load(self, ticker, interval):
+        """Ambil seri dari memori, fallback ke disk. None kalau belum pernah disimpan."""
+        key = (ticker, interval)
+        if key in self._mem:
+            return self._mem[key]
+
+        path = self._path(ticker, interval)
+        if not self.persist or not os.path.exists(path):
+            return None
+        try:
+            # File lama bisa masih float64 + Adj Close/Volume
+            df = compact_frame(pd.read_parquet(path), ticker)
+        except Exception as e:
+            print(f"BarStore Read Error ({ticker} {interval}): {e}")
+            return None
+
+        self._mem[key] = df
+        return df
+
+    def save(self, ticker, interval, df):
+        """Tulis atomik (tmp + replace) agar reader lain tidak membaca file setengah jadi."""
+        if not self.persist:
+            self._mem[(ticker, interval)] = df
+            return
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(ticker, interval)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        self._mem[(ticker, interval)] = df
+
+    # --- 2. INCREMENTAL SYNC ---
+    @staticmethod
+    def merge(stored, fresh):
+        """Gabungkan bar baru ke seri lama. Bar dengan timestamp sama diambil versi terbaru."""
+        if stored is None or stored.empty:
+            return fresh.sort_index()
+        if fresh is None or fresh.empty:
+            return stored
+
+        if stored.index.tz is not None and fresh.index.tz is not None:
+            fresh = fresh.tz_convert(stored.index.tz)
+
+        merged = pd.concat([stored, fresh[stored.columns.intersection(fresh.columns)]])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+    def get(self, ticker, interval, period, fetcher):
+        """
+        Kembalikan window `period` terakhir untuk ticker/interval
+        (`period="max"` = seluruh histori yang tersimpan, titik awal tetap).
+        `fetcher(ticker, interval, period=None, start=None)` hanya dipanggil
+        kalau jeda sinkronisasi sudah lewat, dan hanya untuk bar baru.
+        """
+        key = (ticker, interval)
+        window = None if period == "max" else period_to_timedelta(period)
+        fetch_period = INITIAL_PERIOD if period == "max" else period
+        reach = period_to_timedelta(fetch_period)
+
+        with self._lock(key):
+            stored = self.load(ticker, interval)
+            fresh_enough = time.time() - self._last_sync.get(key, 0) < self.min_sync_interval
+
+            if stored is None or stored.empty:
+                fresh = fetcher(ticker, interval, period=fetch_period)
+                if fresh is None or fresh.empty:
+                    return None
+                merged = compact_frame(self.merge(None, fresh), ticker)
+                self.save(ticker, interval, merged)
+            elif fresh_enough:
+                merged = stored
+            else:
+                last_ts = stored.index[-1]
+                now = self.clock()
+                gap = (now.tz_convert(last_ts.tz) if last_ts.tz is not None else now.tz_localize(None)) - last_ts
+                if gap > reach:
+                    # Store terlalu basi untuk di-append (di luar jangkauan provider) -> tarik window penuh
+                    fresh = fetcher(ticker, interval, period=fetch_period)
+                else:
+                    # Bar terakhir ikut ditarik ulang karena bisa saja belum close saat disimpan
+                    fresh = fetcher(ticker, interval, start=last_ts)
+
+                if fresh is None or fresh.empty:
+                    self._sync_errors[key] = "sync returned no bars, serving stored series"
+                else:
+                    self._sync_errors.pop(key, None)
+                merged = self.merge(stored, fresh)
+                if merged is not stored:
+                    merged = compact_frame(merged, ticker)
+                    self.save(ticker, interval, merged)
+
+            self._last_sync[key] = time.time()
+
+        return self.window(merged, window)
+
+    def sync_error(self, ticker, interval):
+        """Alasan sinkronisasi terakhir ke provider gagal, None kalau sukses."""
+        return self._sync_errors.get((ticker, interval))
+
+    @staticmethod
+    def window(df, span):
+        """Slice posisi (tanpa copy) untuk `span` terakhir dari seri."""
+        if df is None or df.empty or span is None:
+            return df
+        start = df.index.searchsorted(df.index[-1] - span)
+        return df.iloc[start:]
+
+
+# Instance global: dipakai bersama oleh semua sesi Streamlit dalam satu proses
+bar_store = BarStore()
@@ -0,0 +1,266 @@
+"""
+Benchmark fungsi engine (offline, OHLC sintetis deterministik) dari 500 s/d 1M bar:
+latency per call (median & terbaik), throughput & peak memory (tracemalloc).
+Throughput = bar/detik untuk case yang biayanya naik dengan n, call/detik untuk
+case yang hanya membaca ekor seri (SIZE_INDEPENDENT).
+Baseline disimpan sebagai JSON supaya regresi bisa di-diff antar commit; regresi
+hanya membuat exit 1 kalau mesin baseline sama (atau --strict).
+
+baselines/illustrative-1cpu.json hanya contoh format & orde besaran (satu mesin 1 CPU,
+diukur di commit yang tercatat di env.commit), bukan acuan regresi. Untuk gate yang
+berarti, simpan baseline sendiri di mesin yang sama dengan run pembanding (mis. runner CI)
+dan buat ulang setiap kali kode yang diukur berubah.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_engines                       # semua ukuran
+    python -m benchmarks.bench_engines --sizes 500,5000 --cases smc
+    python -m benchmarks.bench_engines --save main           # -> benchmarks/baselines/main.json
+    python -m benchmarks.bench_engines --compare main        # exit 1 kalau ada regresi > threshold
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import ai_hub
+import engine
+import fibonacci_engine
+import smc_engine
+from benchmarks.synthetic import make_ohlc
+
+SIZES = [500, 5_000, 50_000, 200_000, 1_000_000]
+QUICK_SIZES = [500, 5_000, 50_000]
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+MIN_TIME = 0.25     # detik pengukuran minimum per case/ukuran
+MIN_REPEAT = 3
+MAX_REPEAT = 200
+SLOW_CALL = 2.0     # call yang lebih lama dari ini cukup diukur sekali
+THRESHOLD = 0.15    # median > baseline * 1.15 = regresi
+
+MACRO = {"dxy_val": 104.0}
+
+
+# --- 1. CASES ---
+class Inputs:
+    """Input bersama per ukuran; turunan (indikator, fib, skor, zona) dihitung sekali di luar timing."""
+
+    def __init__(self, n):
+        self.n = n
+        self.ohlc = make_ohlc(n)
+        self.ind = engine.hitung_indikator_lengkap(self.ohlc)
+        self.fib = engine.calculate_fibonacci_levels(self.ind)
+        self.score = engine.get_detailed_scores_v10(self.ind, MACRO, 0, self.fib, 0, "")
+        self.zones = smc_engine.deteksi_smc_v10(self.ind)
+        self.p_now = float(self.ind['Close'].iloc[-1])
+
+
+CASES = {
+    "engine.hitung_indikator_lengkap": lambda x: lambda: engine.hitung_indikator_lengkap(x.ohlc),
+    "engine.hitung_adx_manual": lambda x: lambda: engine.hitung_adx_manual(x.ohlc),
+    "engine.deteksi_smc_v10": lambda x: lambda: engine.deteksi_smc_v10(x.ind),
+    "smc_engine.deteksi_smc_v10": lambda x: lambda: smc_engine.deteksi_smc_v10(x.ind),
+    "engine.calculate_fibonacci_levels": lambda x: lambda: engine.calculate_fibonacci_levels(x.ind),
+    "fibonacci_engine.calculate_fibonacci_levels": lambda x: lambda: fibonacci_engine.calculate_fibonacci_levels(x.ind),
+    "fibonacci_engine.calculate_fibonacci_series": lambda x: lambda: fibonacci_engine.calculate_fibonacci_series(x.ind),
+    "engine.get_detailed_scores_v10": lambda x: lambda: engine.get_detailed_scores_v10(x.ind, MACRO, 0, x.fib, 0, ""),
+    "engine.get_score_series_v10": lambda x: lambda: engine.get_score_series_v10(x.ind, MACRO, 0, x.fib),
+    "ai_hub.generate_ai_judgment": lambda x: lambda: ai_hub.generate_ai_judgment(x.score, x.fib, x.zones, x.p_now),
+}
+
+# Biaya tidak bergantung panjang seri (bar terakhir / tail(50) / input skalar):
+# bar/detik tidak bermakna, dilaporkan call/detik
+SIZE_INDEPENDENT = {
+    "engine.deteksi_smc_v10",
+    "engine.get_detailed_scores_v10",
+    "ai_hub.generate_ai_judgment",
+}
+
+
+# --- 2. MEASUREMENT ---
+def time_calls(fn, min_time=MIN_TIME):
+    """Latency per call (detik): 1x warm-up, lalu ulang sampai `min_time` tercapai."""
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    if first > SLOW_CALL:
+        return [first]
+
+    samples, spent = [], 0.0
+    while len(samples) < MAX_REPEAT and (len(samples) < MIN_REPEAT or spent < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        spent += samples[-1]
+    return samples
+
+
+def peak_memory(fn):
+    """Peak alokasi (byte) satu call, di luar data input (tracemalloc juga melacak buffer numpy)."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_suite(sizes=SIZES, cases=None, min_time=MIN_TIME, verbose=True):
+    names = [c for c in CASES if not cases or any(pat in c for pat in cases)]
+    results = {name: {} for name in names}
+    if verbose:
+        print(f"{'case':<46} {'bars':>9} {'median ms':>11} {'best ms':>10} {'throughput':>14} {'peak MB':>8} {'runs':>5}")
+
+    for n in sizes:
+        inputs = Inputs(n)
+        for name in names:
+            fn = CASES[name](inputs)
+            samples = time_calls(fn, min_time)
+            median = statistics.median(samples)
+            rate = 1 / median if median > 0 else float("inf")
+            row = {"median_ms": median * 1e3, "best_ms": min(samples) * 1e3}
+            if name in SIZE_INDEPENDENT:
+                row["calls_per_s"] = rate
+                throughput = f"{rate / 1e3:>8.2f} kcall/s"
+            else:
+                row["bars_per_s"] = n * rate
+                throughput = f"{n * rate / 1e6:>8.2f} Mbar/s "
+            row.update(peak_mb=peak_memory(fn) / 2 ** 20, runs=len(samples))
+            results[name][str(n)] = row
+            if verbose:
+                print(f"{name:<46} {n:>9,} {row['median_ms']:>11.3f} {row['best_ms']:>10.3f} "
+                      f"{throughput:>14} {row['peak_mb']:>8.2f} {row['runs']:>5}")
+        del inputs
+    return results
+
+
+# --- 3. BASELINES ---
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(BASELINE_DIR), timeout=10).stdout.strip() or None
+    except Exception as e:
+        print(f"Git Commit Lookup Error: {e}")
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def baseline_path(name):
+    """Nama polos -> benchmarks/baselines/<name>.json; path (berisi / atau .json) dipakai apa adanya."""
+    if os.sep in name or "/" in name or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(results, name):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"env": environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Baseline saved: {path}")
+    return path
+
+
+def load_baseline(name):
+    with open(baseline_path(name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Field env yang harus sama supaya selisih latency bisa dibaca sebagai regresi
+COMPARABLE_ENV = ("machine", "cpu_count", "python", "numpy", "pandas")
+
+
+def environment_mismatch(baseline, env=None):
+    """Field env yang berbeda dari baseline: {field: (baseline, sekarang)}."""
+    env = env or environment()
+    base = baseline.get("env", {})
+    return {k: (base.get(k), env.get(k)) for k in COMPARABLE_ENV if base.get(k) != env.get(k)}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Diff median latency vs baseline per (case, bars). Return list baris
+    {case, bars, base_ms, now_ms, ratio, status}; status REGRESSION / IMPROVED / ok / new.
+    """
+    base = baseline["results"]
+    rows = []
+    for name, by_size in results.items():
+        for n, row in by_size.items():
+            ref = base.get(name, {}).get(n)
+            if ref is None:
+                rows.append({"case": name, "bars": int(n), "base_ms": None, "now_ms": row["median_ms"],
+                             "ratio": None, "status": "new"})
+                continue
+            ratio = row["median_ms"] / ref["median_ms"] if ref["median_ms"] > 0 else float("inf")
+            status = "REGRESSION" if ratio > 1 + threshold else ("IMPROVED" if ratio < 1 - threshold else "ok")
+            rows.append({"case": name, "bars": int(n), "base_ms": ref["median_ms"], "now_ms": row["median_ms"],
+                         "ratio": ratio, "status": status})
+    return rows
+
+
+def print_comparison(rows, baseline):
+    env = baseline.get("env", {})
+    print(f"\nvs baseline {env.get('commit')} ({env.get('created')}, {env.get('machine')})")
+    print(f"{'case':<46} {'bars':>9} {'base ms':>11} {'now ms':>11} {'ratio':>7}  status")
+    for r in rows:
+        base = f"{r['base_ms']:>11.3f}" if r['base_ms'] is not None else f"{'-':>11}"
+        ratio = f"{r['ratio']:>6.2f}x" if r['ratio'] is not None else f"{'-':>7}"
+        print(f"{r['case']:<46} {r['bars']:>9,} {base} {r['now_ms']:>11.3f} {ratio}  {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine modules on synthetic OHLC.")
+    parser.add_argument("--sizes", help="daftar jumlah bar dipisah koma (default 500..1M)")
+    parser.add_argument("--quick", action="store_true", help=f"ukuran {QUICK_SIZES} saja")
+    parser.add_argument("--cases", help="filter nama case (substring, dipisah koma)")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--save", metavar="NAME", help="simpan hasil sebagai baseline")
+    parser.add_argument("--compare", metavar="NAME", help="bandingkan dengan baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--strict", action="store_true", help="exit 1 untuk regresi walau mesin baseline berbeda")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else (QUICK_SIZES if args.quick else SIZES)
+    cases = [c.strip() for c in args.cases.split(",")] if args.cases else None
+
+    results = run_suite(sizes, cases, args.min_time)
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        rows = compare(results, baseline, args.threshold)
+        print_comparison(rows, baseline)
+        mismatch = environment_mismatch(baseline)
+        if mismatch:
+            diff = ", ".join(f"{k}: {a} -> {b}" for k, (a, b) in mismatch.items())
+            print(f"\nWARNING: baseline from a different environment ({diff}); "
+                  f"timings are not directly comparable")
+        regressions = [r for r in rows if r["status"] == "REGRESSION"]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            if not mismatch or args.strict:
+                raise SystemExit(1)
+            print("Not failing: re-run with --strict or save a baseline on this machine to enforce.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark indicator_kernel vs implementasi pandas lama.
+Jalankan dari root repo: python -m benchmarks.bench_indicators
+"""
+import time
+
+import numpy as np
+
+from benchmarks import legacy_reference
+from benchmarks.synthetic import make_ohlc
+from engine import hitung_adx_manual, hitung_indikator_lengkap
+from incremental_engine import INDICATOR_COLUMNS, IndicatorEngine
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'bars':>8} {'legacy ms':>10} {'kernel ms':>10} {'speedup':>8} {'max |diff|':>11} {'incr exact':>10}")
+    for n in SIZES:
+        df = make_ohlc(n)
+
+        legacy = legacy_reference.hitung_indikator_lengkap(df)
+        kernel = hitung_indikator_lengkap(df)
+        diff = np.abs(legacy[INDICATOR_COLUMNS].to_numpy() - kernel[INDICATOR_COLUMNS].to_numpy()).max()
+        assert np.allclose(legacy[INDICATOR_COLUMNS], kernel[INDICATOR_COLUMNS], rtol=1e-9, atol=1e-9)
+        assert np.allclose(legacy_reference.hitung_adx_manual(df), hitung_adx_manual(df),
+                           rtol=1e-9, atol=1e-9, equal_nan=True)
+
+        incremental = IndicatorEngine().update("bench", df)
+        exact = np.array_equal(incremental[INDICATOR_COLUMNS].to_numpy(), kernel[INDICATOR_COLUMNS].to_numpy())
+
+        t_legacy = best_of(lambda: legacy_reference.hitung_indikator_lengkap(df))
+        t_kernel = best_of(lambda: hitung_indikator_lengkap(df))
+        print(f"{n:>8} {t_legacy * 1e3:>10.2f} {t_kernel * 1e3:>10.2f} {t_legacy / t_kernel:>7.1f}x "
+              f"{diff:>11.2e} {str(exact):>10}")
+
+
+if __name__ == "__main__":
+    main()
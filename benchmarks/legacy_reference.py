@@ -0,0 +1,70 @@
+"""
+Salinan beku implementasi pandas lama (sebelum indicator_kernel), dipakai
+sebagai acuan output & baseline kecepatan oleh benchmark. Jangan dioptimasi.
+"""
+import pandas as pd
+import numpy as np
+
+
+def hitung_indikator_lengkap(df):
+    """
+    Menghitung indikator teknikal utama dengan proteksi data kosong.
+    """
+    if df is None or df.empty:
+        return df
+
+    df = df.copy()
+    # Mengisi data kosong agar tidak merusak perhitungan MA/RSI
+    df = df.ffill().bfill()
+
+    # A. TREND FOUNDATION (EMA)
+    df['MA20'] = df['Close'].ewm(span=20, adjust=False).mean()
+    df['MA50'] = df['Close'].ewm(span=50, adjust=False).mean()
+    df['MA200'] = df['Close'].ewm(span=200, adjust=False).mean()
+
+    # B. MOMENTUM (RSI 14)
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    # Proteksi pembagian dengan nol (1e-9)
+    df['RSI'] = 100 - (100 / (1 + (gain / (loss + 1e-9))))
+
+    # C. MACD
+    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['MACD'] = ema12 - ema26
+    df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
+
+    # D. VOLATILITY (ATR 14)
+    high_low = df['High'] - df['Low']
+    high_close = np.abs(df['High'] - df['Close'].shift())
+    low_close = np.abs(df['Low'] - df['Close'].shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    df['ATR'] = ranges.max(axis=1).rolling(window=14).mean()
+
+    # E. TREND STRENGTH (ADX)
+    df['ADX'] = hitung_adx_manual(df)
+
+    return df.fillna(0)
+
+
+def hitung_adx_manual(df, window=14):
+    """Menghitung kekuatan tren dengan filter stabilitas."""
+    df = df.copy()
+    df['TR'] = pd.concat([
+        df['High'] - df['Low'],
+        abs(df['High'] - df['Close'].shift()),
+        abs(df['Low'] - df['Close'].shift())
+    ], axis=1).max(axis=1)
+
+    df['+DM'] = df['High'].diff().clip(lower=0)
+    df['-DM'] = df['Low'].diff().apply(lambda x: -x).clip(lower=0)
+
+    # Menghindari noise dengan rolling mean
+    tr_s = df['TR'].rolling(window).mean() + 1e-9
+    di_p = 100 * (df['+DM'].rolling(window).mean() / tr_s)
+    di_m = 100 * (df['-DM'].rolling(window).mean() / tr_s)
+
+    dx = 100 * (abs(di_p - di_m) / (di_p + di_m + 1e-9))
+    return dx.rolling(window).mean()
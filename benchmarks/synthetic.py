@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+
+def make_ohlc(n, seed=42, start_price=1.1, vol=6e-4, freq="15min"):
+    """OHLC sintetis deterministik (random walk log-normal) untuk benchmark offline."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[start_price, close[:-1]]
+    wick = np.abs(rng.normal(0, vol / 2, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    index = pd.date_range("2020-01-01", periods=n, freq=freq, tz="UTC")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": 0.0}, index=index)
@@ -0,0 +1,74 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Pool global & terbatas: dipakai bersama semua rerun, thread yang telat
+# dibiarkan selesai di background tanpa memblokir render berikutnya.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="haiterm-fetch")
+
+# Hasil sukses terakhir per key, dipakai sebagai fallback saat sumber lambat/error
+_last_good = {}
+_last_good_lock = threading.Lock()
+
+DEFAULT_TIMEOUT = 8.0
+
+
+def run_parallel(tasks, timeout=DEFAULT_TIMEOUT):
+    """
+    Menjalankan semua fetch secara paralel di thread pool.
+
+    `tasks` = {nama: {"fn": callable, "args": tuple, "fallback": nilai,
+                      "timeout": detik, "key": cache key opsional,
+                      "degraded": fn(nilai) -> alasan / None, opsional}}
+
+    Return {nama: {"value", "stale", "error", "elapsed"}}. Sumber yang
+    timeout/error tidak melempar exception: nilainya diganti hasil sukses
+    terakhir (kalau ada) atau `fallback`, dan ditandai stale.
+    `degraded` untuk wrapper yang menelan error-nya sendiri (return nilai fallback):
+    hasil yang dinilai degraded diperlakukan sama, kecuali nilainya tetap dipakai
+    kalau belum ada hasil sukses sebelumnya. Hasil degraded tidak menimpa hasil sukses.
+    """
+    started = time.monotonic()
+    futures = {}
+    for name, spec in tasks.items():
+        # Konteks ikut dibawa ke worker: span telemetry fetch tercatat di rerun pemanggil
+        ctx = contextvars.copy_context()
+        futures[name] = _EXECUTOR.submit(ctx.run, spec["fn"], *spec.get("args", ()))
+
+    results = {}
+    # Tunggu berdasarkan deadline masing-masing: total waktu = sumber paling lambat
+    order = sorted(tasks, key=lambda n: tasks[n].get("timeout", timeout))
+    for name in order:
+        spec = tasks[name]
+        cache_key = spec.get("key", name)
+        remaining = started + spec.get("timeout", timeout) - time.monotonic()
+
+        error, value = None, None
+        try:
+            value = futures[name].result(timeout=max(remaining, 0))
+            if value is None:
+                error = "empty response"
+            elif spec.get("degraded"):
+                error = spec["degraded"](value)
+        except FutureTimeout:
+            error = "timeout"
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+
+        if error is None:
+            with _last_good_lock:
+                _last_good[cache_key] = value
+        else:
+            with _last_good_lock:
+                value = _last_good.get(cache_key, spec.get("fallback") if value is None else value)
+            print(f"Fetch Degraded [{name}]: {error}")
+
+        results[name] = {
+            "value": value,
+            "stale": error is not None,
+            "error": error,
+            "elapsed": time.monotonic() - started,
+        }
+
+    return results
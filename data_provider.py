@@ -1,29 +1,28 @@
 import pandas as pd
-import yfinance as yf
 import streamlit as st
-import requests
 from datetime import datetime
-from gnews import GNews
-from textblob import TextBlob
+
+from alert_dispatcher import alert_dispatcher
+from bar_series import compact_frame
+from bar_store import BarStore, bar_store
+from concurrent_fetch import run_parallel
+from macro_feed import macro_feed
+from market_providers import market_provider
+from mtf_builder import BASE_INTERVAL
+from news_service import news_service
+from telemetry import telemetry
+
+# Provider offline (replay) memakai gudang in-memory dengan jam replay: gudang live tidak tercemar
+store = bar_store if market_provider.live else BarStore(persist=False, clock=market_provider.now)
 
 
 def send_telegram_alert(message):
-    """Mengirim pesan ke Telegram menggunakan Bot API."""
+    """Mengirim pesan ke Telegram lewat dispatcher background (tidak memblokir render)."""
     token = st.secrets["telegram_token"]
     chat_id = st.secrets["telegram_chat_id"]
 
-    # Format URL untuk Telegram API
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    payload = {
-        "chat_id": chat_id,
-        "text": message,
-        "parse_mode": "Markdown"
-    }
-
-    try:
-        requests.post(url, data=payload)
-    except Exception as e:
-        print(f"Gagal kirim Telegram: {e}")
+    # Retry, rate limit & penggabungan pesan diurus worker dispatcher
+    alert_dispatcher.submit(token, chat_id, message)
 
 # --- 1. ASSET LIST (YAHOO STYLE) ---
 def get_forex_list():
@@ -44,19 +43,25 @@ def get_forex_list():
 # --- 2. MACRO DATA ENGINE ---
 
 def fetch_macro_data():
-    """Mengambil data DXY dengan proteksi kegagalan download."""
+    """
+    Snapshot makro dari MacroFeed (DXY, yield US, VIX, Gold) yang di-cache
+    stale-while-revalidate. Key lama (dxy_val, dxy_rel, is_real) tetap ada.
+    """
     try:
-        # Ganti ticker ke DX-Y.NYB biar lebih stabil
-        dxy = yf.download("DX-Y.NYB", period="5d", interval="1d", progress=False)
+        with telemetry.span("data.macro", cacheable=True) as sp:
+            latest = sp.payload(macro_feed.latest())
+            history = macro_feed.returns(window=5)
 
-        if not dxy.empty:
-            # Ambil harga closing terakhir yang asli
-            val = float(dxy['Close'].iloc[-1])
-            prev = float(dxy['Close'].iloc[-2])
+        if "DXY" in latest:
+            dxy_ret = history.get("DXY", [])
             return {
-                "dxy_val": val,
-                "dxy_rel": val > prev,  # Cek apakah naik dibanding kemarin
-                "is_real": True  # Penanda data asli
+                "dxy_val": latest["DXY"],
+                "dxy_rel": dxy_ret[-1] > 0 if dxy_ret else False,  # Cek apakah naik dibanding kemarin
+                "is_real": True,  # Penanda data asli
+                "series": latest,
+                "returns": history,
+                "stale": macro_feed.is_stale(),
+                "degraded": macro_feed.degraded_reason()
             }
 
         # Kalau gagal, kasih tau di log
@@ -68,18 +73,18 @@ def fetch_macro_data():
         return {"dxy_val": 0.0, "dxy_rel": False, "is_real": False}
 
 # --- 3. FOREX DATA ENGINE (STABLE VERSION) ---
-@st.cache_data(ttl=30)
-def fetch_forex_data(ticker, period="60d", interval="1h"):
+def _download_bars(ticker, interval, period=None, start=None):
     """
-    Menarik data OHLC dari Yahoo Finance dengan proteksi Multi-Index.
+    Menarik data OHLC dari provider aktif (Yahoo / replay) dengan proteksi Multi-Index.
+    Pakai `start` untuk tarikan inkremental, `period` untuk tarikan penuh.
     """
     try:
-        data = yf.download(ticker, period=period, interval=interval, progress=False)
+        data = market_provider.download_bars(ticker, interval, period=period, start=start)
 
-        if data.empty:
+        if data is None or data.empty:
             return None
 
-        df = data.copy()
+        df = data.copy(deep=False)
 
         # --- FIX: Rata-kan Multi-Index Yahoo (Solusi Error Format String) ---
         if isinstance(df.columns, pd.MultiIndex):
@@ -91,49 +96,85 @@ def fetch_forex_data(ticker, period="60d", interval="1h"):
         # Pastikan kolom standar tersedia
         required_cols = ['Open', 'High', 'Low', 'Close']
         if all(col in df.columns for col in required_cols):
-            return df
+            # Bar kompak: OHLC saja (Adj Close/Volume dibuang), float32 kalau presisi instrumen cukup
+            return compact_frame(df, ticker)
         else:
             return None
 
     except Exception as e:
-        print(f"Yahoo Fetch Error: {e}")
+        print(f"Bar Fetch Error ({market_provider.name}): {e}")
         return None
 
 
+def fetch_forex_data(ticker, period="60d", interval="1h"):
+    """
+    Data OHLC via BarStore lokal: hanya bar yang lebih baru dari
+    timestamp terakhir yang ditarik dari Yahoo, sisanya dari disk/memori.
+    """
+    try:
+        # "hit" = dilayani BarStore tanpa request ke Yahoo
+        with telemetry.span("data.bars", cacheable=True, ticker=ticker, interval=interval) as sp:
+            return sp.payload(store.get(ticker, interval, period, _download_bars))
+    except Exception as e:
+        print(f"BarStore Error: {e}")
+        return _download_bars(ticker, interval, period=period)
+
+
 # --- 4. NEWS & SENTIMENT ENGINE ---
 
-def check_news_shield(ticker):
-    """Mendeteksi berita High Impact (Red Flags)."""
+def get_news_digest(ticker):
+    """Satu fetch berita (cached per mata uang) -> red flags + sentimen sekaligus."""
     try:
-        clean_name = ticker.replace("=X", "").replace("=F", "")
-        google_news = GNews(language='en', period='12h', max_results=5)
-        raw_news = google_news.get_news(f"{clean_name} forex news")
+        with telemetry.span("data.news", cacheable=True, ticker=ticker) as sp:
+            digest = news_service.get_digest(ticker)
+            sp.payload(digest["headlines"])
+            return digest
+    except Exception as e:
+        print(f"News Digest Error: {e}")
+        return {"headlines": [], "red_flags": [], "sentiment": (0, "NEUTRAL", []), "error": str(e)}
 
-        red_flags = ["NFP", "FOMC", "CPI", "FED", "INTEREST RATE", "PAYROLLS"]
-        detected = [n['title'] for n in raw_news if any(key in n['title'].upper() for key in red_flags)]
-        return detected
-    except:
-        return []
+
+def check_news_shield(ticker):
+    """Mendeteksi berita High Impact (Red Flags)."""
+    return get_news_digest(ticker)["red_flags"]
 
 
 def get_market_sentiment(ticker):
     """Menganalisis bias psikologi pasar dari berita."""
-    try:
-        clean_name = ticker.replace("=X", "").replace("=F", "")
-        google_news = GNews(language='en', period='12h', max_results=5)
-        raw_news = google_news.get_news(f"{clean_name} market sentiment")
+    return get_news_digest(ticker)["sentiment"]
+
 
-        if not raw_news:
-            return 0, "NEUTRAL", []
+# --- 5. TERMINAL FEEDS (SATU RERUN) ---
+# Wrapper di atas menelan error-nya sendiri (return fallback); cek ini membuat run_parallel
+# tetap menandai sumber stale dan mempertahankan nilai sukses terakhir
+def macro_degraded(macro):
+    if not macro.get("is_real"):
+        return "DXY unavailable"
+    return macro.get("degraded")
 
-        score = 0
-        for n in raw_news:
-            pol = TextBlob(n['title']).sentiment.polarity
-            score += 1 if pol > 0.1 else (-1 if pol < -0.1 else 0)
 
-        label = "BULLISH" if score > 0 else ("BEARISH" if score < 0 else "NEUTRAL")
-        val = 1 if score > 0 else (-1 if score < 0 else 0)
+def news_degraded(digest):
+    if digest.get("error"):
+        return digest["error"]
+    stale = digest.get("stale_topics")
+    return f"news fetch failed: {', '.join(stale)}" if stale else None
 
-        return val, label, [n['title'] for n in raw_news[:3]]
-    except:
-        return 0, "NEUTRAL", []
\ No newline at end of file
+
+def fetch_terminal_feeds(ticker):
+    """
+    Semua fetch satu rerun terminal sekaligus (paralel, dengan timeout & fallback):
+    makro, seri bar dasar (timeframe lain di-resample lokal) & digest berita.
+    Return format run_parallel: {nama: {"value", "stale", "error", "elapsed"}}.
+    """
+    return run_parallel({
+        "macro": {"fn": fetch_macro_data, "timeout": 6, "degraded": macro_degraded,
+                  "fallback": {"dxy_val": 0.0, "dxy_rel": False, "is_real": False}},
+        # Satu seri dasar (15m, seluruh histori tersimpan), timeframe lain di-resample lokal
+        "bars": {"fn": fetch_forex_data, "args": (ticker, "max", BASE_INTERVAL), "timeout": 15,
+                 "key": f"bars_{ticker}", "fallback": None,
+                 "degraded": lambda _: store.sync_error(ticker, BASE_INTERVAL)},
+        # Satu digest berita (cached per mata uang) untuk sentimen + news shield
+        "news": {"fn": get_news_digest, "args": (ticker,), "timeout": 6, "key": f"news_{ticker}",
+                 "degraded": news_degraded,
+                 "fallback": {"headlines": [], "red_flags": [], "sentiment": (0, "NEUTRAL", [])}},
+    })
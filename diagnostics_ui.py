@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+
+from telemetry import telemetry
+
+
+def render_diagnostics_panel(run_id):
+    """
+    Panel diagnostik (sidebar, opsional): waktu tiap stage rerun ini, agregat per span
+    sejak proses start, plus metrik single-flight & memo DAG. Data yang sama ditulis ke
+    JSON lines & file Prometheus oleh telemetry.flush().
+    """
+    if not st.toggle("Performance Diagnostics", value=False, key="diag_panel"):
+        return
+
+    spans = telemetry.run_spans(run_id)
+    if spans:
+        run = pd.DataFrame(spans)
+        cols = [c for c in ['span', 'ms', 'cache', 'rows', 'bytes', 'error'] if c in run.columns]
+        top_level = run[~run['span'].str.startswith('dag.')]
+        stage_ms = run.loc[run['span'].str.match(r'^(main|render)\.'), 'ms'].sum()
+        st.caption(f"This rerun: {len(spans)} spans · {stage_ms:,.0f} ms in main stages")
+        st.dataframe(top_level[cols].sort_values('ms', ascending=False), hide_index=True, use_container_width=True)
+
+        dag = run[run['span'].str.startswith('dag.')]
+        if not dag.empty:
+            hits = int((dag['cache'] == 'hit').sum())
+            st.caption(f"Analysis DAG: {hits}/{len(dag)} stages from memo")
+    else:
+        st.caption("No spans recorded for this rerun yet.")
+
+    with st.expander("Span totals (since start)"):
+        summary = telemetry.summary()
+        if summary:
+            table = pd.DataFrame.from_dict(summary, orient='index')
+            table['avg_ms'] = table['seconds'] / table['count'] * 1000
+            table['max_ms'] = table['max_seconds'] * 1000
+            cached = table['hits'] + table['misses']
+            table['hit_rate'] = (table['hits'] / cached.where(cached > 0)).round(2)
+            st.dataframe(table[['count', 'avg_ms', 'max_ms', 'hit_rate', 'errors']]
+                         .sort_values('avg_ms', ascending=False).round(2), use_container_width=True)
+
+    for prefix, (label, groups) in telemetry.collected().items():
+        if groups:
+            with st.expander(f"{prefix} metrics"):
+                st.dataframe(pd.DataFrame.from_dict(groups, orient='index').rename_axis(label).round(3),
+                             use_container_width=True)
+
+    st.caption(f"Sinks: {telemetry.log_path} · {telemetry.prom_path}" if telemetry.sinks else "File sinks disabled")
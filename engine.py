@@ -1,119 +1,140 @@
 import pandas as pd
 import numpy as np
 
+from indicator_kernel import attach_indicators, hitung_adx_arrays, hitung_indikator_arrays
+from mtf_builder import higher_timeframes
+from swing_engine import get_swing_anchors, get_swing_anchors_inkremental
+
 
 # --- 1. CORE TECHNICAL ENGINE ---
 def hitung_indikator_lengkap(df):
     """
     Menghitung indikator teknikal utama dengan proteksi data kosong.
+    Hitungan inti ada di indicator_kernel (array NumPy, satu true range untuk ATR & ADX).
     """
     if df is None or df.empty:
         return df
 
-    df = df.copy()
     # Mengisi data kosong agar tidak merusak perhitungan MA/RSI
-    df = df.ffill().bfill()
+    if df.isna().values.any():
+        df = df.ffill().bfill()
 
-    # A. TREND FOUNDATION (EMA)
-    df['MA20'] = df['Close'].ewm(span=20, adjust=False).mean()
-    df['MA50'] = df['Close'].ewm(span=50, adjust=False).mean()
-    df['MA200'] = df['Close'].ewm(span=200, adjust=False).mean()
+    values = hitung_indikator_arrays(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
+    values[np.isnan(values)] = 0
 
-    # B. MOMENTUM (RSI 14)
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    # Proteksi pembagian dengan nol (1e-9)
-    df['RSI'] = 100 - (100 / (1 + (gain / (loss + 1e-9))))
+    df = attach_indicators(df, values)
+    return df.fillna(0) if df.isna().values.any() else df
 
-    # C. MACD
-    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = ema12 - ema26
-    df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
 
-    # D. VOLATILITY (ATR 14)
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    df['ATR'] = ranges.max(axis=1).rolling(window=14).mean()
+# --- 2. QUANTUM SCORING V10 (OPTIMIZED) ---
+# Kode zona momentum (indeks ke _MOMENTUM_AUDIT); -1 = RSI belum valid
+_MOMENTUM_AUDIT = [
+    "RSI {rsi:.1f} (Overbought - Waspada Koreksi)",
+    "RSI {rsi:.1f} (Strong Bullish Momentum)",
+    "RSI {rsi:.1f} (Bearish Pressure)",
+    "RSI {rsi:.1f} + Golden Floor (High Conviction Reversal!)",
+    "RSI {rsi:.1f} (Oversold - Belum Ada Lantai Tahanan)",
+]
 
-    # E. TREND STRENGTH (ADX)
-    df['ADX'] = hitung_adx_manual(df)
 
-    return df.fillna(0)
+def _as_bias(htf_bias):
+    """htf_bias bisa skalar, array per bar, atau dict {tf: +1/-1 (atau array)}."""
+    if isinstance(htf_bias, dict):
+        return sum(np.asarray(v) for v in htf_bias.values()) if htf_bias else 0
+    return np.asarray(htf_bias)
+
+
+def get_score_series_v10(df, macro, sentiment_score, fib_data, htf_bias=0, golden_tolerance=0.001):
+    """
+    Quantum Engine V10 versi batch: skor total & tiap komponen untuk SETIAP bar
+    lewat operasi array bermask (tanpa loop iloc).
+    Input boleh skalar (berlaku ke semua bar) atau array sejajar dengan df:
+    - macro: dict dengan 'dxy_val'
+    - fib_data: dict level atau DataFrame dari fibonacci_engine.calculate_fibonacci_series
+    - htf_bias: skalar / array / dict {tf: bias}
+    golden_tolerance = jarak relatif ke Golden Ratio untuk bonus reversal (default live 0.1%).
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    rsi = df['RSI'].to_numpy(dtype=np.float64)
+
+    # --- 1. LAYERED TREND LOGIC (Max +4 / Min -4) ---
+    t_score = (np.where(close > df['MA200'].to_numpy(dtype=np.float64), 2, -2)
+               + (close > df['MA50'].to_numpy(dtype=np.float64))
+               + (close > df['MA20'].to_numpy(dtype=np.float64)))
+
+    # --- 2. SMART MOMENTUM (RSI vs Fibonacci Floor) ---
+    golden = np.asarray(fib_data.get('61.8% (Golden)', 0), dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        near_golden = np.abs(close - golden) / (golden + 1e-9) < golden_tolerance
+    m_code = np.select(
+        [rsi > 70, (rsi > 50) & (rsi <= 70), (rsi >= 30) & (rsi <= 50), (rsi < 30) & near_golden, rsi < 30],
+        [0, 1, 2, 3, 4], default=-1)
+    m_score = np.array([1, 2, -2, 4, -1, 0])[m_code]
+
+    # --- 3. MTF BONUS LOGIC (+2) ---
+    bias = _as_bias(htf_bias)
+    tm = t_score + m_score
+    mtf_final = np.where(((bias > 0) & (tm > 0)) | ((bias < 0) & (tm < 0)), 2, 0)
+
+    # --- 4. MACRO DXY CORRELATION (+2 / -2) ---
+    dxy_val = np.asarray(macro.get('dxy_val', 100))
+    macro_score = np.where(dxy_val < 100, 2, -2)
+
+    # TOTAL CALCULATION (Capped +/- 10)
+    n = len(close)
+    sentiment = np.broadcast_to(np.asarray(sentiment_score), (n,))
+    total = np.clip(t_score + m_score + macro_score + sentiment + mtf_final, -10, 10)
+
+    return {
+        "total": total,
+        "details": {
+            "Trend": t_score,
+            "Macro": np.broadcast_to(macro_score, (n,)),
+            "Momentum": m_score,
+            "Sentiment": sentiment,
+            "MTF Bonus": mtf_final,
+        },
+        "momentum_code": m_code,
+        "near_golden": np.broadcast_to(near_golden, (n,)),
+    }
 
 
-# --- 2. QUANTUM SCORING V10 (OPTIMIZED) ---
 def get_detailed_scores_v10(df, macro, sentiment_score, fib_data, htf_bias=0, sent_reason=""):
     """
     Quantum Engine V10: Logic yang jauh lebih peka terhadap reversal dan narasi pasar.
+    Skor diambil dari elemen terakhir get_score_series_v10; di sini tinggal audit-nya.
     """
     if df.empty: return {"total": 0, "details": {}, "audit": {}}
 
-    last = df.iloc[-1]
-    p_now = last['Close']
+    series = get_score_series_v10(df.iloc[-1:], macro, sentiment_score, fib_data, htf_bias)
+    details = {k: v[-1].item() for k, v in series['details'].items()}
+    details['Sentiment'] = sentiment_score
     audit = {}
 
-    # --- 1. LAYERED TREND LOGIC (Max +4 / Min -4) ---
-    t_score = 0
-    t_notes = []
-    # Major Trend (EMA 200) - Bobot Paling Gede
-    if p_now > last['MA200']:
-        t_score += 2
-        t_notes.append("Major Bullish (Price > EMA200)")
+    # --- 1. TREND ---
+    last = df.iloc[-1]
+    if last['Close'] > last['MA200']:
+        audit['Trend'] = "Major Bullish (Price > EMA200)"
     else:
-        t_score -= 2
-        t_notes.append("Major Bearish (Price < EMA200)")
-
-    # Medium & Short Confirmation
-    if p_now > last['MA50']: t_score += 1
-    if p_now > last['MA20']: t_score += 1
-
-    audit['Trend'] = " | ".join(t_notes) if t_notes else "Mixed Trend Detection"
-
-    # --- 2. SMART MOMENTUM (RSI vs Fibonacci Floor) ---
-    m_score = 0
-    rsi = last['RSI']
-    golden_ratio = fib_data.get('61.8% (Golden)', 0)
-    # Toleransi 0.1% untuk area Golden Ratio
-    is_near_golden = abs(p_now - golden_ratio) / (golden_ratio + 1e-9) < 0.001
-
-    if rsi > 70:
-        m_score = 1
-        audit['Momentum'] = f"RSI {rsi:.1f} (Overbought - Waspada Koreksi)"
-    elif 50 < rsi <= 70:
-        m_score = 2
-        audit['Momentum'] = f"RSI {rsi:.1f} (Strong Bullish Momentum)"
-    elif 30 <= rsi <= 50:
-        m_score = -2
-        audit['Momentum'] = f"RSI {rsi:.1f} (Bearish Pressure)"
-    elif rsi < 30:
-        # LOGIKA REVERSAL: Jika RSI murah + nempel di lantai Fibonacci
-        if is_near_golden:
-            m_score = 4  # Golden Reversal
-            audit['Momentum'] = f"RSI {rsi:.1f} + Golden Floor (High Conviction Reversal!)"
-        else:
-            m_score = -1  # Falling Knife
-            audit['Momentum'] = f"RSI {rsi:.1f} (Oversold - Belum Ada Lantai Tahanan)"
-
-    # --- 3. MTF BONUS LOGIC (+2) ---
-    mtf_final = 0
-    # Bonus jika timeframe besar (HTF) searah dengan sinyal saat ini
-    if htf_bias > 0 and (t_score + m_score) > 0:
-        mtf_final = 2
-        audit['MTF Bonus'] = "Big Boss Confirmed (HTF Aligned Bullish)"
-    elif htf_bias < 0 and (t_score + m_score) < 0:
-        mtf_final = 2
-        audit['MTF Bonus'] = "Big Boss Confirmed (HTF Aligned Bearish)"
+        audit['Trend'] = "Major Bearish (Price < EMA200)"
+
+    # --- 2. MOMENTUM ---
+    m_code = series['momentum_code'][-1]
+    if m_code >= 0:
+        audit['Momentum'] = _MOMENTUM_AUDIT[m_code].format(rsi=last['RSI'])
+
+    # --- 3. MTF BONUS ---
+    htf_label = "HTF"
+    if isinstance(htf_bias, dict) and htf_bias:
+        htf_label = " ".join(f"{k}{'▲' if v > 0 else '▼'}" for k, v in htf_bias.items())
+    if details['MTF Bonus']:
+        side = "Bullish" if details['Trend'] + details['Momentum'] > 0 else "Bearish"
+        audit['MTF Bonus'] = f"Big Boss Confirmed ({htf_label} Aligned {side})"
     else:
         audit['MTF Bonus'] = "No HTF Confluence (Timeframes Divergent)"
 
-    # --- 4. MACRO DXY CORRELATION (+2 / -2) ---
+    # --- 4. MACRO ---
     dxy_val = macro.get('dxy_val', 100)
-    macro_score = 2 if dxy_val < 100 else -2
     audit['Macro'] = f"DXY {dxy_val:.2f} ({'Supportive' if dxy_val < 100 else 'Pressuring'} USD)"
 
     # --- 5. SENTIMENT NARRATIVE ---
@@ -124,55 +145,52 @@ def get_detailed_scores_v10(df, macro, sentiment_score, fib_data, htf_bias=0, se
     else:
         audit['Sentiment'] = "Neutral Market Narrative"
 
-    # TOTAL CALCULATION (Capped +/- 10)
-    total = t_score + m_score + macro_score + sentiment_score + mtf_final
-    total = max(min(total, 10), -10)
-
     return {
-        "total": total,
-        "details": {
-            "Trend": t_score,
-            "Macro": macro_score,
-            "Momentum": m_score,
-            "Sentiment": sentiment_score,
-            "MTF Bonus": mtf_final
-        },
+        "total": series['total'][-1].item(),
+        "details": details,
         "audit": audit
     }
 
 
 # --- 3. ANALYTICAL HELPERS ---
-def hitung_adx_manual(df, window=14):
-    """Menghitung kekuatan tren dengan filter stabilitas."""
-    df = df.copy()
-    df['TR'] = pd.concat([
-        df['High'] - df['Low'],
-        abs(df['High'] - df['Close'].shift()),
-        abs(df['Low'] - df['Close'].shift())
-    ], axis=1).max(axis=1)
-
-    df['+DM'] = df['High'].diff().clip(lower=0)
-    df['-DM'] = df['Low'].diff().apply(lambda x: -x).clip(lower=0)
+def hitung_htf_bias(frames, tf):
+    """
+    Bias Bos Besar dari SEMUA timeframe di atas `tf` (Harga vs EMA50).
+    `frames` = dict {tf: DataFrame OHLC} dari mtf_builder.build_timeframes.
+    """
+    bias = {}
+    for htf in higher_timeframes(tf):
+        df_htf = frames.get(htf)
+        if df_htf is None or df_htf.empty:
+            continue
+        ema50 = df_htf['Close'].ewm(span=50, adjust=False).mean()
+        bias[htf] = 1 if df_htf['Close'].iloc[-1] > ema50.iloc[-1] else -1
+    return bias
 
-    # Menghindari noise dengan rolling mean
-    tr_s = df['TR'].rolling(window).mean() + 1e-9
-    di_p = 100 * (df['+DM'].rolling(window).mean() / tr_s)
-    di_m = 100 * (df['-DM'].rolling(window).mean() / tr_s)
 
-    dx = 100 * (abs(di_p - di_m) / (di_p + di_m + 1e-9))
-    return dx.rolling(window).mean()
+def hitung_adx_manual(df, window=14):
+    """Menghitung kekuatan tren dengan filter stabilitas."""
+    adx = hitung_adx_arrays(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(), window)
+    return pd.Series(adx, index=df.index)
 
 
-def calculate_fibonacci_levels(df):
+def calculate_fibonacci_levels(df, key=None):
     """
     Versi Anti-Crash: Menghitung Fibonacci dengan proteksi pembagian nol.
+    Anchor dari leg swing fractal signifikan terakhir (swing_engine), bukan max/min jendela
+    tetap; fallback ke 60 candle terakhir kalau pivot belum terbentuk.
+    `key` (mis. (ticker, tf)): pakai tracker inkremental, hanya ekor seri yang diperiksa ulang.
     """
     if df is None or len(df) < 60:
         return {}
 
-    recent_data = df.tail(60)
-    highest_high = recent_data['High'].max()
-    lowest_low = recent_data['Low'].min()
+    leg = get_swing_anchors_inkremental(key, df) if key is not None else get_swing_anchors(df)
+    if leg is not None:
+        highest_high, lowest_low = leg['swing_high'], leg['swing_low']
+    else:
+        recent_data = df.tail(60)
+        highest_high = recent_data['High'].max()
+        lowest_low = recent_data['Low'].min()
     diff = highest_high - lowest_low
 
     # PROTEKSI: Jika harga flat (High == Low), diff jadi 0.
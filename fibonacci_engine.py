@@ -1,16 +1,23 @@
+import numpy as np
 import pandas as pd
 
+from swing_engine import SWING_MIN_PROMINENCE, SWING_STRENGTH, deteksi_fractal_pivots, get_swing_anchors
+
 
 def calculate_fibonacci_levels(df, period=100):
     """
     Mendeteksi Swing High/Low secara otomatis dan menghitung level Fibonacci Retracement.
     Formula:
     """
-    # 1. Identifikasi Swing High & Swing Low dalam periode tertentu
-    #
-    recent_data = df.tail(period)
-    swing_high = recent_data['High'].max()
-    swing_low = recent_data['Low'].min()
+    # 1. Identifikasi Swing High & Swing Low dari leg fractal terakhir
+    # (fallback: max/min `period` candle terakhir kalau pivot belum lengkap)
+    leg = get_swing_anchors(df)
+    if leg is not None:
+        swing_high, swing_low = leg['swing_high'], leg['swing_low']
+    else:
+        recent_data = df.tail(period)
+        swing_high = recent_data['High'].max()
+        swing_low = recent_data['Low'].min()
     diff = swing_high - swing_low
 
     # 2. Kalkulasi Level Retracement (Standard Astronacci)
@@ -47,4 +54,159 @@ def get_fibonacci_verdict(current_price, levels):
     elif current_price < levels["61.8% (Golden)"] and current_price > levels["78.6%"]:
         return "📥 BUYING ZONE (Deep Retracement)", "#ffa726"
     else:
-        return "⚖️ PRICE IN TRANSIT", "#888"
\ No newline at end of file
+        return "⚖️ PRICE IN TRANSIT", "#888"
+
+
+def get_astronacci_setup(fib, p_now, tolerance=0.0015):
+    """
+    Setup taktis tab Astronacci dari level engine.calculate_fibonacci_levels:
+    BUY/SELL kalau harga dalam `tolerance` (0.15%) dari Golden Ratio,
+    MONITOR kalau di antara level, selain itu WAIT.
+    """
+    # Level Kunci
+    lv_382 = fib.get('38.2%', 0)
+    lv_500 = fib.get('50.0%', 0)
+    lv_618 = fib.get('61.8% (Golden)', 0)
+    lv_786 = fib.get('78.6%', 0)
+
+    # Menghitung seberapa dekat harga dengan Golden Ratio (Threshold 0.15% untuk Forex)
+    distance_to_golden = abs(p_now - lv_618) / lv_618 if lv_618 else float("inf")
+    is_near_golden = distance_to_golden < tolerance
+
+    # Inisialisasi Default (WAIT)
+    setup = {
+        "signal_type": "WAIT",
+        "signal_color": "#888888",
+        "instruction": "Harga berada di zona netral. Tunggu konfirmasi di area Golden Ratio (61.8%).",
+        "entry": lv_618, "tp": 0, "sl": 0,
+    }
+
+    if is_near_golden:
+        # Jika harga dekat Golden Ratio, baru cek Bias
+        if p_now > lv_618:  # Potensi Rebound
+            setup.update(signal_type="BUY", signal_color="#00ffcc", tp=lv_382, sl=lv_786,
+                         instruction="ENTRY READY: Harga menyentuh Golden Ratio. Look for Rebound.")
+        else:  # Potensi Rejection
+            setup.update(signal_type="SELL", signal_color="#ff4b4b", tp=lv_786, sl=lv_382,
+                         instruction="ENTRY READY: Harga menyentuh Golden Ratio. Look for Rejection.")
+    elif lv_500 < p_now < lv_382 or lv_786 < p_now < lv_618:
+        # Jika harga di antara level tapi tidak di Golden Ratio
+        setup.update(signal_type="MONITOR", signal_color="#FFD700",
+                     instruction="Harga sedang bergerak antar level. Belum ada setup probabilitas tinggi.")
+    return setup
+
+# --- LEVEL SERIES (SEMUA BAR) ---
+# Key & rasio sama persis dengan engine.calculate_fibonacci_levels
+FIB_RETRACEMENTS = [('23.6%', 0.236), ('38.2%', 0.382), ('50.0%', 0.5),
+                    ('61.8% (Golden)', 0.618), ('78.6% (Deep)', 0.786)]
+FIB_EXTENSIONS = [('127.2% (T1)', 0.272), ('161.8% (T2)', 0.618)]
+FIB_COLUMNS = (['0% (Low)'] + [k for k, _ in FIB_RETRACEMENTS] + ['100% (High)']
+               + [k for k, _ in FIB_EXTENSIONS])
+FIB_WINDOW = 60
+
+
+def rolling_max(values, window):
+    """
+    Rolling max O(n) (van Herk / Gil-Werman): prefix & suffix max per blok
+    sepanjang `window`, tiap jendela = max(suffix awal, prefix akhir).
+    NaN sampai jendela penuh.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    blocks = np.r_[x, np.full(-n % window, -np.inf)].reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_min(values, window):
+    return -rolling_max(-np.asarray(values, dtype=np.float64), window)
+
+
+def _segment_max(values, segment_start):
+    """Running max yang reset tiap kali `segment_start` berganti (segmen kontigu)."""
+    return pd.Series(values).groupby(segment_start).cummax().to_numpy()
+
+
+def swing_anchor_series(high, low, left=SWING_STRENGTH, right=SWING_STRENGTH, min_prominence=SWING_MIN_PROMINENCE):
+    """
+    Anchor swing high/low per bar secara kausal: pivot baru dipakai setelah
+    `right` bar konfirmasinya lewat, jadi bar t hanya melihat data <= t.
+    Nilai di bar terakhir identik dengan swing_engine.get_swing_anchors.
+    NaN selama pivot high/low belum lengkap.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(high)
+    swing_high = np.full(n, np.nan)
+    swing_low = np.full(n, np.nan)
+    ph, pl = deteksi_fractal_pivots(high, low, left, right, min_prominence)
+    if len(ph) == 0 or len(pl) == 0:
+        return swing_high, swing_low
+
+    # Pivot terakhir yang sudah terkonfirmasi di tiap bar
+    t = np.arange(n)
+    k_h = np.searchsorted(ph + right, t, side='right') - 1
+    k_l = np.searchsorted(pl + right, t, side='right') - 1
+    ready = (k_h >= 0) & (k_l >= 0)
+    h_idx = ph[np.maximum(k_h, 0)]
+    l_idx = pl[np.maximum(k_l, 0)]
+    newer = np.maximum(h_idx, l_idx)
+
+    # Ekstrem harga dari pivot terbaru s/d bar t:
+    # [newer, newer + right) dari jendela tetap, sisanya running max per segmen
+    if right:
+        pre_high = np.r_[np.lib.stride_tricks.sliding_window_view(high, right).max(axis=1),
+                         np.full(right - 1, -np.inf)][newer]
+        pre_low = np.r_[np.lib.stride_tricks.sliding_window_view(low, right).min(axis=1),
+                        np.full(right - 1, np.inf)][newer]
+    else:
+        pre_high, pre_low = np.full(n, -np.inf), np.full(n, np.inf)
+    run_high = np.maximum(pre_high, _segment_max(high, newer))
+    run_low = np.minimum(pre_low, -_segment_max(-low, newer))
+
+    swing_high[ready] = np.maximum(high[h_idx], run_high)[ready]
+    swing_low[ready] = np.minimum(low[l_idx], run_low)[ready]
+    return swing_high, swing_low
+
+
+def calculate_fibonacci_series(df, mode="swing", window=FIB_WINDOW,
+                               left=SWING_STRENGTH, right=SWING_STRENGTH, min_prominence=SWING_MIN_PROMINENCE):
+    """
+    Semua level retracement & extension untuk SETIAP bar (kolom = key
+    engine.calculate_fibonacci_levels), tanpa lookahead.
+    - mode="window": max/min rolling `window` candle (O(n), bukan tail per bar)
+    - mode="swing" : anchor leg fractal terakhir, fallback ke jendela kalau pivot belum ada
+    Baris terakhir = calculate_fibonacci_levels(df). Bar sebelum `window` candle = NaN.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=FIB_COLUMNS)
+
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    hh = rolling_max(high, window)
+    ll = rolling_min(low, window)
+
+    if mode == "swing":
+        s_high, s_low = swing_anchor_series(high, low, left, right, min_prominence)
+        has_swing = ~np.isnan(s_high)
+        hh = np.where(has_swing & ~np.isnan(hh), s_high, hh)
+        ll = np.where(has_swing & ~np.isnan(ll), s_low, ll)
+    elif mode != "window":
+        raise ValueError(f"Unknown fibonacci mode: {mode}")
+
+    # Proteksi harga flat (sama seperti versi single-bar)
+    diff = hh - ll
+    diff = np.where(diff == 0, 1e-9, diff)
+
+    cols = {'0% (Low)': ll}
+    for key, ratio in FIB_RETRACEMENTS:
+        cols[key] = hh - (diff * ratio)
+    cols['100% (High)'] = hh
+    for key, ratio in FIB_EXTENSIONS:
+        cols[key] = hh + (diff * ratio)
+    return pd.DataFrame(cols, index=df.index, columns=FIB_COLUMNS)
@@ -0,0 +1,223 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+from indicator_kernel import INDICATOR_COLUMNS, WINDOW, attach_indicators
+
+# Jumlah bar confirmed terakhir yang dicek ulang (H/L/C) sebelum resume; revisi lebih dalam
+# dari ini tidak terdeteksi, tapi BarStore hanya merevisi beberapa bar terakhir
+REVISION_TAIL = WINDOW
+
+
+class _Ema:
+    """EMA adjust=False dengan rumus & normalisasi yang sama persis seperti pandas ewm."""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = np.nan
+
+    def push(self, x):
+        if self.value != self.value:
+            self.value = x
+        elif self.value != x:
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class _Rolling:
+    """Rolling mean jendela tetap: NaN sampai jendela penuh & selama ada NaN di dalamnya."""
+    __slots__ = ("buf",)
+
+    def __init__(self, window=WINDOW):
+        self.buf = deque(maxlen=window)
+
+    def push(self, x):
+        self.buf.append(x)
+        if len(self.buf) < self.buf.maxlen:
+            return np.nan
+        return float(np.array(self.buf).mean())
+
+
+class IndicatorState:
+    """
+    State rekursif satu seri (akumulator EMA, jendela rolling, bar sebelumnya).
+    Tiap bar baru diproses O(1); bar terakhir bisa direvisi lewat rollback.
+    Input H/L/C & output indikator di-append ke storage prealokasi (tumbuh 2x),
+    output langsung di dtype harga dengan NaN = 0 supaya bisa dibagikan sebagai view.
+    """
+
+    def __init__(self, dtype=np.float64):
+        self.ema = {span: _Ema(span) for span in (12, 20, 26, 50, 200)}
+        self.macd_signal = _Ema(9)
+        self.gain, self.loss = _Rolling(), _Rolling()
+        self.tr, self.pdm, self.mdm, self.dx = _Rolling(), _Rolling(), _Rolling(), _Rolling()
+        self.prev = None  # (high, low, close) bar sebelumnya
+        self.n = 0
+        self.dtype = np.dtype(dtype)
+        self.out = np.empty((len(INDICATOR_COLUMNS), 0), dtype=self.dtype)  # kolom-mayor: tiap indikator kontigu
+        self.hlc = np.empty((3, 0))  # bar input yang sudah diproses, untuk cek revisi
+        self.index = None
+        self._undo = None
+
+    def _snapshot(self):
+        return (
+            {span: e.value for span, e in self.ema.items()},
+            self.macd_signal.value,
+            [tuple(r.buf) for r in (self.gain, self.loss, self.tr, self.pdm, self.mdm, self.dx)],
+            self.prev,
+        )
+
+    def _restore(self, snap):
+        ema, sig, bufs, prev = snap
+        for span, value in ema.items():
+            self.ema[span].value = value
+        self.macd_signal.value = sig
+        for r, values in zip((self.gain, self.loss, self.tr, self.pdm, self.mdm, self.dx), bufs):
+            r.buf.clear()
+            r.buf.extend(values)
+        self.prev = prev
+
+    def rollback_last(self):
+        """Batalkan bar terakhir (dipakai saat bar yang belum close direvisi)."""
+        self._restore(self._undo)
+        self.n -= 1
+        self._undo = None
+
+    def push(self, high, low, close):
+        """Proses satu bar, simpan hasilnya di baris ke-n."""
+        self._undo = self._snapshot()
+
+        ma20 = self.ema[20].push(close)
+        ma50 = self.ema[50].push(close)
+        ma200 = self.ema[200].push(close)
+        macd = self.ema[12].push(close) - self.ema[26].push(close)
+        signal = self.macd_signal.push(macd)
+
+        if self.prev is None:
+            delta = np.nan
+            tr = high - low
+            pdm = mdm = np.nan
+        else:
+            p_high, p_low, p_close = self.prev
+            delta = close - p_close
+            tr = max(high - low, abs(high - p_close), abs(low - p_close))
+            pdm = max(high - p_high, 0.0)
+            mdm = max(-(low - p_low), 0.0)
+
+        # RSI 14 (delta NaN di bar pertama dihitung 0, sama seperti .where batch)
+        gain = self.gain.push(delta if delta > 0 else 0.0)
+        loss = self.loss.push(-delta if delta < 0 else -0.0)
+        rsi = 100 - (100 / (1 + (gain / (loss + 1e-9))))
+
+        # ATR & ADX berbagi true range yang sama
+        atr = self.tr.push(tr)
+        tr_s = atr + 1e-9
+        di_p = 100 * (self.pdm.push(pdm) / tr_s)
+        di_m = 100 * (self.mdm.push(mdm) / tr_s)
+        adx = self.dx.push(100 * (abs(di_p - di_m) / (di_p + di_m + 1e-9)))
+
+        self.prev = (high, low, close)
+
+        if self.n >= self.out.shape[1]:
+            self._grow()
+        row = np.array((ma20, ma50, ma200, rsi, macd, signal, macd - signal, atr, adx))
+        row[np.isnan(row)] = 0
+        self.out[:, self.n] = row
+        self.hlc[:, self.n] = (high, low, close)
+        self.n += 1
+
+    def _grow(self):
+        cap = max(2 * self.out.shape[1], 256)
+        out = np.empty((len(INDICATOR_COLUMNS), cap), dtype=self.dtype)
+        out[:, :self.n] = self.out[:, :self.n]
+        hlc = np.empty((3, cap))
+        hlc[:, :self.n] = self.hlc[:, :self.n]
+        # View lama tetap menunjuk buffer lama (tidak ikut berubah)
+        self.out, self.hlc = out, hlc
+
+
+class IndicatorEngine:
+    """
+    Registry state indikator per seri (mis. ticker + timeframe).
+    Kalau frame baru hanya menambah bar / merevisi bar terakhir, cuma bar
+    tersebut yang dihitung; selain itu state dibangun ulang dari awal.
+    Output identik dengan hitung_indikator_lengkap pada frame yang sama.
+
+    Kolom indikator frame hasil adalah view ke storage state (tanpa copy), jadi
+    revisi bar forming berikutnya ikut menimpa baris terakhir frame yang sudah dibagikan.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def reset(self, key=None):
+        with self._guard:
+            if key is None:
+                self._states.clear()
+            else:
+                self._states.pop(key, None)
+
+    @staticmethod
+    def _resume_from(state, df):
+        """Posisi bar pertama yang perlu (di)hitung ulang, atau None kalau harus rebuild."""
+        if state is None or state.n == 0 or len(df) < state.n or df['Close'].dtype != state.dtype:
+            return None
+        last = state.n - 1
+        if df.index[0] != state.index[0] or df.index[last] != state.index[last]:
+            return None
+        # Bar confirmed di ujung histori harus tetap sama (H/L/C: revisi High/Low saja
+        # sudah mengubah ATR/ADX); cukup ekor REVISION_TAIL bar, bukan seluruh histori
+        lo = max(last - REVISION_TAIL, 0)
+        for row, col in enumerate(('High', 'Low', 'Close')):
+            if not np.array_equal(df[col].to_numpy()[lo:last].astype(float), state.hlc[row, lo:last]):
+                return None
+        return last
+
+    def update(self, key, df):
+        if df is None or df.empty:
+            return df
+
+        # Repair NaN di seluruh frame (sama dengan batch: ffill lalu bfill)
+        has_nan = df.isna().values.any()
+        if has_nan:
+            df = df.ffill().bfill()
+
+        with self._lock(key):
+            state = self._states.get(key)
+            start = self._resume_from(state, df)
+
+            if start is not None and state._undo is not None:
+                state.rollback_last()
+            else:
+                state = IndicatorState(np.result_type(df['Close'].dtype, np.float32))
+                start = 0
+
+            # Cast float hanya untuk bar yang diproses (bukan seluruh histori)
+            high, low, close = (df[col].to_numpy()[start:].astype(float) for col in ('High', 'Low', 'Close'))
+            for i in range(len(close)):
+                state.push(high[i], low[i], close[i])
+
+            state.index = df.index
+            self._states[key] = state
+            values = state.out[:, :state.n]  # view, sudah di dtype harga
+
+        out = attach_indicators(df, values)
+        return out.fillna(0) if has_nan else out
+
+
+# Instance global: state dipakai bersama oleh semua sesi dalam satu proses
+indicator_engine = IndicatorEngine()
+
+
+def hitung_indikator_inkremental(key, df):
+    """Versi stateful hitung_indikator_lengkap: O(1) per bar baru/revisi."""
+    return indicator_engine.update(key, df)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from bar_series import frame_from_columns
+
+WINDOW = 14
+INDICATOR_COLUMNS = ['MA20', 'MA50', 'MA200', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'ATR', 'ADX']
+_COL = {name: i for i, name in enumerate(INDICATOR_COLUMNS)}
+
+
+def _ema(values, span, out):
+    """EMA adjust=False lewat agregator cython pandas, langsung dari array (tanpa DataFrame)."""
+    out[:] = pd.Series(values, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+    return out
+
+
+def _rolling_mean(values, window, out):
+    """Rolling mean jendela tetap via view strided; NaN sampai jendela penuh."""
+    out[:window - 1] = np.nan
+    if len(values) >= window:
+        sliding_window_view(values, window).mean(axis=1, out=out[window - 1:])
+    return out
+
+
+def true_range(high, low, close):
+    """True range sekali hitung, dipakai bersama oleh ATR dan ADX."""
+    tr = np.empty(len(close))
+    tr[0] = high[0] - low[0]
+    prev_close = close[:-1]
+    np.maximum(high[1:] - low[1:],
+               np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)),
+               out=tr[1:])
+    return tr
+
+
+def _adx(high, low, tr, window, out):
+    n = len(tr)
+    pdm = np.empty(n)
+    mdm = np.empty(n)
+    pdm[0] = mdm[0] = np.nan
+    np.maximum(np.diff(high), 0.0, out=pdm[1:])
+    np.maximum(-np.diff(low), 0.0, out=mdm[1:])
+
+    tr_s = _rolling_mean(tr, window, np.empty(n)) + 1e-9
+    di_p = 100 * (_rolling_mean(pdm, window, np.empty(n)) / tr_s)
+    di_m = 100 * (_rolling_mean(mdm, window, np.empty(n)) / tr_s)
+
+    dx = 100 * (np.abs(di_p - di_m) / (di_p + di_m + 1e-9))
+    return _rolling_mean(dx, window, out)
+
+
+def hitung_indikator_arrays(high, low, close, window=WINDOW):
+    """
+    Kernel indikator lengkap dari array float kontigu.
+    Return array (9, n) berurutan sesuai INDICATOR_COLUMNS (NaN = belum cukup data).
+    """
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(close)
+    out = np.empty((len(INDICATOR_COLUMNS), n))
+
+    # A. TREND FOUNDATION (EMA)
+    _ema(close, 20, out[_COL['MA20']])
+    _ema(close, 50, out[_COL['MA50']])
+    _ema(close, 200, out[_COL['MA200']])
+
+    # B. MOMENTUM (RSI 14)
+    delta = np.empty(n)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), window, np.empty(n))
+    loss = _rolling_mean(-np.where(delta < 0, delta, 0.0), window, np.empty(n))
+    out[_COL['RSI']] = 100 - (100 / (1 + (gain / (loss + 1e-9))))
+
+    # C. MACD
+    macd = out[_COL['MACD']]
+    np.subtract(_ema(close, 12, np.empty(n)), _ema(close, 26, np.empty(n)), out=macd)
+    _ema(macd, 9, out[_COL['MACD_Signal']])
+    np.subtract(macd, out[_COL['MACD_Signal']], out=out[_COL['MACD_Hist']])
+
+    # D & E. ATR + ADX dari satu true range
+    tr = true_range(high, low, close)
+    _rolling_mean(tr, window, out[_COL['ATR']])
+    _adx(high, low, tr, window, out[_COL['ADX']])
+
+    return out
+
+
+def hitung_adx_arrays(high, low, close, window=WINDOW):
+    """ADX saja (NaN di awal seri), untuk pemanggil hitung_adx_manual."""
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    tr = true_range(high, low, np.ascontiguousarray(close, dtype=np.float64))
+    return _adx(high, low, tr, window, np.empty(len(tr)))
+
+
+def attach_indicators(df, values):
+    """
+    Tempel hasil kernel (9, n) ke frame tanpa copy data OHLC. Indikator disimpan
+    di dtype harga (float32 untuk seri kompak bar_series), tiap kolom view ke `values`.
+    """
+    values = np.asarray(values).astype(np.result_type(df['Close'].dtype, np.float32), copy=False)
+    indicators = frame_from_columns(dict(zip(INDICATOR_COLUMNS, values)), df.index)
+    # concat axis=1 berbagi buffer kedua sisi (copy-on-write), beda dengan setitem yang meng-copy
+    return pd.concat([df.drop(columns=df.columns.intersection(INDICATOR_COLUMNS)), indicators], axis=1)
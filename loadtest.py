@@ -0,0 +1,196 @@
+"""
+Load test kapasitas: N sesi dashboard simulasi (thread, seperti sesi Streamlit dalam satu
+proses server) yang menjalankan pipeline rerun main.py secara headless
+(fetch_terminal_feeds -> run_analysis) untuk campuran ticker & timeframe.
+Data dari market_simulator lewat ReplayProvider (tanpa Yahoo/GNews), jam replay berjalan
+dipercepat sehingga bar baru tetap masuk selama tes.
+
+Per level concurrency: latency rerun p50/p95/p99, throughput, CPU & memori proses.
+Render HTML Streamlit & websocket tidak termasuk (biaya per sesi yang sama di semua level).
+
+Jalankan dari root repo:
+    python loadtest.py --levels 1,2,4,8,16,32 --duration 20
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_simulator import write_replay_dataset
+
+LEVELS = [1, 2, 4, 8, 16, 32]
+DURATION = 20.0     # detik per level
+THINK_TIME = 1.0    # jeda rata-rata antar rerun satu sesi (interaksi / refresh)
+SWITCH_PROB = 0.1   # peluang sesi ganti ticker/timeframe di rerun berikutnya
+REPLAY_DAYS = 90
+REPLAY_SPEED = 60.0
+KNEE_FACTOR = 2.0   # p95 > 2x p95 level pertama = sudah jenuh
+
+
+def configure_replay(root, days=REPLAY_DAYS, speed=REPLAY_SPEED, seed=42, telemetry=False):
+    """
+    Tulis dataset sintetis & arahkan data layer ke ReplayProvider. Harus dipanggil
+    sebelum data_provider di-import (provider global dibuat saat import).
+    """
+    end = pd.Timestamp.now(tz="UTC").floor("D")
+    os.environ["HAITERM_PROVIDER"] = "replay"
+    os.environ["HAITERM_REPLAY_DIR"] = root
+    os.environ["HAITERM_REPLAY_SPEED"] = str(speed)
+    # Mulai 3 hari sebelum akhir data: histori penuh tersedia, jam replay masih punya ruang maju
+    os.environ["HAITERM_REPLAY_START"] = (end - pd.Timedelta(days=3)).isoformat()
+    if not telemetry:
+        os.environ["HAITERM_TELEMETRY"] = "0"
+    os.environ.setdefault("HAITERM_ROLE", "loadtest")  # sink telemetry terpisah dari dashboard
+    write_replay_dataset(root, days=days, seed=seed, end=end)
+
+
+# --- 1. PROCESS STATS ---
+def rss_mb():
+    """RSS proses saat ini (Linux /proc), fallback peak RSS dari resource."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return float("nan")
+
+
+# --- 2. SESSIONS ---
+def rerun(ticker, tf):
+    """Satu rerun headless main.py: fetch paralel + pipeline analisa (DAG ter-memo)."""
+    from data_provider import fetch_terminal_feeds
+    from pipeline import run_analysis
+
+    feeds = fetch_terminal_feeds(ticker)
+    df_base = feeds["bars"]["value"]
+    if df_base is None or df_base.empty:
+        raise ValueError(f"no price data for {ticker}")
+    return run_analysis(ticker, tf, df_base, feeds["macro"]["value"], feeds["news"]["value"])
+
+
+class SimulatedSession(threading.Thread):
+    def __init__(self, sid, mix, stop, think=THINK_TIME, switch_prob=SWITCH_PROB, seed=0):
+        super().__init__(name=f"haiterm-load-{sid}", daemon=True)
+        self.mix = mix
+        self.stop = stop
+        self.think = think
+        self.switch_prob = switch_prob
+        self.rng = random.Random(seed)
+        self.view = self.rng.choice(mix)
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                rerun(*self.view)
+                self.latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                self.errors += 1
+                print(f"Load Session Error ({self.name} {self.view}): {e}")
+
+            if self.rng.random() < self.switch_prob:
+                self.view = self.rng.choice(self.mix)
+            self.stop.wait(self.think * self.rng.uniform(0.5, 1.5))
+
+
+def run_level(n_sessions, mix, duration=DURATION, think=THINK_TIME, switch_prob=SWITCH_PROB, seed=0):
+    stop = threading.Event()
+    sessions = [SimulatedSession(i, mix, stop, think, switch_prob, seed=seed * 1000 + i) for i in range(n_sessions)]
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for s in sessions:
+        s.start()
+    time.sleep(duration)
+    stop.set()
+    for s in sessions:
+        s.join()
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    lat = np.array([x for s in sessions for x in s.latencies])
+    pct = np.percentile(lat, [50, 95, 99]) if len(lat) else [float("nan")] * 3
+    return {
+        "sessions": n_sessions,
+        "reruns": int(len(lat)),
+        "errors": sum(s.errors for s in sessions),
+        "reruns_per_s": len(lat) / wall,
+        "p50_ms": float(pct[0]),
+        "p95_ms": float(pct[1]),
+        "p99_ms": float(pct[2]),
+        "max_ms": float(lat.max()) if len(lat) else float("nan"),
+        "cpu_pct": 100 * cpu / wall,   # 100 = satu core penuh
+        "rss_mb": rss_mb(),
+    }
+
+
+def run_loadtest(levels=LEVELS, duration=DURATION, think=THINK_TIME, switch_prob=SWITCH_PROB,
+                 tickers=None, timeframes=None, knee_factor=KNEE_FACTOR, verbose=True):
+    from data_provider import get_forex_list
+    from mtf_builder import TIMEFRAMES
+
+    mix = [(t, tf) for t in (tickers or get_forex_list()) for tf in (timeframes or TIMEFRAMES)]
+
+    # Warm-up: satu rerun per view supaya level pertama tidak mengukur cold start
+    warm = time.perf_counter()
+    for view in mix:
+        rerun(*view)
+    if verbose:
+        print(f"Warm-up: {len(mix)} views in {time.perf_counter() - warm:.1f}s, cores={os.cpu_count()}")
+        print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'max ms':>8} {'cpu %':>7} {'rss MB':>7} {'err':>4}")
+
+    results = []
+    for k, n in enumerate(levels):
+        row = run_level(n, mix, duration, think, switch_prob, seed=k)
+        results.append(row)
+        if verbose:
+            print(f"{row['sessions']:>8} {row['reruns']:>7} {row['reruns_per_s']:>8.1f} {row['p50_ms']:>8.1f} "
+                  f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} {row['cpu_pct']:>7.0f} "
+                  f"{row['rss_mb']:>7.0f} {row['errors']:>4}")
+
+    base = results[0]["p95_ms"] if results else float("nan")
+    knee = next((r["sessions"] for r in results if r["p95_ms"] > knee_factor * base), None)
+    if verbose:
+        print(f"\nSaturation (p95 > {knee_factor:g}x single-session p95): "
+              f"{f'at {knee} sessions' if knee else 'not reached'}")
+    return {"levels": results, "knee_sessions": knee, "mix": len(mix)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test on synthetic replay data.")
+    parser.add_argument("--levels", default=",".join(map(str, LEVELS)), help="jumlah sesi per level, dipisah koma")
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--think", type=float, default=THINK_TIME)
+    parser.add_argument("--switch", type=float, default=SWITCH_PROB)
+    parser.add_argument("--tickers", help="dipisah koma (default semua asset terminal)")
+    parser.add_argument("--tfs", help="dipisah koma (default semua timeframe)")
+    parser.add_argument("--days", type=int, default=REPLAY_DAYS)
+    parser.add_argument("--speed", type=float, default=REPLAY_SPEED, help="detik replay per detik nyata")
+    parser.add_argument("--root", help="folder dataset replay (default folder temporer)")
+    parser.add_argument("--telemetry", action="store_true", help="tulis span telemetry ke .haiterm_cache")
+    parser.add_argument("--json", metavar="PATH", help="simpan hasil ke JSON")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix="haiterm_replay_")
+    tickers = args.tickers.split(",") if args.tickers else None
+    configure_replay(root, args.days, args.speed, telemetry=args.telemetry)
+
+    report = run_loadtest([int(x) for x in args.levels.split(",")], args.duration, args.think, args.switch,
+                          tickers, args.tfs.split(",") if args.tfs else None)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), **report}, f, indent=2)
+        print(f"Results saved: {args.json}")
@@ -0,0 +1,128 @@
+import threading
+import time
+
+from market_providers import market_provider
+
+# Keranjang makro: ditarik sekaligus dalam satu request batch
+MACRO_BASKET = {
+    "DXY": "DX-Y.NYB",
+    "US10Y": "^TNX",
+    "US05Y": "^FVX",
+    "VIX": "^VIX",
+    "GOLD": "GC=F",
+}
+
+FRESH_TTL = 15 * 60       # data harian: 15 menit masih dianggap segar
+MAX_STALE = 24 * 60 * 60  # lewat dari ini wajib tarik ulang (blocking)
+RETRY_AFTER = 60          # jeda retry kalau Yahoo gagal
+
+
+class MacroFeed:
+    """
+    Feed makro multi-seri dengan semantik stale-while-revalidate:
+    data segar langsung dipakai, data basi tetap dilayani sambil
+    di-refresh di background, dan hanya fetch pertama yang blocking.
+    """
+
+    def __init__(self, basket=MACRO_BASKET, history="3mo", fresh_ttl=FRESH_TTL, max_stale=MAX_STALE):
+        self.basket = basket
+        self.history = history
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self._closes = None
+        self._fetched_at = 0.0
+        self._retry_at = 0.0
+        self._last_error = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    # --- 1. FETCH ---
+    def _download(self):
+        closes = market_provider.download_macro(list(self.basket.values()), self.history)
+        if closes is None or closes.empty:
+            return None
+
+        # Kalender bursa beda-beda (libur US vs futures): NaN dibiarkan, tiap seri dibaca sendiri
+        closes = closes.rename(columns={v: k for k, v in self.basket.items()}).dropna(how="all")
+        return closes if not closes.empty else None
+
+    def _refresh(self):
+        error = "empty response"
+        try:
+            closes = self._download()
+        except Exception as e:
+            print(f"Macro Fetch Error: {e}")
+            closes, error = None, str(e)
+
+        with self._lock:
+            if closes is not None:
+                self._closes = closes
+                self._fetched_at = time.time()
+                self._last_error = None
+            else:
+                self._retry_at = time.time() + RETRY_AFTER
+                self._last_error = error
+            self._refreshing = False
+
+    def _refresh_background(self):
+        with self._lock:
+            if self._refreshing or time.time() < self._retry_at:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="haiterm-macro", daemon=True).start()
+
+    def closes(self):
+        """DataFrame close harian per seri (kolom = nama keranjang), atau None."""
+        age = time.time() - self._fetched_at
+
+        if self._closes is not None and age < self.fresh_ttl:
+            return self._closes
+
+        if self._closes is not None and age < self.max_stale:
+            # Stale-while-revalidate: layani data lama, refresh jalan di belakang
+            self._refresh_background()
+            return self._closes
+
+        with self._fetch_lock:
+            # Caller lain mungkin sudah selesai fetch selagi kita menunggu lock
+            if time.time() - self._fetched_at >= self.max_stale and time.time() >= self._retry_at:
+                self._refresh()
+        return self._closes
+
+    # --- 2. VIEWS ---
+    def is_stale(self):
+        return self._closes is None or time.time() - self._fetched_at >= self.fresh_ttl
+
+    def degraded_reason(self):
+        """
+        Alasan feed dianggap rusak, atau None. Lewat fresh_ttl saja bukan rusak (itu
+        stale-while-revalidate normal); rusak = refresh terakhir gagal atau data lewat max_stale.
+        """
+        if self._last_error:
+            return f"macro refresh failed: {self._last_error}"
+        if self._closes is not None and time.time() - self._fetched_at >= self.max_stale:
+            return "macro series older than max_stale"
+        return None
+
+    def latest(self):
+        """Nilai terakhir tiap seri."""
+        closes = self.closes()
+        if closes is None:
+            return {}
+        return {name: float(col.dropna().iloc[-1]) for name, col in closes.items() if col.notna().any()}
+
+    def returns(self, window=5):
+        """Histori return harian (%) `window` hari terakhir per seri."""
+        closes = self.closes()
+        if closes is None:
+            return {}
+        history = {}
+        for name, col in closes.items():
+            pct = col.dropna().pct_change().dropna().tail(window) * 100
+            history[name] = [round(float(v), 4) for v in pct]
+        return history
+
+
+# Instance global: dipakai bersama oleh semua sesi dalam satu proses
+macro_feed = MacroFeed()
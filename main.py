@@ -6,23 +6,23 @@ from streamlit_autorefresh import st_autorefresh
 
 # --- 1. CORE IMPORTS (MODULAR) ---
 from data_provider import (
-    fetch_macro_data,
     fetch_forex_data,
-    get_forex_list,
-    check_news_shield,
-    get_market_sentiment
+    fetch_terminal_feeds,
+    get_forex_list
 )
-from engine import hitung_indikator_lengkap, get_detailed_scores_v10, calculate_fibonacci_levels
-from market_sessions import get_market_sessions
-from ai_analyst import generate_strategic_verdict
+from mtf_builder import BASE_INTERVAL, TIMEFRAMES
+from pipeline import run_analysis
+from refresh_scheduler import refresh_plan
+from telemetry import telemetry
+from scanner_engine import scanner_process
 
 # UI Components Modular
 from quantum_ui import render_quantum_tab
 from astronacci_ui import render_astronacci_tab
-from smc_engine import deteksi_smc_v10
 from smc_ui import render_smc_tab
 from ai_ui import render_ai_intelligence_tab
-from ai_hub import generate_ai_judgment
+from scanner_ui import render_scanner_tab
+from diagnostics_ui import render_diagnostics_panel
 
 
 # --- 2. SECURITY GATE (STREAMLIT SECRETS) ---
@@ -75,10 +75,37 @@ def check_password():
     return st.session_state["password_correct"]
 
 
+def render_price_header(ticker, prev_close, fallback_close, feed_badge=""):
+    """
+    Header harga terakhir. Dipanggil ulang sebagai fragment di antara bar close:
+    hanya sync inkremental BarStore (bar terbaru), tanpa pipeline indikator/berita.
+    """
+    df_live = fetch_forex_data(ticker, "max", BASE_INTERVAL)
+    last_close = df_live['Close'].iloc[-1] if df_live is not None and not df_live.empty else fallback_close
+    price_delta = last_close - prev_close
+    pct_delta = (price_delta / prev_close) * 100
+    delta_color = "#00ffcc" if price_delta >= 0 else "#ff4b4b"
+
+    st.markdown(f"""
+        <div class="telemetry-box" style="border-left: 3px solid {delta_color};">
+            <p style="font-size:9px; color:#555; letter-spacing:1px; margin:0;">INSTRUMENT FEED{feed_badge}</p>
+            <div style="display:flex; align-items:baseline; gap:12px;">
+                <span style="font-family:'Orbitron'; font-size:22px; color:#eee; letter-spacing:1px;">{ticker.replace('=X', '')}</span>
+                <span style="font-family:'JetBrains Mono'; font-size:24px; color:{delta_color};">$ {last_close:,.5f}</span>
+                <span style="font-family:'JetBrains Mono'; font-size:12px; color:{delta_color}; font-weight:500;">
+                    {price_delta:+.5f} ({pct_delta:+.2f}%)
+                </span>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+
 # --- 3. MAIN TERMINAL INTERFACE ---
 if check_password():
     # Page Configuration
     st.set_page_config(page_title="hAI terminal", layout="wide", page_icon="⚛️")
+    # Semua span rerun ini (fetch, pipeline, render) dikelompokkan di bawah satu run id
+    run_id = telemetry.begin_run("main")
 
     # Global CSS Refinement
     st.markdown("""
@@ -114,13 +141,19 @@ if check_password():
 
         st.divider()
         ticker = st.selectbox("ACTIVE ASSET", get_forex_list(), index=0)
-        tf = st.selectbox("TIMEFRAME", ["15m", "1h", "4h", "1d"], index=1)
+        tf = st.selectbox("TIMEFRAME", TIMEFRAMES, index=1)
 
         st.divider()
         # Toggle Auto Refresh
         refresh_on = st.toggle("Live Telemetry Sync", value=False)
+        refresh = refresh_plan(ticker, tf)
         if refresh_on:
-            st_autorefresh(interval=10000, key="global_refresh")
+            # Rerun penuh hanya saat bar `tf` close (atau market buka lagi), bukan tiap 10 detik
+            st_autorefresh(interval=refresh["rerun_in"] * 1000,
+                           key=f"bar_close_{ticker}_{tf}_{refresh['wake_at']:%Y%m%d%H%M}")
+            wake_jkt = refresh["wake_at"].tz_convert('Asia/Jakarta')
+            st.caption(f"{'Next ' + tf + ' close' if refresh['market_open'] else 'Market closed · next check'}: "
+                       f"{wake_jkt:%a %H:%M} WIB")
 
             # --- TELEGRAM TEST TRIGGER ---
         st.divider()
@@ -133,88 +166,60 @@ if check_password():
 
     # --- 5. DATA ENGINE PROCESSING ---
     try:
-        macro = fetch_macro_data()
-        df_raw = fetch_forex_data(ticker, "60d", tf)
-        df_active = hitung_indikator_lengkap(df_raw)
-        si, sd, raw_news = get_market_sentiment(ticker)
-
-        sentiment_explanation = ""
-        if raw_news and len(raw_news) > 0:
-            first_item = raw_news[0]
-
-            # Cek: Apakah item pertama itu Dictionary atau String?
-            if isinstance(first_item, dict):
-                # Kalau Dictionary, ambil field 'title'
-                top_title = first_item.get('title', str(first_item))
-            else:
-                # Kalau String, langsung ambil teksnya
-                top_title = str(first_item)
-
-            # Potong teks agar rapi di UI
-            sentiment_explanation = (top_title[:75] + '...') if len(top_title) > 75 else top_title
-        else:
-            sentiment_explanation = "No major news headlines found"
-
+        # Semua fetch jaringan jalan paralel: latency = sumber paling lambat saja.
+        # Sumber yang lambat/error dapat fallback & ditandai STALE, bukan crash.
+        with telemetry.span("main.fetch"):
+            feeds = fetch_terminal_feeds(ticker)
+        stale = [name for name, res in feeds.items() if res["stale"]]
+        stale_badge = ' <span style="color:#ffa726;">· STALE</span>'
+
+        df_base = feeds["bars"]["value"]
+        if df_base is None or df_base.empty:
+            st.error(f"🛑 PRICE FEED UNAVAILABLE: {ticker} ({feeds['bars']['error']}). Retrying on next sync.")
+            st.stop()
+
+        macro = feeds["macro"]["value"]
+        # Pipeline lengkap (sama dengan yang dipakai scanner): DAG stage ter-memo,
+        # rerun tanpa bar/berita baru langsung memakai hasil sebelumnya
+        with telemetry.span("main.analysis", ticker=ticker, tf=tf):
+            result = run_analysis(ticker, tf, df_base, macro, feeds["news"]["value"])
+        if result is None:
+            st.error(f"🛑 NOT ENOUGH {tf} BARS: {ticker}. Retrying on next sync.")
+            st.stop()
 
         # Hitung variabel ini di sini (Global), jangan di dalam Tab!
-        news_alerts = check_news_shield(ticker)
-        fib_levels = calculate_fibonacci_levels(df_active)
-        last_close = df_active['Close'].iloc[-1]
-
-        # Header Logic
+        df_active = result["df_active"]
+        si, sd, raw_news = result["sentiment"]
+        news_alerts = result["news_alerts"]
+        fib_levels = result["fib_levels"]
+        last_close = result["last_close"]
+        score_res = result["score_res"]
+        smc_zones = result["smc_zones"]
+        analysis = result["analysis"]
+        # Data ai_analysis diambil dari generate_ai_judgment (ai_hub.py)
+        ai_analysis = result["ai_analysis"]
+
+        # Header Logic: delta dihitung terhadap close bar `tf` sebelumnya
         prev_close = df_active['Close'].iloc[-2]
-        price_delta = last_close - prev_close
-        pct_delta = (price_delta / prev_close) * 100
-        delta_color = "#00ffcc" if price_delta >= 0 else "#ff4b4b"
-
-        htf = "4h" if tf == "1h" else "1h"  # Kalau lo pake 15m, dia ngecek 1h
-
-        # 2. Tarik Data HTF buat cek Bias Bos Besar
-        df_htf_raw = fetch_forex_data(ticker, "60d", htf)
-        df_htf = hitung_indikator_lengkap(df_htf_raw)
-        last_htf = df_htf.iloc[-1]
-
-        # 3. Hitung Bias HTF (Simple: Harga vs EMA50)
-        htf_bias = 1 if last_htf['Close'] > last_htf['MA50'] else -1
-
-        # Quantum Logic
-        si, sd, _ = get_market_sentiment(ticker)
-        # 4. Panggil Skor dengan MTF Bonus
-        score_res = get_detailed_scores_v10(df_active, macro, si, fib_levels, htf_bias, sentiment_explanation)
-        smc_zones = deteksi_smc_v10(df_active)
-        # Proses Analisa AI Strategis (Jadikan Global untuk Notifikasi)
-        analysis = generate_strategic_verdict(ticker, score_res, fib_levels, last_close, news_alerts)
-        # Variabel ai_analysis dibuat di sini (main.py)
-        # Tapi datanya diambil dari fungsi generate_ai_judgment (ai_hub.py)
-        ai_analysis = generate_ai_judgment(score_res, fib_levels, smc_zones, last_close)
-        # Market Session Logic
-        sessions, _, m_note, m_color = get_market_sessions()
-
-        # --- 6. BACKGROUND ENGINE (NOTIFIKASI & HEARTBEAT) ---
-        tz_jkt = pytz.timezone('Asia/Jakarta')
-        now_jkt = datetime.now(tz_jkt)
+
+        # Market Session Logic (stage `sessions`, berubah per jam WIB)
+        sessions, _, m_note, m_color = result["sessions"]
 
         # --- 6. GLOBAL TELEMETRY HEADER (STAY ON TOP) ---
         h1, h2, h3 = st.columns([2, 1, 1])
 
-        with h1:
-            st.markdown(f"""
-                <div class="telemetry-box" style="border-left: 3px solid {delta_color};">
-                    <p style="font-size:9px; color:#555; letter-spacing:1px; margin:0;">INSTRUMENT FEED</p>
-                    <div style="display:flex; align-items:baseline; gap:12px;">
-                        <span style="font-family:'Orbitron'; font-size:22px; color:#eee; letter-spacing:1px;">{ticker.replace('=X', '')}</span>
-                        <span style="font-family:'JetBrains Mono'; font-size:24px; color:{delta_color};">$ {last_close:,.5f}</span>
-                        <span style="font-family:'JetBrains Mono'; font-size:12px; color:{delta_color}; font-weight:500;">
-                            {price_delta:+.5f} ({pct_delta:+.2f}%)
-                        </span>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
+        with h1, telemetry.span("render.header"):
+            # Header harga di-update sendiri tiap tick (fragment); pipeline berat menunggu bar close
+            feed_badge = stale_badge if 'bars' in stale else ''
+            if refresh_on and refresh["tick_every"]:
+                st.fragment(render_price_header, run_every=refresh["tick_every"])(ticker, prev_close, last_close, feed_badge)
+            else:
+                render_price_header(ticker, prev_close, last_close, feed_badge)
 
         with h2:
             st.markdown(f"""
                 <div class="telemetry-box" style="border-left: 3px solid #FFD700;">
-                    <p style="font-size:9px; color:#555; letter-spacing:1px; margin:0;">DXY INDEX</p>
+                    <p style="font-size:9px; color:#555; letter-spacing:1px; margin:0;">DXY INDEX{stale_badge if 'macro' in stale else ''}</p>
                     <div style="font-family:'JetBrains Mono'; font-size:22px; color:#eee;">
                         {macro.get('dxy_val', 0.0):.3f} <span style="font-size:14px; color:#888;">{"▲" if macro.get('dxy_rel') else "▼"}</span>
                     </div>
@@ -234,50 +239,38 @@ if check_password():
 
         st.markdown("<br>", unsafe_allow_html=True)
 
-        # --- HEARTBEAT 22:00 WIB ---
-        tz_jkt = pytz.timezone('Asia/Jakarta')
-        now_jkt = datetime.now(tz_jkt)
-
-        if now_jkt.hour == 22 and now_jkt.minute == 0:
-            heartbeat_key = f"hb_{now_jkt.strftime('%Y%m%d')}"
-            if heartbeat_key not in st.session_state:
-                from data_provider import send_telegram_alert
-
-                send_telegram_alert("📡 *SYSTEM CHECK*: Masih cari yang OK nih...")
-                st.session_state[heartbeat_key] = True
-
-        # --- DYNAMIC SIGNAL TRIGGER (+/- 6 + Astro) ---
-        # Trigger otomatis jika skor minimal +/- 6 DAN harga di area Golden
-        if abs(analysis['q_val']) >= 6 and analysis['is_near']:
-            notif_key = f"signal_{ticker}_{df_active.index[-1]}"
-            if notif_key not in st.session_state:
-                from data_provider import send_telegram_alert
-
-                pesan = f"⚛️ *{ticker.replace('=X', '')}* | `{last_close:,.5f}`\n" \
-                        f"Verdict: *{analysis['verdict']}*\n" \
-                        f"Action: {analysis['action']}"
-                send_telegram_alert(pesan)
-                st.session_state[notif_key] = True
+        # Sinyal Telegram & heartbeat 22:00 WIB diurus alert_daemon.py (service terpisah):
+        # dashboard ini murni viewer, berapapun jumlah tab yang terbuka.
 
         # --- 7. THE INTERFACE TABS ---
-        tab_q, tab_a, tab_s, tab_ai = st.tabs(["⚛️ QUANTUM DATA", "🔭 ASTRONACCI", "🏦 SMC", "🧠 AI HUB"])
+        tab_q, tab_a, tab_s, tab_ai, tab_scan = st.tabs(
+            ["⚛️ QUANTUM DATA", "🔭 ASTRONACCI", "🏦 SMC", "🧠 AI HUB", "🛰️ SCANNER"])
 
-        with tab_q:
+        with tab_q, telemetry.span("render.quantum"):
             # Menggunakan renderer dari quantum_ui.py
-            render_quantum_tab(ticker, df_active, score_res, macro, sd, "glow", "SYNCED", [])
+            render_quantum_tab(ticker, df_active, score_res, macro, sd, "glow", "STALE" if stale else "SYNCED", [])
 
-        with tab_a:
+        with tab_a, telemetry.span("render.astronacci"):
             # Menggunakan renderer dari astronacci_ui.py (High Conviction Logic)
-            render_astronacci_tab(ticker, df_active)
+            render_astronacci_tab(ticker, fib_levels, result["astro"])
 
-        with tab_s:
-            # Ambil data dari engine
-            smc_zones = deteksi_smc_v10(df_active)
-            # Render ke UI
+        with tab_s, telemetry.span("render.smc"):
+            # Zona SMC dari hasil analisa bersama, tidak dideteksi ulang
             render_smc_tab(smc_zones)
 
-        with tab_ai:
+        with tab_ai, telemetry.span("render.ai"):
             render_ai_intelligence_tab(ticker, ai_analysis)
 
+        with tab_scan, telemetry.span("render.scanner"):
+            render_scanner_tab(scanner_process)
+
+        # --- 8. PERFORMANCE DIAGNOSTICS (OPSIONAL) ---
+        with st.sidebar:
+            st.divider()
+            render_diagnostics_panel(run_id)
+
     except Exception as e:
-        st.error(f"🛑 TERMINAL CORE ERROR: {e}")
\ No newline at end of file
+        st.error(f"🛑 TERMINAL CORE ERROR: {e}")
+    finally:
+        # JSON lines + Prometheus textfile untuk scraper lokal
+        telemetry.flush()
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Sumber data pasar yang bisa diganti lewat config:
+- yahoo  : live (yfinance + GNews), default
+- replay : file lokal (Parquet/CSV bar + berita) yang diputar ulang dengan jam dipercepat,
+           untuk run offline yang deterministik, load test & benchmark pipeline penuh
+
+Pilih dengan env HAITERM_PROVIDER (fallback `market_provider` di .streamlit/secrets.toml).
+Replay: HAITERM_REPLAY_DIR (default gudang BarStore), HAITERM_REPLAY_SPEED (detik simulasi
+per detik nyata, default 60), HAITERM_REPLAY_START (ISO, default awal data + 14 hari).
+
+Layout folder replay (nama file sama dengan BarStore, jadi gudang bar live bisa langsung diputar):
+    <TICKER>__<interval>.parquet | .csv   index/kolom pertama = timestamp bar (awal bar), kolom OHLC
+    <TICKER>__1d.*                        seri harian keranjang makro (DX-Y.NYB, ^TNX, ...)
+    news.jsonl | news.csv                 published, title, topic (opsional), description, url, publisher
+"""
+import glob
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import pandas as pd
+import yfinance as yf
+from gnews import GNews
+
+from bar_store import STORE_DIR, period_to_timedelta
+from single_flight import single_flight
+from telemetry import telemetry
+
+REPLAY_DIR = os.environ.get("HAITERM_REPLAY_DIR", STORE_DIR)
+REPLAY_SPEED = float(os.environ.get("HAITERM_REPLAY_SPEED", "60"))
+REPLAY_START = os.environ.get("HAITERM_REPLAY_START")
+REPLAY_WARMUP = pd.Timedelta(days=14)
+
+
+def _span(period):
+    """'12h' / '60d' / '3mo' -> Timedelta."""
+    try:
+        return pd.Timedelta(period)
+    except ValueError:
+        return period_to_timedelta(period)
+
+
+def _utc_index(df):
+    index = pd.DatetimeIndex(df.index)
+    df.index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    return df.sort_index()
+
+
+# --- 1. INTERFACE ---
+class MarketProvider(ABC):
+    """
+    Kontrak provider (semua return None / [] kalau data tidak ada, exception dibiarkan naik
+    ke caller yang sudah punya fallback). Method abstrak: provider yang belum lengkap
+    gagal saat dibuat di get_provider(), bukan saat fetch pertama di worker thread:
+    - download_bars(ticker, interval, period=None, start=None) -> DataFrame OHLC
+    - download_macro(tickers, history) -> DataFrame close harian, kolom = ticker
+    - get_news(topic, query, period, max_results) -> list berita format GNews
+    - now() -> jam provider (UTC)
+    """
+    name = "base"
+    live = True
+
+    def now(self):
+        return pd.Timestamp.now(tz="UTC")
+
+    @abstractmethod
+    def download_bars(self, ticker, interval, period=None, start=None):
+        ...
+
+    @abstractmethod
+    def download_macro(self, tickers, history):
+        ...
+
+    @abstractmethod
+    def get_news(self, topic, query, period, max_results):
+        ...
+
+
+# --- 2. LIVE (YAHOO + GNEWS) ---
+class YahooProvider(MarketProvider):
+    name = "yahoo"
+
+    def download_bars(self, ticker, interval, period=None, start=None):
+        # Single-flight: sesi lain yang minta bar yang sama menunggu download ini
+        key = ("yahoo_bars", ticker, interval, period, str(start))
+        with telemetry.span("yahoo.bars", outbound=True, ticker=ticker, interval=interval,
+                            mode="incremental" if start is not None else "full") as sp:
+            if start is not None:
+                data = single_flight.do(key, yf.download, ticker, start=start, interval=interval, progress=False)
+            else:
+                data = single_flight.do(key, yf.download, ticker, period=period, interval=interval, progress=False)
+            return sp.payload(data)
+
+    def download_macro(self, tickers, history):
+        with telemetry.span("yahoo.macro", outbound=True) as sp:
+            data = sp.payload(single_flight.do(("yahoo_macro", tuple(tickers), history), yf.download, list(tickers),
+                                               period=history, interval="1d", progress=False, group_by="column"))
+        if data is None or data.empty:
+            return None
+        return data['Close'] if isinstance(data.columns, pd.MultiIndex) else data[['Close']]
+
+    def get_news(self, topic, query, period, max_results):
+        client = GNews(language='en', period=period, max_results=max_results)
+        with telemetry.span("gnews", outbound=True, topic=topic) as sp:
+            return sp.payload(single_flight.do(("gnews", query, period, max_results), client.get_news, query))
+
+
+# --- 3. OFFLINE REPLAY ---
+class ReplayClock:
+    """Jam simulasi: mulai di `start`, maju `speed` detik per detik nyata."""
+
+    def __init__(self, start, speed=REPLAY_SPEED):
+        self.start = start
+        self.speed = speed
+        self._t0 = time.monotonic()
+
+    def now(self):
+        # Dibulatkan ke detik: searchsorted pada index beresolusi us/ms menolak timestamp ns
+        return (self.start + pd.Timedelta(seconds=(time.monotonic() - self._t0) * self.speed)).floor("s")
+
+
+class ReplayProvider(MarketProvider):
+    """
+    Putar ulang bar & berita dari file. Hanya bar yang sudah close menurut jam replay
+    (awal bar + interval <= now) dan berita yang sudah terbit yang terlihat, jadi
+    pipeline melihat data persis seperti saat live, tanpa lookahead.
+    """
+    name = "replay"
+    live = False
+
+    def __init__(self, root=REPLAY_DIR, speed=REPLAY_SPEED, start=REPLAY_START):
+        self.root = root
+        self._frames = {}
+        self._news = None
+        self._lock = threading.Lock()
+        start = pd.Timestamp(start) if start else self._default_start()
+        self.clock = ReplayClock(start.tz_localize("UTC") if start.tz is None else start.tz_convert("UTC"), speed)
+
+    def now(self):
+        return self.clock.now()
+
+    # Storage
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker)
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.root, f"{safe}__{interval}{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _read(path):
+        if path.endswith(".parquet"):
+            return _utc_index(pd.read_parquet(path))
+        return _utc_index(pd.read_csv(path, index_col=0, parse_dates=True))
+
+    def load_bars(self, ticker, interval):
+        """Seri penuh dari file (di-cache di memori). None kalau tidak ada."""
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._frames:
+                path = self._path(ticker, interval)
+                try:
+                    self._frames[key] = self._read(path) if path else None
+                except Exception as e:
+                    print(f"Replay Read Error ({ticker} {interval}): {e}")
+                    self._frames[key] = None
+            return self._frames[key]
+
+    def _default_start(self):
+        firsts = []
+        for path in glob.glob(os.path.join(self.root, "*__15m.*")):
+            try:
+                firsts.append(self._read(path).index[0])
+            except Exception as e:
+                print(f"Replay Read Error ({os.path.basename(path)}): {e}")
+        return min(firsts) + REPLAY_WARMUP if firsts else pd.Timestamp.now(tz="UTC")
+
+    def _visible(self, df, interval, since):
+        """Bar yang sudah close di jam replay dan dimulai >= `since`."""
+        now = self.now()
+        closed_until = now - _span(interval)
+        lo = df.index.searchsorted(since) if since is not None else 0
+        hi = df.index.searchsorted(closed_until, side="right")
+        return df.iloc[lo:hi]
+
+    # Provider API
+    def download_bars(self, ticker, interval, period=None, start=None):
+        df = self.load_bars(ticker, interval)
+        if df is None:
+            return None
+        with telemetry.span("replay.bars", ticker=ticker, interval=interval) as sp:
+            since = pd.Timestamp(start) if start is not None else self.now() - _span(period or "60d")
+            since = since.tz_localize("UTC") if since.tz is None else since
+            return sp.payload(self._visible(df, interval, since))
+
+    def download_macro(self, tickers, history):
+        since = self.now() - _span(history)
+        closes = {}
+        for ticker in tickers:
+            df = self.load_bars(ticker, "1d")
+            if df is not None and 'Close' in df.columns:
+                closes[ticker] = self._visible(df, "1d", since)['Close']
+        if not closes:
+            return None
+        return pd.DataFrame(closes)
+
+    def _load_news(self):
+        with self._lock:
+            if self._news is not None:
+                return self._news
+            items = []
+            try:
+                path = os.path.join(self.root, "news.jsonl")
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        items = [json.loads(line) for line in f if line.strip()]
+                elif os.path.exists(os.path.join(self.root, "news.csv")):
+                    items = pd.read_csv(os.path.join(self.root, "news.csv")).to_dict("records")
+            except Exception as e:
+                print(f"Replay News Error: {e}")
+            news = pd.DataFrame(items, columns=sorted({"published", "title", "topic"} | {k for i in items for k in i}))
+            news['published'] = pd.to_datetime(news['published'], utc=True, errors="coerce")
+            self._news = news.dropna(subset=['published', 'title']).sort_values('published')
+            return self._news
+
+    def get_news(self, topic, query, period, max_results):
+        news = self._load_news()
+        now = self.now()
+        window = news[(news['published'] <= now) & (news['published'] > now - _span(period))]
+        if window['topic'].notna().any():
+            window = window[window['topic'].astype(str).str.upper() == topic.upper()]
+        else:
+            window = window[window['title'].str.contains(topic, case=False, regex=False)]
+
+        items = []
+        for row in window.iloc[::-1].head(max_results).to_dict("records"):
+            item = {k: v for k, v in row.items() if k not in ("published", "topic") and pd.notna(v)}
+            item["published date"] = row['published'].strftime("%a, %d %b %Y %H:%M:%S GMT")
+            items.append(item)
+        return items
+
+
+# --- 4. SELECTION ---
+PROVIDERS = {"yahoo": YahooProvider, "replay": ReplayProvider}
+
+
+def configured_provider():
+    """Nama provider dari env, fallback st.secrets, default yahoo."""
+    name = os.environ.get("HAITERM_PROVIDER")
+    if name:
+        return name.lower()
+    try:
+        import streamlit as st
+
+        return str(st.secrets.get("market_provider", "yahoo")).lower()
+    except Exception:
+        return "yahoo"
+
+
+def get_provider(name=None):
+    name = name or configured_provider()
+    if name not in PROVIDERS:
+        print(f"Unknown market provider '{name}', using yahoo")
+        name = "yahoo"
+    return PROVIDERS[name]()
+
+
+# Instance global: data_provider, macro_feed & news_service mengambil data lewat sini
+market_provider = get_provider()
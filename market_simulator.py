@@ -0,0 +1,169 @@
+"""
+Simulator pasar sintetis: OHLC dengan pergantian regime (rantai Markov) dan volatilitas
+per sesi (Asia sepi, London/NY ramai, overlap paling liar), plus weekend tutup untuk
+non-crypto. Dipakai load test & run offline lewat ReplayProvider (market_providers).
+
+Bikin dataset replay dari root repo:
+    python market_simulator.py --root /tmp/haiterm_replay --days 90
+lalu jalankan terminal dengan HAITERM_PROVIDER=replay HAITERM_REPLAY_DIR=/tmp/haiterm_replay.
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from mtf_builder import BASE_INTERVAL, TF_DURATION
+
+# drift & vol per bar (relatif terhadap vol dasar), dan lama rata-rata regime (bar)
+REGIMES = {
+    "TREND_UP":   {"drift": 0.08,  "vol": 1.0, "revert": 0.0,  "duration": 400},
+    "TREND_DOWN": {"drift": -0.08, "vol": 1.0, "revert": 0.0,  "duration": 400},
+    "RANGE":      {"drift": 0.0,   "vol": 0.7, "revert": 0.02, "duration": 600},
+    "VOLATILE":   {"drift": 0.0,   "vol": 2.5, "revert": 0.0,  "duration": 150},
+}
+
+# Multiplier volatilitas per jam UTC (Asia 00-07, London 07-12, overlap 12-16, NY 16-21, sepi 21-24)
+SESSION_VOL = np.array([0.6] * 7 + [1.2] * 5 + [1.6] * 4 + [1.1] * 5 + [0.5] * 3)
+
+BASE_VOL = 6e-4   # vol log-return per bar 15m
+START_PRICES = {
+    "EURUSD=X": 1.08, "GBPUSD=X": 1.27, "USDJPY=X": 150.0, "AUDUSD=X": 0.66, "USDCAD=X": 1.36,
+    "USDCHF=X": 0.88, "NZDUSD=X": 0.61, "GC=F": 2300.0, "SI=F": 27.0, "BTC-USD": 65000.0, "ETH-USD": 3200.0,
+    "DX-Y.NYB": 104.0, "^TNX": 4.3, "^FVX": 4.2, "^VIX": 15.0,
+}
+
+
+def is_trading_time(index, ticker):
+    """Crypto 24/7; selain itu tutup Sabtu-Minggu (UTC, disederhanakan)."""
+    if ticker.endswith("-USD"):
+        return np.ones(len(index), dtype=bool)
+    return index.dayofweek < 5
+
+
+def simulate_regimes(n, rng, regimes=REGIMES):
+    """Label regime per bar: tiap bar pindah regime dengan peluang 1/durasi regime aktif."""
+    names = list(regimes)
+    labels = np.empty(n, dtype=object)
+    current = rng.integers(len(names))
+    for i in range(n):
+        if rng.random() < 1.0 / regimes[names[current]]["duration"]:
+            current = rng.choice([k for k in range(len(names)) if k != current])
+        labels[i] = names[current]
+    return labels
+
+
+def simulate_ohlc(n, seed=42, start_price=1.1, freq="15min", start="2024-01-01", ticker="EURUSD=X",
+                  base_vol=BASE_VOL, with_regime=False):
+    """
+    OHLC sintetis deterministik `n` bar (hanya jam trading `ticker`).
+    Return DataFrame Open/High/Low/Close/Volume (+ kolom Regime kalau with_regime).
+    """
+    rng = np.random.default_rng(seed)
+    # Kalender dibuat lebih panjang lalu difilter jam trading-nya sampai dapat n bar
+    calendar = pd.date_range(start, periods=int(n * 1.5) + 10, freq=freq, tz="UTC")
+    index = calendar[is_trading_time(calendar, ticker)][:n]
+    n = len(index)
+
+    labels = simulate_regimes(n, rng)
+    params = pd.DataFrame([REGIMES[r] for r in labels])
+    bar_scale = np.sqrt(pd.Timedelta(freq) / pd.Timedelta("15min"))
+    vol = base_vol * bar_scale * params["vol"].to_numpy() * SESSION_VOL[index.hour]
+    shocks = rng.normal(0, 1, n) * vol + params["drift"].to_numpy() * vol
+
+    # Mean reversion (regime RANGE) ke rata-rata log harga 100 bar terakhir
+    log_p = np.empty(n)
+    level, anchor = np.log(start_price), np.log(start_price)
+    revert = params["revert"].to_numpy()
+    for i in range(n):
+        anchor += (level - anchor) / 100
+        level += shocks[i] - revert[i] * (level - anchor)
+        log_p[i] = level
+
+    close = np.exp(log_p)
+    open_ = np.r_[start_price, close[:-1]]
+    wick = np.abs(rng.normal(0, 0.5, (2, n))) * vol
+    df = pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + wick[0]),
+        "Low": np.minimum(open_, close) * (1 - wick[1]),
+        "Close": close,
+        "Volume": np.round(1000 * vol / base_vol * rng.lognormal(0, 0.3, n)),
+    }, index=index)
+    if with_regime:
+        df["Regime"] = labels
+    return df
+
+
+def simulate_news(topics, start, end, seed=42, every="3h"):
+    """Headline sintetis per topik (bernada bullish/bearish acak) untuk news.jsonl replay."""
+    rng = np.random.default_rng(seed)
+    up = ["rallies as data beats forecasts", "strengthens on hawkish outlook", "gains on upbeat growth data"]
+    down = ["slumps as data disappoints", "weakens on dovish comments", "falls amid growth worries"]
+    items = []
+    for t in pd.date_range(start, end, freq=every, tz="UTC"):
+        for topic in topics:
+            if rng.random() < 0.5:
+                phrase = rng.choice(up if rng.random() < 0.5 else down)
+                items.append({"published": t.isoformat(), "topic": topic, "title": f"{topic} {phrase}",
+                              "publisher": {"title": "SIM WIRE"}})
+    return items
+
+
+def write_replay_dataset(root, tickers=None, days=90, seed=42, end=None, base_interval=BASE_INTERVAL):
+    """
+    Tulis dataset lengkap untuk ReplayProvider: bar `base_interval` tiap ticker,
+    seri harian keranjang makro, dan news.jsonl. Return path root.
+    Import data layer di sini saja: provider global baru dibuat saat dipanggil,
+    jadi caller sempat mengatur env HAITERM_PROVIDER / HAITERM_REPLAY_* dulu.
+    """
+    from data_provider import get_forex_list
+    from macro_feed import MACRO_BASKET
+    from news_service import get_news_legs
+
+    tickers = tickers or get_forex_list()
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.now(tz="UTC").floor("D")
+    end = end.tz_localize("UTC") if end.tz is None else end
+    start = end - pd.Timedelta(days=days)
+    os.makedirs(root, exist_ok=True)
+
+    def path(ticker, interval):
+        return os.path.join(root, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', ticker)}__{interval}.parquet")
+
+    def bars_between(lo, freq, ticker):
+        calendar = pd.date_range(lo, end, freq=freq, inclusive="left")
+        return int(is_trading_time(calendar, ticker).sum())
+
+    freq = TF_DURATION[base_interval]
+    topics = set()
+    for k, ticker in enumerate(tickers):
+        df = simulate_ohlc(bars_between(start, freq, ticker), seed=seed + k, start_price=START_PRICES.get(ticker, 1.0),
+                           freq=freq, start=start, ticker=ticker)
+        df.to_parquet(path(ticker, base_interval))
+        topics.update(topic for topic, _ in get_news_legs(ticker))
+
+    # Makro harian mulai 120 hari lebih awal: MacroFeed butuh histori 3 bulan sejak awal replay
+    macro_start = start - pd.Timedelta(days=120)
+    for k, ticker in enumerate(MACRO_BASKET.values()):
+        df = simulate_ohlc(bars_between(macro_start, "1D", ticker), seed=seed + 100 + k,
+                           start_price=START_PRICES.get(ticker, 100.0), freq="1D", start=macro_start, ticker=ticker)
+        df.to_parquet(path(ticker, "1d"))
+
+    with open(os.path.join(root, "news.jsonl"), "w", encoding="utf-8") as f:
+        for item in simulate_news(sorted(topics), start, end, seed=seed):
+            f.write(json.dumps(item) + "\n")
+    return root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic replay dataset.")
+    parser.add_argument("--root", required=True)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tickers", help="dipisah koma (default semua asset terminal)")
+    args = parser.parse_args()
+
+    tickers = args.tickers.split(",") if args.tickers else None
+    print(f"Replay dataset written: {write_replay_dataset(args.root, tickers, args.days, args.seed)}")
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Urutan timeframe dari yang paling halus ke paling kasar
+TIMEFRAMES = ["15m", "1h", "4h", "1d"]
+BASE_INTERVAL = "15m"
+TF_DURATION = {
+    "15m": pd.Timedelta(minutes=15),
+    "1h": pd.Timedelta(hours=1),
+    "4h": pd.Timedelta(hours=4),
+    "1d": pd.Timedelta(days=1),
+}
+
+
+def get_session_anchor(ticker):
+    """
+    Jam pergantian hari trading per instrumen (timezone, jam rollover).
+    Forex & Futures (Gold/Silver) ikut rollover New York 17:00,
+    Crypto 24/7 pakai tengah malam UTC.
+    """
+    if ticker.endswith("-USD"):
+        return "UTC", 0
+    return "America/New_York", 17
+
+
+def higher_timeframes(tf):
+    """Semua timeframe yang lebih besar dari `tf`."""
+    if tf not in TIMEFRAMES:
+        return []
+    return TIMEFRAMES[TIMEFRAMES.index(tf) + 1:]
+
+
+def resample_ohlc(df, tf, ticker):
+    """
+    Agregasi bar halus ke timeframe `tf` dengan bucket yang sejajar sesi:
+    bucket 4h/1d dimulai dari jam rollover (mis. 17:00 NY untuk Forex),
+    bukan dari tengah malam UTC. Open=first, High=max, Low=min, Close=last.
+    """
+    if df is None or df.empty:
+        return df
+
+    tz, roll_hour = get_session_anchor(ticker)
+    src_index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+
+    # Jam dinding lokal dikurangi jam rollover -> hari trading dimulai di 00:00
+    wall = src_index.tz_convert(tz).tz_localize(None) - pd.Timedelta(hours=roll_hour)
+    keys = wall.floor(TF_DURATION[tf]).values
+
+    # Bar sudah urut waktu, jadi tiap bucket adalah potongan kontigu
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:] - 1, len(df) - 1]
+
+    out = {
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in df.columns:
+        out['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+
+    # Label bucket = jam mulai bucket (waktu lokal sesi), dikembalikan ke tz asal
+    labels = pd.DatetimeIndex(keys[starts]) + pd.Timedelta(hours=roll_hour)
+    labels = labels.tz_localize(tz, ambiguous=np.ones(len(labels), dtype=bool), nonexistent="shift_forward")
+    labels = labels.tz_convert(src_index.tz)
+
+    return pd.DataFrame(out, index=labels)
+
+
+def build_timeframes(df_base, ticker, targets=TIMEFRAMES, base_tf=BASE_INTERVAL):
+    """
+    Multi-Timeframe Builder: dari satu seri dasar (paling halus),
+    bangun semua timeframe target secara lokal. Tidak ada download kedua.
+    """
+    if df_base is None or df_base.empty:
+        return {}
+
+    frames = {}
+    for tf in targets:
+        if tf == base_tf:
+            frames[tf] = df_base
+        elif TF_DURATION[tf] > TF_DURATION[base_tf]:
+            frames[tf] = resample_ohlc(df_base, tf, ticker)
+    return frames
@@ -0,0 +1,132 @@
+import hashlib
+import re
+import threading
+import time
+
+from market_providers import market_provider
+from telemetry import telemetry
+
+from sentiment_engine import score_to_vote, sentiment_scorer
+
+NEWS_TTL = 300  # detik; berita 12 jam terakhir tidak perlu ditarik tiap rerun
+RED_FLAGS = ["NFP", "FOMC", "CPI", "FED", "INTEREST RATE", "PAYROLLS"]
+
+# Instrumen non-Forex dipetakan ke topik berita masing-masing
+_TOPIC_MAP = {
+    "GC=F": [("GOLD", 1)],
+    "SI=F": [("SILVER", 1)],
+    "BTC-USD": [("BITCOIN", 1)],
+    "ETH-USD": [("ETHEREUM", 1)],
+}
+
+
+def get_news_legs(ticker):
+    """
+    Pecah ticker jadi topik berita + arah pengaruhnya ke harga.
+    EURUSD=X -> EUR (+1), USD (-1): berita positif USD = bearish untuk EURUSD.
+    Pair lain yang berbagi mata uang (EUR, USD) memakai query yang sama.
+    """
+    if ticker in _TOPIC_MAP:
+        return _TOPIC_MAP[ticker]
+    if ticker.endswith("=X"):
+        pair = ticker.replace("=X", "")
+        return [(pair[:3], 1), (pair[3:6], -1)]
+    return [(ticker.replace("=F", ""), 1)]
+
+
+def headline_hash(title):
+    """Hash judul yang sudah dinormalisasi (lowercase, spasi dirapikan) untuk dedupe."""
+    norm = re.sub(r"\s+", " ", str(title)).strip().lower()
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+class NewsService:
+    """
+    Satu pintu masuk berita: satu query provider berita (GNews / replay) per topik (mata uang),
+    di-cache dengan TTL dan dipakai bersama oleh semua ticker & sesi.
+    """
+
+    def __init__(self, ttl=NEWS_TTL, period="12h", max_results=5):
+        self.ttl = ttl
+        self.period = period
+        self.max_results = max_results
+        self._topics = {}   # topik -> (timestamp, list berita)
+        self._digests = {}  # ticker -> (stamp topik, digest)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, topic):
+        with self._guard:
+            return self._locks.setdefault(topic, threading.Lock())
+
+    def _query(self, topic):
+        if len(topic) == 3:
+            return f"{topic} forex news"
+        return f"{topic} market news"
+
+    def get_topic(self, topic):
+        """Berita satu topik dari cache; tarik ulang ke provider hanya kalau TTL habis."""
+        # Lock per topik: thread kedua untuk topik yang sama menunggu hasil thread pertama
+        with self._lock(topic):
+            cached = self._topics.get(topic)
+            if cached and time.time() - cached[0] < self.ttl:
+                return cached
+
+            try:
+                items = market_provider.get_news(topic, self._query(topic), self.period, self.max_results)
+                entry = (time.time(), items or [], True)
+            except Exception as e:
+                print(f"News Fetch Error ({topic}): {e}")
+                # Sumber gagal: pakai berita lama (kalau ada), coba lagi setelah 60 detik
+                entry = (time.time() - self.ttl + 60, cached[1] if cached else [], False)
+
+            self._topics[topic] = entry
+            return entry
+
+    def get_digest(self, ticker):
+        """
+        Satu kali fetch -> red flags + skor sentimen.
+        Return {"headlines", "red_flags", "sentiment": (val, label, top 3 judul),
+        "stale_topics": topik yang fetch terakhirnya gagal (berita lama / kosong)}.
+        """
+        legs = get_news_legs(ticker)
+        fetched = [(self.get_topic(topic), sign) for topic, sign in legs]
+        stamp = tuple(entry[0] for entry, _ in fetched)
+
+        cached = self._digests.get(ticker)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        # Dedupe headline lintas topik (berita EUR/USD sering muncul di dua query)
+        headlines = []
+        seen = set()
+        for (_, items, _), sign in fetched:
+            for n in items:
+                h = headline_hash(n.get('title', ''))
+                if h in seen:
+                    continue
+                seen.add(h)
+                headlines.append({**n, "hash": h, "sign": sign})
+
+        red_flags = [n['title'] for n in headlines if any(key in n['title'].upper() for key in RED_FLAGS)]
+
+        # Satu panggilan batch; headline yang pernah dinilai diambil dari memo
+        with telemetry.span("news.sentiment", headlines=len(headlines)):
+            polarities = sentiment_scorer.score_batch([n['title'] for n in headlines])
+        score = sum(n['sign'] * score_to_vote(pol) for n, pol in zip(headlines, polarities))
+
+        label = "BULLISH" if score > 0 else ("BEARISH" if score < 0 else "NEUTRAL")
+        val = 1 if score > 0 else (-1 if score < 0 else 0)
+
+        digest = {
+            "headlines": headlines,
+            "red_flags": red_flags,
+            "sentiment": (val, label, [n['title'] for n in headlines[:3]]),
+            "stale_topics": [topic for (topic, _), (entry, _) in zip(legs, fetched) if not entry[2]],
+        }
+        self._digests[ticker] = (stamp, digest)
+        return digest
+
+
+# Instance global: dipakai bersama oleh semua sesi dalam satu proses
+news_service = NewsService()
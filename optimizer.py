@@ -0,0 +1,252 @@
+"""
+Optimizer: sweep parameter sinyal (grid / random search) lintas ticker dengan
+walk-forward split, paralel di process pool. Tiap worker meng-cache stage
+backtest_engine per kunci parameternya, jadi kombinasi yang hanya beda
+threshold trigger tidak menghitung ulang indikator, Fibonacci, skor atau FVG.
+Jalankan dari root repo: python optimizer.py EURUSD=X GC=F --tf 1h --random 200
+"""
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import backtest_engine as bt
+from bar_store import bar_store
+from mtf_builder import BASE_INTERVAL
+
+# Ruang parameter default. floor_tolerance & conviction_score tidak disweep:
+# di generate_ai_judgment keduanya hanya mengubah label/confidence, bukan plan.
+DEFAULT_SPACE = {
+    "min_score": [4, 5, 6, 7],
+    "golden_tolerance": [None, 0.001, 0.0015, 0.0018, 0.002, 0.003],
+    "score_tolerance": [0.001, 0.0015, 0.002],
+    "plan_min_score": [4, 5, 6],
+    # Mode swing (default live): anchor ditentukan kekuatan fractal; fib_window di mode ini
+    # hanya fallback sebelum pivot pertama, jadi tidak disweep (hasil identik setelah warmup)
+    "swing_strength": [3, 5, 8],
+    # Kalibrasi filter pivot signifikan; default live (SWING_MIN_PROMINENCE) tetap 0
+    # sampai hasil walk-forward di sini menunjukkan nilai lain lebih baik
+    "swing_prominence": [0.0, 1.5, 3.0],
+    "smc_lookback": [30, 50, 80],
+    "target": ["tp1", "tp2"],
+    "entry_expiry": [12, 24, 48],
+}
+
+OBJECTIVES = ("expectancy_r", "total_r", "win_rate")
+
+# Parameter yang menentukan tiap stage yang di-cache (sisanya murah: trigger, plan, simulasi)
+_STAGE_KEYS = ("fib_mode", "fib_window", "swing_strength", "swing_prominence", "score_tolerance", "smc_lookback")
+
+
+# --- 1. SEARCH SPACE & SPLITS ---
+def grid_combos(space):
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[k] for k in names))]
+
+
+def random_combos(space, n, seed=42):
+    """`n` kombinasi unik. Nilai list = pilih acak, tuple (lo, hi) = uniform (int kalau keduanya int)."""
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if isinstance(spec, tuple):
+            lo, hi = spec
+            return rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else rng.uniform(lo, hi)
+        return rng.choice(spec)
+
+    combos, seen = [], set()
+    for _ in range(n * 20):
+        combo = {k: draw(v) for k, v in space.items()}
+        key = tuple(sorted(combo.items(), key=lambda kv: kv[0]))
+        if key not in seen:
+            seen.add(key)
+            combos.append(combo)
+        if len(combos) >= n:
+            break
+    return combos
+
+
+def walk_forward_splits(n, n_folds=4, anchored=True, start=bt.WARMUP):
+    """
+    Bagi [start, n) jadi n_folds + 1 segmen. Fold i: train = segmen 0..i
+    (anchored) atau segmen i saja (rolling), test = segmen i + 1.
+    Return list (train_start, train_end, test_start, test_end) dalam posisi bar.
+    """
+    edges = np.linspace(start, n, n_folds + 2).astype(int)
+    return [(int(edges[0] if anchored else edges[i]), int(edges[i + 1]), int(edges[i + 1]), int(edges[i + 2]))
+            for i in range(n_folds)]
+
+
+# --- 2. WORKER (STAGE CACHE PER PROSES) ---
+_DATA = {}
+_DXY = False
+_CACHE = {}
+
+
+def _init_worker(data, dxy=False):
+    """Initializer pool: seri dasar opsional (mis. data sintetis) selain BarStore, plus DXY harian."""
+    global _DATA, _DXY
+    _DATA = data or {}
+    _DXY = dxy
+
+
+def _cached(key, fn, *args):
+    if key not in _CACHE:
+        _CACHE[key] = fn(*args)
+    return _CACHE[key]
+
+
+def _load_context(ticker, tf, base_tf):
+    df_base = _DATA.get(ticker)
+    if df_base is None:
+        df_base = bar_store.load(ticker, base_tf)
+    if df_base is None or df_base.empty:
+        return None
+    return bt.prepare_frame(df_base, ticker, tf, base_tf, _DXY)
+
+
+def _segment(trades, index, start, end):
+    lo = index[start]
+    mask = trades['signal_at'] >= lo
+    if end < len(index):
+        mask &= trades['signal_at'] < index[end]
+    return trades[mask]
+
+
+def evaluate_combo(ticker, tf, base_tf, params, n_folds=4, anchored=True):
+    """Backtest satu kombinasi lalu ringkas per fold walk-forward (train & test)."""
+    base = (ticker, tf, base_tf)
+    ctx = _cached(base, _load_context, ticker, tf, base_tf)
+    if ctx is None:
+        return []
+
+    p = {**bt.DEFAULT_PARAMS, **params}
+    fib_key = (p['fib_window'], p['fib_mode'], p['swing_strength'], p['swing_prominence'])
+    fib = _cached(base + ("fib",) + fib_key, bt.fib_stage, ctx, *fib_key)
+    score = _cached(base + ("score",) + fib_key + (p['score_tolerance'],),
+                    bt.score_stage, ctx, fib, p['score_tolerance'])
+    zones = _cached(base + ("zones", p['smc_lookback']), bt.zone_stage, ctx, p['smc_lookback'])
+
+    signals = bt.plan_signals(ctx, fib, score, zones, **p)
+    trades = bt.simulate_trades(ctx['df'], signals, **p)
+
+    index = ctx['df'].index
+    rows = []
+    for fold, (tr0, tr1, te0, te1) in enumerate(walk_forward_splits(len(index), n_folds, anchored)):
+        for phase, a, b in (("train", tr0, tr1), ("test", te0, te1)):
+            summary = bt.summarize_trades(_segment(trades, index, a, b))
+            rows.append({"ticker": ticker, "tf": tf, "fold": fold, "phase": phase, **summary})
+    return rows
+
+
+def _evaluate_chunk(ticker, tf, base_tf, combos, n_folds, anchored):
+    rows = []
+    for combo_id, params in combos:
+        try:
+            for row in evaluate_combo(ticker, tf, base_tf, params, n_folds, anchored):
+                rows.append({"combo_id": combo_id, **row})
+        except Exception as e:
+            print(f"Optimizer Error ({ticker} {tf} #{combo_id}): {e}")
+    return rows
+
+
+# --- 3. DRIVER ---
+def _pooled(results, objective):
+    """Agregat lintas ticker per (tf, fold, phase, combo): R & trade dijumlah dulu, baru dibagi."""
+    g = results.groupby(["tf", "fold", "phase", "combo_id"], as_index=False)[["trades", "wins", "total_r"]].sum()
+    trades = g['trades'].replace(0, np.nan)
+    g['expectancy_r'] = (g['total_r'] / trades).fillna(0.0)
+    g['win_rate'] = (g['wins'] / trades).fillna(0.0)
+    g['objective'] = g[objective]
+    return g
+
+
+def run_optimizer(tickers, timeframes=("1h",), space=None, n_random=None, n_folds=4, anchored=True,
+                  objective="expectancy_r", min_trades=10, base_tf=BASE_INTERVAL, workers=None,
+                  data=None, seed=42, dxy=None):
+    """
+    Sweep semua kombinasi di `space` (grid, atau `n_random` sampel acak) untuk
+    tiap ticker x timeframe, lalu walk-forward: per fold pilih kombinasi terbaik
+    di train (gabungan semua ticker, minimal `min_trades` trade) dan laporkan hasil test-nya.
+    Skor memuat komponen Macro dari DXY harian seperti trigger live (`dxy`: lihat bt.resolve_dxy).
+    Return dict:
+    - results: metrik per combo x ticker x fold x phase
+    - walk_forward: pilihan per fold + performa out-of-sample
+    - best: parameter pilihan fold terakhir per timeframe (paling baru)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    space = space or DEFAULT_SPACE
+    dxy = bt.resolve_dxy(dxy)  # sekali di parent, dikirim ke tiap worker
+    combos = random_combos(space, n_random, seed) if n_random else grid_combos(space)
+
+    # Urutkan per kunci stage supaya satu chunk memakai cache stage yang sama
+    def stage_key(item):
+        return tuple(str(item[1].get(k, bt.DEFAULT_PARAMS[k])) for k in _STAGE_KEYS)
+    indexed = sorted(enumerate(combos), key=stage_key)
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [(t, tf) for t in tickers for tf in timeframes]
+    chunk = max(1, -(-len(indexed) * len(jobs) // (workers * 4)))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data, dxy)) as pool:
+        futures = [pool.submit(_evaluate_chunk, t, tf, base_tf, indexed[i:i + chunk], n_folds, anchored)
+                   for t, tf in jobs for i in range(0, len(indexed), chunk)]
+        for fut in as_completed(futures):
+            rows.extend(fut.result())
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return {"results": results, "walk_forward": pd.DataFrame(), "best": {}}
+
+    params = pd.DataFrame(combos)
+    pooled = _pooled(results, objective)
+    train = pooled[(pooled['phase'] == "train") & (pooled['trades'] >= min_trades)]
+    test = pooled[pooled['phase'] == "test"].set_index(["tf", "fold", "combo_id"])
+
+    wf_rows, best = [], {}
+    for (tf, fold), grp in train.groupby(["tf", "fold"]):
+        pick = grp.sort_values(["objective", "trades"], ascending=False).iloc[0]
+        combo_id = int(pick['combo_id'])
+        oos = test.loc[(tf, fold, combo_id)]
+        wf_rows.append({
+            "tf": tf, "fold": fold, "combo_id": combo_id,
+            "train_objective": pick['objective'], "train_trades": int(pick['trades']),
+            "test_objective": oos['objective'], "test_trades": int(oos['trades']), "test_total_r": oos['total_r'],
+            **combos[combo_id],
+        })
+        best[tf] = combos[combo_id]
+
+    return {
+        "results": results.merge(params, left_on="combo_id", right_index=True),
+        "walk_forward": pd.DataFrame(wf_rows),
+        "best": best,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward parameter sweep for HAITERM signal thresholds.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--tf", nargs="+", default=["1h"])
+    parser.add_argument("--base", default=BASE_INTERVAL, help="interval seri dasar di BarStore")
+    parser.add_argument("--random", type=int, default=None, help="jumlah sampel random search (default: full grid)")
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--rolling", action="store_true", help="train window bergeser (default: anchored)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="expectancy_r")
+    parser.add_argument("--min-trades", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    out = run_optimizer(args.tickers, args.tf, n_random=args.random, n_folds=args.folds,
+                        anchored=not args.rolling, objective=args.objective, min_trades=args.min_trades,
+                        base_tf=args.base, workers=args.workers)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(out['walk_forward'].to_string(index=False) if not out['walk_forward'].empty
+              else "Not enough trades to select parameters.")
+    for tf, params in out['best'].items():
+        print(f"[{tf}] recommended: {params}")
@@ -0,0 +1,175 @@
+from datetime import datetime
+
+import pytz
+
+from ai_analyst import generate_strategic_verdict
+from ai_hub import generate_ai_judgment
+from analysis_dag import AnalysisDAG
+from astrology_engine import get_astrology_status
+from data_provider import get_forex_list
+from engine import calculate_fibonacci_levels, get_detailed_scores_v10, hitung_htf_bias
+from fibonacci_engine import get_astronacci_setup
+from incremental_engine import hitung_indikator_inkremental
+from market_sessions import get_market_sessions
+from mtf_builder import TIMEFRAMES, build_timeframes
+from smc_engine import deteksi_smc_v10
+from telemetry import telemetry
+
+NEUTRAL_NEWS = {"headlines": [], "red_flags": [], "sentiment": (0, "NEUTRAL", [])}
+
+TZ_JKT = pytz.timezone('Asia/Jakarta')
+
+# Memo per view (ticker x timeframe): tiap stage hanya menyimpan versi terbaru per view,
+# jadi pass scanner atas semua asset tidak menggusur hasil tampilan utama
+analysis_dag = AnalysisDAG(identity=("ticker", "tf"), views=len(get_forex_list()) * len(TIMEFRAMES))
+telemetry.add_collector("dag_stage", "stage", analysis_dag.stats)
+
+
+def explain_sentiment(raw_news):
+    """Judul berita teratas (dipotong 75 karakter) sebagai alasan sentimen."""
+    if not raw_news:
+        return "No major news headlines found"
+
+    first_item = raw_news[0]
+    # Cek: Apakah item pertama itu Dictionary atau String?
+    if isinstance(first_item, dict):
+        top_title = first_item.get('title', str(first_item))
+    else:
+        top_title = str(first_item)
+
+    # Potong teks agar rapi di UI
+    return (top_title[:75] + '...') if len(top_title) > 75 else top_title
+
+
+# --- 1. CONTENT KEYS ---
+def bars_key(ticker, df):
+    """Sidik jari seri bar: panjang + bar terakhir (bar yang direvisi ikut mengubah key)."""
+    if df is None or df.empty:
+        return (ticker, 0)
+    last = df.iloc[-1]
+    return (ticker, len(df), df.index[0], df.index[-1],
+            float(last['Open']), float(last['High']), float(last['Low']), float(last['Close']))
+
+
+def news_key(news):
+    def title(item):
+        return item.get('title', str(item)) if isinstance(item, dict) else str(item)
+
+    si, sd, raw = news["sentiment"]
+    return (si, sd, tuple(title(x) for x in raw), tuple(title(x) for x in news["red_flags"]))
+
+
+def clock_key(now_jkt=None):
+    """Sesi & status langit hanya berubah per jam WIB."""
+    now_jkt = now_jkt or datetime.now(TZ_JKT)
+    return now_jkt.strftime('%Y%m%d%H')
+
+
+# --- 2. STAGES ---
+@analysis_dag.stage("frames", deps=("@ticker", "@bars"))
+def _frames(ticker, bars):
+    return build_timeframes(bars, ticker)
+
+
+@analysis_dag.stage("indicators", deps=("@ticker", "@tf", "frames"))
+def _indicators(ticker, tf, frames):
+    return hitung_indikator_inkremental((ticker, tf), frames.get(tf))
+
+
+@analysis_dag.stage("fib", deps=("@ticker", "@tf", "indicators"))
+def _fib(ticker, tf, indicators):
+    return calculate_fibonacci_levels(indicators, key=(ticker, tf))
+
+
+@analysis_dag.stage("htf_bias", deps=("@tf", "frames"))
+def _htf_bias(tf, frames):
+    return hitung_htf_bias(frames, tf)
+
+
+# @ticker ikut di dependensi supaya slot memo sentimen per asset (berita per mata uang)
+@analysis_dag.stage("sentiment", deps=("@ticker", "@news"))
+def _sentiment(ticker, news):
+    si, sd, raw_news = news["sentiment"]
+    return {"si": si, "sd": sd, "raw": raw_news,
+            "explanation": explain_sentiment(raw_news), "alerts": news["red_flags"]}
+
+
+@analysis_dag.stage("score", deps=("indicators", "@macro", "sentiment", "fib", "htf_bias"))
+def _score(indicators, macro, sentiment, fib, htf_bias):
+    return get_detailed_scores_v10(indicators, macro, sentiment["si"], fib, htf_bias, sentiment["explanation"])
+
+
+@analysis_dag.stage("smc", deps=("indicators",))
+def _smc(indicators):
+    return deteksi_smc_v10(indicators)
+
+
+@analysis_dag.stage("verdict", deps=("@ticker", "indicators", "score", "fib", "sentiment"))
+def _verdict(ticker, indicators, score, fib, sentiment):
+    return generate_strategic_verdict(ticker, score, fib, indicators['Close'].iloc[-1], sentiment["alerts"])
+
+
+@analysis_dag.stage("judgment", deps=("indicators", "score", "fib", "smc"))
+def _judgment(indicators, score, fib, smc):
+    return generate_ai_judgment(score, fib, smc, indicators['Close'].iloc[-1])
+
+
+@analysis_dag.stage("sessions", deps=("@clock",))
+def _sessions(clock):
+    return get_market_sessions()
+
+
+@analysis_dag.stage("astro", deps=("indicators", "fib", "@clock"))
+def _astro(indicators, fib, clock):
+    return {"celestial": get_astrology_status(),
+            "setup": get_astronacci_setup(fib, indicators['Close'].iloc[-1])}
+
+
+# --- 3. ENTRY POINT ---
+def run_analysis(ticker, tf, df_base, macro, news=None):
+    """
+    Pipeline lengkap satu asset & timeframe (dipakai tampilan utama, scanner & alert daemon):
+    frames -> indikator -> Fibonacci -> bias HTF -> Quantum score -> SMC -> verdict -> AI judgment,
+    plus sesi market & Astronacci. Tiap stage di-memo pada content key inputnya (analysis_dag),
+    jadi rerun tanpa bar/berita baru tidak menghitung ulang apa pun, dan frames dipakai
+    bersama semua timeframe satu ticker. Return None kalau frame `tf` belum cukup data.
+    """
+    news = news or NEUTRAL_NEWS
+    inputs = {
+        "ticker": (ticker, ticker),
+        "tf": (tf, tf),
+        "bars": (df_base, bars_key(ticker, df_base)),
+        "macro": (macro, tuple(sorted((k, repr(v)) for k, v in macro.items()))),
+        "news": (news, news_key(news)),
+        "clock": (None, clock_key()),
+    }
+
+    # Cek kecukupan data dulu; run penuh berikutnya memakai memo frames & indikator
+    df_active = analysis_dag.run(inputs, targets=("indicators",))["indicators"]
+    if df_active is None or len(df_active) < 2:
+        return None
+
+    out = analysis_dag.run(inputs)
+    sentiment = out["sentiment"]
+    fib_levels = out["fib"]
+    last_close = df_active['Close'].iloc[-1]
+    golden = fib_levels.get('61.8% (Golden)', 0)
+    return {
+        "ticker": ticker,
+        "tf": tf,
+        "frames": out["frames"],
+        "df_active": df_active,
+        "last_close": last_close,
+        "sentiment": (sentiment["si"], sentiment["sd"], sentiment["raw"]),
+        "sentiment_explanation": sentiment["explanation"],
+        "news_alerts": sentiment["alerts"],
+        "fib_levels": fib_levels,
+        "htf_bias": out["htf_bias"],
+        "score_res": out["score"],
+        "smc_zones": out["smc"],
+        "analysis": out["verdict"],
+        "ai_analysis": out["judgment"],
+        "sessions": out["sessions"],
+        "astro": out["astro"],
+        "golden_dist": abs(last_close - golden) / golden if golden > 0 else float("inf"),
+    }
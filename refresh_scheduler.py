@@ -0,0 +1,77 @@
+import pandas as pd
+
+from mtf_builder import TF_DURATION, get_session_anchor
+
+REFRESH_GRACE = 10   # detik setelah bar close: beri waktu provider mem-publish bar baru
+PRICE_TICK = 30      # detik antar update header harga (= jeda sync BarStore)
+MAX_SLEEP = 3600     # saat market tutup tetap bangun tiap jam (jam, sesi, status feed)
+MIN_RERUN = 5
+
+
+def _now(now=None):
+    return pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now).tz_convert("UTC")
+
+
+def is_market_open(ticker, now=None):
+    """
+    Jam buka instrumen (acuan New York):
+    - Crypto (-USD): 24/7
+    - Forex: Minggu 17:00 s/d Jumat 17:00
+    - Futures (=F): sama, plus jeda maintenance harian CME 17:00-18:00
+    """
+    if ticker.endswith("-USD"):
+        return True
+    ny = _now(now).tz_convert("America/New_York")
+    weekday, hour = ny.weekday(), ny.hour
+    if weekday == 5 or (weekday == 4 and hour >= 17) or (weekday == 6 and hour < 17):
+        return False
+    if ticker.endswith("=F") and hour == 17:
+        return False
+    return True
+
+
+def next_market_open(ticker, now=None):
+    """Awal jam pertama market buka lagi (atau `now` kalau sedang buka)."""
+    now = _now(now)
+    if is_market_open(ticker, now):
+        return now
+    start = now.floor("h")
+    for k in range(1, 24 * 4):
+        candidate = start + pd.Timedelta(hours=k)
+        if is_market_open(ticker, candidate):
+            return candidate
+    return now + pd.Timedelta(seconds=MAX_SLEEP)
+
+
+def next_bar_close(ticker, tf, now=None):
+    """
+    Waktu close bar `tf` yang sedang berjalan, dengan batas bucket yang sama
+    seperti mtf_builder.resample_ohlc (sejajar jam rollover sesi).
+    """
+    now = _now(now)
+    tz, roll_hour = get_session_anchor(ticker)
+    wall = now.tz_convert(tz).tz_localize(None) - pd.Timedelta(hours=roll_hour)
+    close_wall = wall.floor(TF_DURATION[tf]) + TF_DURATION[tf] + pd.Timedelta(hours=roll_hour)
+    return close_wall.tz_localize(tz, ambiguous=True, nonexistent="shift_forward").tz_convert("UTC")
+
+
+def refresh_plan(ticker, tf, now=None, grace=REFRESH_GRACE, price_tick=PRICE_TICK):
+    """
+    Jadwal refresh terminal:
+    - rerun_in: detik sampai pipeline berat perlu jalan lagi (bar `tf` close, atau market buka lagi)
+    - wake_at: waktu UTC rerun tersebut
+    - tick_every: interval update header harga di antaranya (None saat market tutup)
+    """
+    now = _now(now)
+    market_open = is_market_open(ticker, now)
+    if market_open:
+        wake_at = next_bar_close(ticker, tf, now) + pd.Timedelta(seconds=grace)
+    else:
+        wake_at = min(next_market_open(ticker, now), now + pd.Timedelta(seconds=MAX_SLEEP))
+
+    return {
+        "market_open": market_open,
+        "wake_at": wake_at,
+        "rerun_in": max(int((wake_at - now).total_seconds()), MIN_RERUN),
+        "tick_every": price_tick if market_open else None,
+    }
@@ -0,0 +1,285 @@
+"""
+Scanner Engine: pipeline penuh semua ticker x timeframe di PROSES TERPISAH
+(kerja pandas/NumPy memegang GIL, jadi kalau jalan di proses Streamlit akan
+bersaing dengan rerun tampilan utama). Proses scanner menulis tabel ranking
+ke file snapshot; tab SCANNER di dashboard hanya membaca file itu.
+
+Jalankan dari root repo: python scanner_engine.py [--once] [--interval 60]
+(dashboard menjalankannya sendiri lewat ScannerProcess saat Background Scan / SCAN NOW).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from data_provider import fetch_forex_data, fetch_macro_data, get_forex_list, get_news_digest
+from mtf_builder import BASE_INTERVAL, TIMEFRAMES
+from pipeline import run_analysis
+from telemetry import telemetry
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".haiterm_cache")
+SNAPSHOT_PATH = os.environ.get("HAITERM_SCAN_SNAPSHOT", os.path.join(CACHE_DIR, "scan_snapshot.json"))
+LOCK_PATH = SNAPSHOT_PATH + ".lock"
+
+SCAN_INTERVAL = 60  # detik antar putaran scan background
+SCAN_WORKERS = 4    # thread di proses scanner (overlap fetch I/O); tidak berbagi GIL dengan dashboard
+SCAN_NICE = 10      # prioritas CPU proses scanner diturunkan supaya tampilan aktif menang
+
+SCAN_COLUMNS = ['Asset', 'TF', 'Score', 'Judgment', 'Confidence', 'Golden Dist %', 'Price',
+                'Verdict', 'SMC', 'Entry', 'Updated']
+
+
+def scan_row(res):
+    """Ringkas hasil run_analysis jadi satu baris tabel scanner."""
+    ai = res['ai_analysis']
+    return {
+        'Asset': res['ticker'].replace('=X', ''),
+        'TF': res['tf'],
+        'Score': res['score_res']['total'],
+        'Judgment': ai['judgement'],
+        'Confidence': ai['confidence'],
+        'Golden Dist %': res['golden_dist'] * 100,
+        'Price': float(res['last_close']),
+        'Verdict': res['analysis']['verdict'],
+        'SMC': ai['smc_logic'],
+        'Entry': ai['plan']['entry'],
+        'Updated': res['df_active'].index[-1],
+    }
+
+
+def rank_rows(rows):
+    """Tabel ranking: |Score| terbesar, lalu confidence AI, lalu paling dekat Golden Ratio."""
+    if not rows:
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+
+    table = pd.DataFrame(rows, columns=SCAN_COLUMNS)
+    table['_abs'] = table['Score'].abs()
+    table = table.sort_values(['_abs', 'Confidence', 'Golden Dist %'], ascending=[False, False, True])
+    return table.drop(columns='_abs').reset_index(drop=True)
+
+
+# --- 1. SCANNER (JALAN DI PROSES SCANNER) ---
+class MarketScanner:
+    """
+    Scanner multi-asset: satu fetch bar + satu digest berita per ticker, satu
+    snapshot makro per putaran. Tiap ticker selesai, snapshot ditulis ulang
+    (atomik) supaya baris baru langsung terlihat di dashboard.
+    """
+
+    def __init__(self, tickers=None, timeframes=TIMEFRAMES, workers=SCAN_WORKERS, interval=SCAN_INTERVAL,
+                 snapshot_path=SNAPSHOT_PATH):
+        self.tickers = tickers
+        self.timeframes = timeframes
+        self.interval = interval
+        self.snapshot_path = snapshot_path
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="haiterm-scan")
+        self._rows = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.scanning = False
+        self.mode = "once"
+        self.last_scan_at = None
+        self.last_scan_seconds = 0.0
+
+    def _scan_ticker(self, ticker, macro):
+        try:
+            df_base = fetch_forex_data(ticker, "max", BASE_INTERVAL)
+            if df_base is None or df_base.empty:
+                raise ValueError("no price data")
+            news = get_news_digest(ticker)
+        except Exception as e:
+            print(f"Scanner Error ({ticker}): {e}")
+            with self._lock:
+                self._errors[ticker] = str(e)
+            self.publish()
+            return
+
+        for tf in self.timeframes:
+            try:
+                res = run_analysis(ticker, tf, df_base, macro, news)
+            except Exception as e:
+                print(f"Scanner Error ({ticker} {tf}): {e}")
+                res = None
+            if res is None:
+                continue
+            with self._lock:
+                self._rows[(ticker, tf)] = scan_row(res)
+                self._errors.pop(ticker, None)
+        self.publish()
+
+    def scan_once(self):
+        """Satu putaran penuh (blocking)."""
+        started = time.monotonic()
+        self.scanning = True
+        self.publish()
+        try:
+            macro = fetch_macro_data()
+            tickers = self.tickers or get_forex_list()
+            wait([self._pool.submit(self._scan_ticker, t, macro) for t in tickers])
+            self.last_scan_seconds = time.monotonic() - started
+            self.last_scan_at = time.time()
+            telemetry.record("scanner.pass", self.last_scan_seconds, tickers=len(tickers))
+            telemetry.flush()
+        finally:
+            self.scanning = False
+            self.publish()
+
+    def run_forever(self):
+        self.mode = "loop"
+        while True:
+            try:
+                self.scan_once()
+            except Exception as e:
+                print(f"Scanner Loop Error: {e}")
+            time.sleep(self.interval)
+
+    def publish(self):
+        """Tulis snapshot (baris, error, status) ke disk secara atomik."""
+        with self._lock:
+            rows = [{**row, 'Updated': row['Updated'].isoformat()} for row in self._rows.values()]
+            data = {
+                "pid": os.getpid(),
+                "mode": self.mode,
+                "scanning": self.scanning,
+                "written_at": time.time(),
+                "last_scan_at": self.last_scan_at,
+                "last_scan_seconds": self.last_scan_seconds,
+                "expected_rows": len(self.tickers or get_forex_list()) * len(self.timeframes),
+                "rows": rows,
+                "errors": dict(self._errors),
+            }
+        try:
+            with self._write_lock:
+                os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+                tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+                os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            print(f"Scanner Snapshot Error: {e}")
+
+
+# --- 2. CLIENT (DIPAKAI DASHBOARD) ---
+class ScannerProcess:
+    """
+    Sisi dashboard: menjalankan / menghentikan proses scanner (loop background atau
+    sekali jalan) dan membaca snapshot-nya. Tidak ada analisa yang jalan di proses ini.
+    """
+
+    def __init__(self, snapshot_path=SNAPSHOT_PATH, interval=SCAN_INTERVAL, timeframes=TIMEFRAMES):
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.timeframes = timeframes
+        self._proc = None
+        self._mode = None
+        self._lock = threading.Lock()
+
+    def _spawn(self, *args):
+        env = {**os.environ, "HAITERM_ROLE": "scanner", "HAITERM_SCAN_SNAPSHOT": self.snapshot_path}
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), *args], env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def _alive(self):
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        with self._lock:
+            if self._alive() and self._mode == "loop":
+                return
+            if self._alive():
+                # Putaran sekali jalan dihentikan dulu supaya lock proses scanner lepas
+                self._proc.terminate()
+                self._proc.wait(timeout=10)
+            self._proc, self._mode = self._spawn("--interval", str(self.interval)), "loop"
+
+    def stop(self):
+        with self._lock:
+            if self._alive() and self._mode == "loop":
+                self._proc.terminate()
+            self._mode = None
+
+    def scan_async(self):
+        """Picu satu putaran di proses terpisah tanpa menunggu hasilnya."""
+        with self._lock:
+            if self._alive():
+                return
+            self._proc, self._mode = self._spawn("--once"), "once"
+
+    @property
+    def running(self):
+        return self._alive() and self._mode == "loop"
+
+    @property
+    def scanning(self):
+        return self._alive() and bool(self._read().get("scanning"))
+
+    @property
+    def last_scan_at(self):
+        return self._read().get("last_scan_at")
+
+    @property
+    def last_scan_seconds(self):
+        return self._read().get("last_scan_seconds") or 0.0
+
+    @property
+    def expected_rows(self):
+        return self._read().get("expected_rows") or len(get_forex_list()) * len(self.timeframes)
+
+    # --- 3. VIEWS ---
+    def _read(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # Snapshot ditulis atomik; error di sini = file rusak / versi lama
+            print(f"Scanner Snapshot Read Error: {e}")
+            return {}
+
+    def snapshot(self):
+        table = rank_rows(self._read().get("rows", []))
+        if not table.empty:
+            table['Updated'] = pd.to_datetime(table['Updated'], utc=True)
+        return table
+
+    def errors(self):
+        return dict(self._read().get("errors", {}))
+
+
+# Instance global: satu proses scanner per server dashboard, dipakai bersama semua sesi
+scanner_process = ScannerProcess()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless HAITERM multi-asset scanner.")
+    parser.add_argument("--once", action="store_true", help="satu putaran lalu keluar")
+    parser.add_argument("--interval", type=int, default=SCAN_INTERVAL)
+    args = parser.parse_args()
+
+    telemetry.set_role(os.environ.get("HAITERM_ROLE", "scanner"))
+    if hasattr(os, "nice"):
+        os.nice(SCAN_NICE)
+
+    from alert_daemon import SingleInstanceLock
+
+    lock = SingleInstanceLock(LOCK_PATH)
+    if not lock.acquire():
+        raise SystemExit(f"Another scanner process is already running ({LOCK_PATH}).")
+    try:
+        scanner = MarketScanner(interval=args.interval)
+        if args.once:
+            scanner.scan_once()
+        else:
+            scanner.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        lock.release()
@@ -0,0 +1,59 @@
+import time
+
+import streamlit as st
+
+
+@st.fragment(run_every=5)
+def _render_scan_table(scanner):
+    """Tabel di-refresh sendiri tiap 5 detik: baris baru muncul tanpa rerun seluruh terminal."""
+    table = scanner.snapshot()
+
+    status = "SCANNING" if scanner.scanning else ("LIVE" if scanner.running else "IDLE")
+    age = f"{int(time.time() - scanner.last_scan_at)}s ago" if scanner.last_scan_at else "never"
+    st.caption(f"Status: {status} · Rows: {len(table)}/{scanner.expected_rows} · "
+               f"Last full scan: {age} ({scanner.last_scan_seconds:.1f}s)")
+
+    if table.empty:
+        st.info("No scan results yet. Start the background scan or run a one-shot scan.")
+    else:
+        # Header kolom bisa diklik untuk sort ulang; default sudah urut ranking scanner
+        st.dataframe(
+            table,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Score": st.column_config.NumberColumn("Score", format="%+d"),
+                "Confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=100, format="%d%%"),
+                "Golden Dist %": st.column_config.NumberColumn("Golden Dist %", format="%.3f"),
+                "Price": st.column_config.NumberColumn("Price", format="%.5f"),
+                "Entry": st.column_config.NumberColumn("Entry", format="%.5f"),
+                "Updated": st.column_config.DatetimeColumn("Last Bar", format="MMM DD HH:mm"),
+            },
+        )
+
+    errors = scanner.errors()
+    if errors:
+        st.caption("⚠️ Feed errors: " + ", ".join(f"{t} ({e})" for t, e in errors.items()))
+
+
+def render_scanner_tab(scanner):
+    """
+    Multi-Asset Scanner: ranking semua ticker x timeframe berdasarkan
+    Quantum score, AI confidence, dan jarak ke Golden Ratio.
+    """
+    st.markdown("<h3 style='color:#888; font-family:sans-serif; letter-spacing:2px;'>MARKET SCANNER</h3>",
+                unsafe_allow_html=True)
+
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        auto = st.toggle("Background Scan", value=scanner.running, key="scanner_auto")
+        if auto and not scanner.running:
+            scanner.start()
+        elif not auto and scanner.running:
+            scanner.stop()
+    with c2:
+        if st.button("⟳ SCAN NOW", disabled=scanner.scanning, key="scanner_once"):
+            scanner.scan_async()
+            st.toast("Scan started in background", icon="🛰️")
+
+    _render_scan_table(scanner)
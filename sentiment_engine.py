@@ -0,0 +1,94 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 4096
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".haiterm_cache", "sentiment_cache.json")
+
+_textblob = None
+
+
+def _load_textblob():
+    """Import TextBlob saat skor pertama dibutuhkan, bukan saat modul di-import (~0.3 detik)."""
+    global _textblob
+    if _textblob is None:
+        from textblob import TextBlob
+        _textblob = TextBlob
+    return _textblob
+
+
+def normalize_headline(text):
+    """Kunci cache: lowercase + spasi dirapikan (polarity TextBlob tidak case-sensitive)."""
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+class SentimentScorer:
+    """
+    Skor polarity headline per batch dengan memo LRU terbatas.
+    Headline yang sama (lintas ticker/rerun) hanya dinilai sekali.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, persist_path=None):
+        self.maxsize = maxsize
+        self.persist_path = persist_path
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                self._memo.update(json.load(f))
+        except Exception as e:
+            print(f"Sentiment Cache Read Error: {e}")
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
+            tmp = f"{self.persist_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._memo, f)
+            os.replace(tmp, self.persist_path)
+        except Exception as e:
+            print(f"Sentiment Cache Write Error: {e}")
+
+    def score_batch(self, headlines):
+        """Polarity (-1..1) untuk setiap headline, urutan sama dengan input."""
+        keys = [normalize_headline(h) for h in headlines]
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            misses = [k for k in dict.fromkeys(keys) if k not in self._memo]
+            if misses:
+                blob = _load_textblob()
+                for k in misses:
+                    self._memo[k] = blob(k).sentiment.polarity
+
+            scores = []
+            for k in keys:
+                self._memo.move_to_end(k)
+                scores.append(self._memo[k])
+
+            while len(self._memo) > self.maxsize:
+                self._memo.popitem(last=False)
+
+            if misses and self.persist_path:
+                self._save()
+
+        return scores
+
+
+def score_to_vote(pol, threshold=0.1):
+    """Polarity -> suara +1 / -1 / 0 (ambang 0.1 seperti engine lama)."""
+    return 1 if pol > threshold else (-1 if pol < -threshold else 0)
+
+
+# Instance global dengan cache persisten di disk
+sentiment_scorer = SentimentScorer(persist_path=CACHE_PATH)
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Request coalescing se-proses: caller yang datang bersamaan dengan key yang
+    sama tidak memicu request baru, tapi menunggu request yang sedang jalan
+    dan ikut memakai hasilnya (atau exception-nya). Tidak ada caching:
+    begitu request selesai, caller berikutnya memicu request baru.
+    Key berupa tuple; elemen pertama = grup metrik (mis. "yahoo_bars").
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _group(self, key):
+        name = key[0] if isinstance(key, tuple) and key else str(key)
+        return self._metrics.setdefault(name, {
+            "calls": 0, "executed": 0, "coalesced": 0, "errors": 0, "in_flight": 0, "busy_seconds": 0.0,
+        })
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            stats = self._group(key)
+            stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                stats["executed"] += 1
+                stats["in_flight"] += 1
+            else:
+                call.waiters += 1
+                stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+        else:
+            started = time.monotonic()
+            try:
+                call.result = fn(*args, **kwargs)
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    stats["in_flight"] -= 1
+                    stats["busy_seconds"] += time.monotonic() - started
+                    if call.error is not None:
+                        stats["errors"] += 1
+                call.event.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def metrics(self):
+        """Snapshot metrik per grup, termasuk rasio request yang berhasil digabung."""
+        with self._lock:
+            snap = {name: dict(stats) for name, stats in self._metrics.items()}
+        for stats in snap.values():
+            stats["coalesce_ratio"] = stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        return snap
+
+
+# Instance global: semua request keluar (Yahoo, GNews) lewat sini
+single_flight = SingleFlight()
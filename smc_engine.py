@@ -1,62 +1,164 @@
+import numpy as np
 import pandas as pd
 
+_BLOCK = 64
 
-def deteksi_smc_v10(df):
+
+def _scan(v, lv, pos, limit, result, active):
+    """Cek maksimal _BLOCK bar ke depan dari `pos` (vektor untuk semua query)."""
+    n = len(v)
+    for step in range(_BLOCK):
+        idx = pos + step
+        check = active & (idx < limit)
+        if not check.any():
+            break
+        hit = check & (v[np.minimum(idx, n - 1)] <= lv)
+        result[hit] = idx[hit]
+        active &= ~hit
+
+
+def first_cross_index(values, starts, levels, below=True):
+    """
+    Untuk tiap query (start, level): indeks pertama i >= start di mana
+    values[i] <= level (below=True) atau values[i] >= level (below=False).
+    Return len(values) kalau tidak pernah tersentuh.
+
+    Tanpa loop per bar: blok pertama discan, lalu lompat antar blok lewat
+    sparse table minimum per blok, lalu scan di dalam blok yang ketemu.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    lv = np.asarray(levels, dtype=np.float64)
+    if not below:
+        v, lv = -v, -lv
+    starts = np.asarray(starts, dtype=np.int64)
+    n = len(v)
+    result = np.full(len(starts), n, dtype=np.int64)
+    if n == 0 or len(starts) == 0:
+        return result
+
+    # 1. Sisa blok tempat query dimulai
+    active = starts < n
+    block_end = np.minimum((starts // _BLOCK + 1) * _BLOCK, n)
+    _scan(v, lv, starts, block_end, result, active)
+    if not active.any():
+        return result
+
+    # 2. Blok pertama berikutnya yang minimumnya menyentuh level (binary lifting)
+    block_min = np.minimum.reduceat(v, np.arange(0, n, _BLOCK))
+    nb = len(block_min)
+    table = [block_min]
+    while 2 ** len(table) <= nb:
+        prev, half = table[-1], 2 ** (len(table) - 1)
+        table.append(np.minimum(prev[:-half], prev[half:]))
+
+    pos = starts // _BLOCK + 1
+    for k in range(len(table) - 1, -1, -1):
+        level_k = table[k]
+        fits = active & (pos + 2 ** k <= nb)
+        jump = fits & (level_k[np.minimum(pos, len(level_k) - 1)] > lv)
+        pos[jump] += 2 ** k
+
+    # 3. Scan di dalam blok yang ketemu (pasti ada sentuhan di situ)
+    found = active & (pos < nb)
+    _scan(v, lv, pos * _BLOCK, np.minimum(pos * _BLOCK + _BLOCK, n), result, found)
+    return result
+
+
+def deteksi_fvg_history(df):
+    """
+    FVG Engine vektor: semua Bullish/Bearish FVG di seluruh histori beserta
+    siklus hidupnya terhadap jalur harga SETELAH gap terbentuk:
+    - first_touch: bar pertama harga masuk ke zona
+    - mitigated: bar pertama zona tertutup penuh
+    - fill_pct: persentase zona yang sudah terisi sampai bar terakhir
+    Indeks posisi -1 / NaT = belum terjadi.
+    """
+    columns = ['type', 'formed_idx', 'formed_at', 'top', 'bottom', 'mid', 'size',
+               'first_touch_idx', 'first_touch_at', 'mitigated_idx', 'mitigated_at', 'fill_pct', 'status']
+    if df is None or len(df) < 3:
+        return pd.DataFrame(columns=columns)
+
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    n = len(df)
+
+    # Rumus bullish: Low candle sekarang > High 2 candle lalu (dan kebalikannya untuk bearish)
+    bull_idx = np.flatnonzero(low[2:] > high[:-2]) + 2
+    bear_idx = np.flatnonzero(high[2:] < low[:-2]) + 2
+
+    # Running min/max ke depan: ekstrem harga setelah gap terbentuk sampai bar terakhir
+    suffix_min = np.r_[np.minimum.accumulate(low[::-1])[::-1], np.inf]
+    suffix_max = np.r_[np.maximum.accumulate(high[::-1])[::-1], -np.inf]
+
+    # Bullish: harga turun kembali ke gap -> cek Low terhadap top (sentuh) & bottom (mitigasi)
+    b_top, b_bot = low[bull_idx], high[bull_idx - 2]
+    b_touch = first_cross_index(low, bull_idx + 1, b_top, below=True)
+    b_mitig = first_cross_index(low, bull_idx + 1, b_bot, below=True)
+    b_fill = (b_top - suffix_min[bull_idx + 1]) / (b_top - b_bot)
+
+    # Bearish: harga naik kembali ke gap -> cek High terhadap bottom (sentuh) & top (mitigasi)
+    s_top, s_bot = low[bear_idx - 2], high[bear_idx]
+    s_touch = first_cross_index(high, bear_idx + 1, s_bot, below=False)
+    s_mitig = first_cross_index(high, bear_idx + 1, s_top, below=False)
+    s_fill = (suffix_max[bear_idx + 1] - s_bot) / (s_top - s_bot)
+
+    formed = np.r_[bull_idx, bear_idx]
+    order = np.argsort(formed, kind="stable")
+    top = np.r_[b_top, s_top][order]
+    bottom = np.r_[b_bot, s_bot][order]
+    touch = np.r_[b_touch, s_touch][order]
+    mitig = np.r_[b_mitig, s_mitig][order]
+    formed = formed[order]
+
+    touch = np.where(touch < n, touch, -1)
+    mitig = np.where(mitig < n, mitig, -1)
+    index = df.index
+
+    def _at(pos):
+        return pd.Series(index[np.maximum(pos, 0)]).where(pos >= 0).to_numpy()
+
+    return pd.DataFrame({
+        'type': np.r_[np.full(len(bull_idx), 'BULLISH FVG'), np.full(len(bear_idx), 'BEARISH FVG')][order],
+        'formed_idx': formed,
+        'formed_at': index[formed].to_numpy(),
+        'top': top,
+        'bottom': bottom,
+        'mid': (top + bottom) / 2,
+        'size': top - bottom,
+        'first_touch_idx': touch,
+        'first_touch_at': _at(touch),
+        'mitigated_idx': mitig,
+        'mitigated_at': _at(mitig),
+        'fill_pct': np.clip(np.r_[b_fill, s_fill][order], 0, 1) * 100,
+        'status': np.where(mitig >= 0, 'Filled', 'Unfilled'),
+    }, columns=columns)
+
+
+def deteksi_smc_v10(df, lookback=50):
     """
     SMC Intelligence Engine:
     Mendeteksi Fair Value Gaps (FVG) sebagai jejak institusi/bank besar.
     Termasuk perhitungan Mid-Level (50%) untuk akurasi entry.
+    Status 'Filled' kalau zona pernah tertutup penuh oleh jalur harga setelah terbentuk.
     """
     if df is None or len(df) < 5:
         return []
 
-    fvg_zones = []
-    # Kita cek 50 candle terakhir untuk mencari area ketidakseimbangan (Imbalance)
-    # Gunakan copy agar tidak merusak dataframe asli
-    subset = df.tail(50).copy()
-    current_price = df['Close'].iloc[-1]
+    zones = deteksi_fvg_history(df)
     atr_value = df['ATR'].iloc[-1] if 'ATR' in df.columns else 0
 
-    # Loop mulai dari index ke-2 karena butuh data 3 candle berurutan
-    for i in range(2, len(subset)):
-
-        # --- 1. BULLISH FVG (Area Magnet untuk BUY) ---
-        # Rumus: Low Candle Sekarang > High 2 Candle Lalu
-        if subset['Low'].iloc[i] > subset['High'].iloc[i - 2]:
-            top = subset['Low'].iloc[i]
-            bottom = subset['High'].iloc[i - 2]
-            mid = (top + bottom) / 2
-
-            # Cek apakah FVG ini sudah tertutup (Mitigated) atau belum
-            # Jika harga sekarang sudah turun menembus batas bawah FVG, dianggap 'Filled'
-            status = "Unfilled" if current_price > bottom else "Filled"
-
-            fvg_zones.append({
-                'type': 'BULLISH FVG',
-                'top': top,
-                'bottom': bottom,
-                'mid': mid,  # Harga entry "Golden" di tengah kotak
-                'status': status,
-                'strength': 'Strong' if (top - bottom) > (atr_value * 0.5) else 'Weak'
-            })
-
-        # --- 2. BEARISH FVG (Area Magnet untuk SELL) ---
-        # Rumus: High Candle Sekarang < Low 2 Candle Lalu
-        elif subset['High'].iloc[i] < subset['Low'].iloc[i - 2]:
-            top = subset['Low'].iloc[i - 2]
-            bottom = subset['High'].iloc[i]
-            mid = (top + bottom) / 2
-
-            # Jika harga sekarang sudah naik menembus batas atas FVG, dianggap 'Filled'
-            status = "Unfilled" if current_price < top else "Filled"
-
-            fvg_zones.append({
-                'type': 'BEARISH FVG',
-                'top': top,
-                'bottom': bottom,
-                'mid': mid,  # Harga entry "Golden" di tengah kotak
-                'status': status,
-                'strength': 'Strong' if (top - bottom) > (atr_value * 0.5) else 'Weak'
-            })
-
-    return fvg_zones
\ No newline at end of file
+    # Kita tampilkan FVG yang terbentuk di `lookback` candle terakhir (sama seperti window lama)
+    zones = zones[zones['formed_idx'] >= len(df) - lookback + 2]
+
+    return [{
+        'type': z.type,
+        'top': z.top,
+        'bottom': z.bottom,
+        'mid': z.mid,  # Harga entry "Golden" di tengah kotak
+        'status': z.status,
+        'strength': 'Strong' if z.size > (atr_value * 0.5) else 'Weak',
+        'fill_pct': z.fill_pct,
+        'formed_at': z.formed_at,
+        'first_touch_at': z.first_touch_at,
+        'mitigated_at': z.mitigated_at,
+    } for z in zones.itertuples(index=False)]
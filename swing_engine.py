@@ -0,0 +1,185 @@
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Kekuatan fractal default: pivot harus ekstrem terhadap 5 bar kiri & 5 bar kanan
+SWING_STRENGTH = 5
+# Filter pivot signifikan (x rata-rata range bar di jendela fractal-nya); 0 = semua pivot
+# fractal. Belum dikalibrasi: naikkan hanya dari hasil optimizer (param swing_prominence)
+SWING_MIN_PROMINENCE = 0.0
+
+
+def deteksi_fractal_pivots(high, low, left=SWING_STRENGTH, right=SWING_STRENGTH, min_prominence=0.0):
+    """
+    Pivot fractal terkonfirmasi di seluruh seri dalam satu pass vektor.
+    Pivot high: High > semua High `left` bar kiri dan >= semua High `right` bar kanan
+    (kebalikannya untuk pivot low). Bar tanpa `right` bar sesudahnya belum terkonfirmasi.
+    `min_prominence` > 0: pivot hanya dihitung kalau jaraknya ke ekstrem lawan di jendela
+    yang sama >= min_prominence x rata-rata range bar jendela itu (hanya data s/d konfirmasi).
+    Return (indeks pivot high, indeks pivot low).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(high)
+    span = left + right + 1
+    if n < span:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    hw = sliding_window_view(high, span)
+    lw = sliding_window_view(low, span)
+    h_mid = high[left:n - right]
+    l_mid = low[left:n - right]
+
+    is_high = h_mid >= hw[:, left + 1:].max(axis=1) if right else np.ones(len(h_mid), bool)
+    is_low = l_mid <= lw[:, left + 1:].min(axis=1) if right else np.ones(len(l_mid), bool)
+    if left:
+        is_high &= h_mid > hw[:, :left].max(axis=1)
+        is_low &= l_mid < lw[:, :left].min(axis=1)
+    if min_prominence > 0:
+        threshold = min_prominence * (hw - lw).mean(axis=1)
+        is_high &= h_mid - lw.min(axis=1) >= threshold
+        is_low &= hw.max(axis=1) - l_mid >= threshold
+
+    return np.flatnonzero(is_high) + left, np.flatnonzero(is_low) + left
+
+
+def swing_leg(high, low, pivot_highs, pivot_lows):
+    """
+    Leg swing signifikan terakhir: pivot high & pivot low terkonfirmasi terakhir,
+    diperlebar dengan ekstrem harga setelah pivot yang lebih baru (supaya leg
+    selalu memuat harga sekarang). Return dict atau None kalau pivot belum lengkap.
+    """
+    if len(pivot_highs) == 0 or len(pivot_lows) == 0:
+        return None
+
+    h_idx, l_idx = int(pivot_highs[-1]), int(pivot_lows[-1])
+    newer = max(h_idx, l_idx)
+    swing_high = max(float(high[h_idx]), float(np.max(high[newer:])))
+    swing_low = min(float(low[l_idx]), float(np.min(low[newer:])))
+
+    return {
+        "swing_high": swing_high,
+        "swing_low": swing_low,
+        "high_idx": h_idx,
+        "low_idx": l_idx,
+        "direction": "UP" if l_idx < h_idx else "DOWN",
+    }
+
+
+def get_swing_anchors(df, left=SWING_STRENGTH, right=SWING_STRENGTH, min_prominence=SWING_MIN_PROMINENCE):
+    """Anchor Fibonacci dari leg swing signifikan terakhir sebuah frame OHLC."""
+    if df is None or df.empty:
+        return None
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    ph, pl = deteksi_fractal_pivots(high, low, left, right, min_prominence)
+    return swing_leg(high, low, ph, pl)
+
+
+class SwingTracker:
+    """
+    Versi inkremental: simpan pivot yang sudah terkonfirmasi, dan saat bar
+    baru masuk (atau bar terakhir direvisi) hanya ekor seri yang diperiksa ulang.
+    """
+
+    def __init__(self, left=SWING_STRENGTH, right=SWING_STRENGTH, min_prominence=SWING_MIN_PROMINENCE):
+        self.left = left
+        self.right = right
+        self.min_prominence = min_prominence
+        self.n = 0
+        self.index = None
+        self.pivot_highs = np.empty(0, dtype=np.int64)
+        self.pivot_lows = np.empty(0, dtype=np.int64)
+        self.tail = (np.empty(0), np.empty(0))  # High/Low bar confirmed di batas konfirmasi
+
+    def update(self, high, low):
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+
+        # Center pertama yang jendela kanannya bisa berubah (bar terakhir lama bisa direvisi)
+        first = max(self.n - 1 - self.right, 0) if self.n else 0
+        if len(high) < self.n:
+            first = 0
+
+        self.pivot_highs = self.pivot_highs[self.pivot_highs < first]
+        self.pivot_lows = self.pivot_lows[self.pivot_lows < first]
+
+        offset = max(first - self.left, 0)
+        ph, pl = deteksi_fractal_pivots(high[offset:], low[offset:], self.left, self.right, self.min_prominence)
+        ph, pl = ph + offset, pl + offset
+        self.pivot_highs = np.r_[self.pivot_highs, ph[ph >= first]]
+        self.pivot_lows = np.r_[self.pivot_lows, pl[pl >= first]]
+        self.n = len(high)
+        # Pivot sebelum `first` berikutnya bergantung pada `left + right` bar sebelum bar terakhir
+        lo = self.tail_start()
+        self.tail = (high[lo:self.n - 1].copy(), low[lo:self.n - 1].copy())
+        return self.pivot_highs, self.pivot_lows
+
+    def tail_start(self):
+        return max(self.n - 1 - self.left - self.right, 0)
+
+    def leg(self, high, low):
+        """Update lalu kembalikan leg swing terakhir."""
+        self.update(high, low)
+        return swing_leg(np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64),
+                         self.pivot_highs, self.pivot_lows)
+
+
+class SwingEngine:
+    """
+    Registry SwingTracker per seri (mis. ticker + timeframe), pola yang sama dengan
+    incremental_engine.IndicatorEngine: kalau frame baru hanya menambah bar / merevisi
+    bar terakhir, hanya ekor seri yang diperiksa; selain itu tracker dibangun ulang.
+    Leg identik dengan get_swing_anchors pada frame yang sama.
+    """
+
+    def __init__(self):
+        self._trackers = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def reset(self, key=None):
+        with self._guard:
+            if key is None:
+                self._trackers.clear()
+            else:
+                self._trackers.pop(key, None)
+
+    @staticmethod
+    def _can_resume(tracker, df):
+        if tracker is None or tracker.n == 0 or len(df) < tracker.n:
+            return False
+        last = tracker.n - 1
+        if df.index[0] != tracker.index[0] or df.index[last] != tracker.index[last]:
+            return False
+        # Bar yang direvisi tanpa ganti timestamp (resync BarStore, resample sesi berjalan):
+        # High/Low di batas konfirmasi harus sama dengan yang dipakai pivot tersimpan
+        lo = tracker.tail_start()
+        return (np.array_equal(df['High'].to_numpy()[lo:last].astype(np.float64), tracker.tail[0])
+                and np.array_equal(df['Low'].to_numpy()[lo:last].astype(np.float64), tracker.tail[1]))
+
+    def leg(self, key, df):
+        if df is None or df.empty:
+            return None
+        with self._lock(key):
+            tracker = self._trackers.get(key)
+            if not self._can_resume(tracker, df):
+                tracker = SwingTracker()
+            leg = tracker.leg(df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64))
+            tracker.index = df.index
+            self._trackers[key] = tracker
+        return leg
+
+
+# Instance global: tracker dipakai bersama semua sesi dalam satu proses
+swing_engine = SwingEngine()
+
+
+def get_swing_anchors_inkremental(key, df):
+    """Versi stateful get_swing_anchors: hanya ekor seri yang diperiksa ulang per bar baru."""
+    return swing_engine.leg(key, df)
@@ -0,0 +1,70 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class TelegramStub:
+    """
+    Server HTTP lokal pengganti api.telegram.org untuk tes offline dispatcher.
+    Semua sendMessage dicatat di `messages`; `fail_with` berisi antrean status
+    HTTP yang dikembalikan lebih dulu (mis. [429, 502]) untuk simulasi gangguan.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, retry_after=1):
+        self.messages = []
+        self.fail_with = []
+        self.retry_after = retry_after
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+
+                if stub.fail_with:
+                    status = stub.fail_with.pop(0)
+                    body = {"ok": False, "error_code": status, "description": "stubbed failure"}
+                    if status == 429:
+                        body["parameters"] = {"retry_after": stub.retry_after}
+                else:
+                    status = 200
+                    stub.messages.append({"path": self.path, **form})
+                    body = {"ok": True, "result": {"message_id": len(stub.messages)}}
+
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    # Jalankan: python telegram_stub.py lalu set TELEGRAM_API_BASE=http://127.0.0.1:8081
+    stub = TelegramStub(port=8081)
+    print(f"Telegram stub listening on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
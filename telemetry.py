@@ -0,0 +1,245 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+from single_flight import single_flight
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".haiterm_cache")
+LOG_PATH = os.environ.get("HAITERM_TELEMETRY_LOG", os.path.join(CACHE_DIR, "telemetry.jsonl"))
+PROM_PATH = os.environ.get("HAITERM_PROM_FILE", os.path.join(CACHE_DIR, "haiterm.prom"))
+SINKS_ENABLED = os.environ.get("HAITERM_TELEMETRY", "1") != "0"
+# Peran proses: tiap peran (dashboard, daemon, ...) menulis file sink sendiri,
+# jadi counter dua proses tidak saling timpa di satu file
+PROCESS_ROLE = os.environ.get("HAITERM_ROLE", "dashboard")
+
+LOG_MAX_BYTES = 20 * 1024 * 1024   # telemetry.jsonl dirotasi ke .1 setelah ini
+RECENT_SPANS = 2000                # span terakhir yang disimpan di memori (panel diagnostik)
+
+# Span yang sedang terbuka & run id aktif. contextvars (bukan thread-local) supaya
+# ikut terbawa ke thread pool fetch lewat contextvars.copy_context().
+_STACK = contextvars.ContextVar("haiterm_span_stack", default=())
+_RUN = contextvars.ContextVar("haiterm_run", default=None)
+
+
+def role_path(path, role):
+    """telemetry.jsonl -> telemetry-daemon.jsonl (nama file sink per peran proses)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{role}{ext}"
+
+
+def payload_size(value):
+    """(rows, bytes) ukuran payload: DataFrame -> baris & memori, teks -> byte, koleksi -> item."""
+    if value is None:
+        return None, None
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value), int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, (bytes, str)):
+        return None, len(value)
+    if isinstance(value, (list, tuple, dict, set)):
+        return len(value), None
+    return None, None
+
+
+class Span:
+    __slots__ = ("name", "attrs", "outbound", "cacheable", "cache", "rows", "bytes", "error", "outbound_seen")
+
+    def __init__(self, name, outbound, cacheable, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.outbound = outbound
+        self.cacheable = cacheable
+        self.cache = None
+        self.rows = None
+        self.bytes = None
+        self.error = None
+        self.outbound_seen = False
+
+    def payload(self, value):
+        self.rows, self.bytes = payload_size(value)
+        return value
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Telemetry:
+    """
+    Instrumentasi span: wall time, cache hit/miss, ukuran payload per stage & call keluar.
+    Span `cacheable` otomatis dianggap "miss" kalau ada span `outbound` (Yahoo, GNews,
+    Telegram) yang jalan di dalamnya, selain itu "hit". Tiap span masuk ke agregat
+    per nama (untuk Prometheus textfile), buffer JSON lines, dan ring buffer terbaru.
+    File sink & label `role` mengikuti peran proses (lihat set_role).
+    """
+
+    def __init__(self, log_path=LOG_PATH, prom_path=PROM_PATH, sinks=SINKS_ENABLED, role=PROCESS_ROLE):
+        self.base_log_path = log_path
+        self.base_prom_path = prom_path
+        self.sinks = sinks
+        self.set_role(role)
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._recent = deque(maxlen=RECENT_SPANS)
+        self._pending = []
+        self._agg = {}
+        self._collectors = [("singleflight", "group", single_flight.metrics)]
+        self._runs = itertools.count(1)
+
+    def set_role(self, role):
+        """Ganti peran proses (dipanggil entry point, mis. alert_daemon) sebelum flush pertama."""
+        self.role = role
+        self.log_path = role_path(self.base_log_path, role)
+        self.prom_path = role_path(self.base_prom_path, role)
+
+    # --- 1. RECORDING ---
+    def begin_run(self, label="rerun"):
+        """Tandai awal satu rerun; semua span di konteks ini (dan fetch turunannya) membawa run id-nya."""
+        run_id = f"{label}-{next(self._runs)}"
+        _RUN.set(run_id)
+        return run_id
+
+    @contextmanager
+    def span(self, name, outbound=False, cacheable=False, **attrs):
+        sp = Span(name, outbound, cacheable, attrs)
+        parents = _STACK.get()
+        token = _STACK.set(parents + (sp,))
+        started = time.perf_counter()
+        try:
+            yield sp
+        except Exception as e:
+            sp.error = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            _STACK.reset(token)
+            if outbound:
+                for parent in parents:
+                    parent.outbound_seen = True
+            if cacheable and sp.cache is None:
+                sp.cache = "miss" if sp.outbound_seen else "hit"
+            self.record(name, seconds, cache=sp.cache, rows=sp.rows, nbytes=sp.bytes, error=sp.error, **sp.attrs)
+
+    def record(self, name, seconds, cache=None, rows=None, nbytes=None, error=None, **attrs):
+        """Catat satu span yang sudah selesai (dipakai span() dan stage DAG)."""
+        entry = {"ts": round(time.time(), 3), "run": _RUN.get(), "span": name, "ms": round(seconds * 1000, 3),
+                 "thread": threading.current_thread().name}
+        if cache is not None:
+            entry["cache"] = cache
+        if rows is not None:
+            entry["rows"] = rows
+        if nbytes is not None:
+            entry["bytes"] = nbytes
+        if error is not None:
+            entry["error"] = error
+        entry.update(attrs)
+
+        with self._lock:
+            agg = self._agg.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                              "hits": 0, "misses": 0, "errors": 0, "bytes": 0})
+            agg["count"] += 1
+            agg["seconds"] += seconds
+            agg["max_seconds"] = max(agg["max_seconds"], seconds)
+            agg["hits"] += cache == "hit"
+            agg["misses"] += cache == "miss"
+            agg["errors"] += error is not None
+            if nbytes is not None:
+                agg["bytes"] = nbytes
+            self._recent.append(entry)
+            if self.sinks:
+                self._pending.append(entry)
+        return entry
+
+    def add_collector(self, prefix, label, fn):
+        """Sumber metrik tambahan untuk Prometheus: fn() -> {label_value: {metric: angka}}."""
+        with self._lock:
+            self._collectors.append((prefix, label, fn))
+
+    # --- 2. VIEWS ---
+    def run_spans(self, run_id):
+        with self._lock:
+            return [dict(e) for e in self._recent if e["run"] == run_id]
+
+    def summary(self):
+        with self._lock:
+            return {name: dict(agg) for name, agg in self._agg.items()}
+
+    def collected(self):
+        with self._lock:
+            collectors = list(self._collectors)
+        out = {}
+        for prefix, label, fn in collectors:
+            try:
+                out[prefix] = (label, fn())
+            except Exception as e:
+                print(f"Telemetry Collector Error ({prefix}): {e}")
+        return out
+
+    # --- 3. SINKS ---
+    def prometheus_text(self):
+        """Format text exposition Prometheus (dibaca node_exporter textfile collector / scraper lokal)."""
+        lines = []
+
+        def family(metric, kind, helptext, samples):
+            lines.append(f"# HELP {metric} {helptext}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in {"role": self.role, **labels}.items())
+                lines.append(f"{metric}{{{label_str}}} {float(value):.6g}")
+
+        spans = self.summary()
+        family("haiterm_span_count_total", "counter", "Completed spans.",
+               [({"span": n}, a["count"]) for n, a in spans.items()])
+        family("haiterm_span_seconds_total", "counter", "Total wall time per span.",
+               [({"span": n}, a["seconds"]) for n, a in spans.items()])
+        family("haiterm_span_seconds_max", "gauge", "Slowest single span since start.",
+               [({"span": n}, a["max_seconds"]) for n, a in spans.items()])
+        family("haiterm_span_cache_total", "counter", "Cache results of cacheable spans.",
+               [({"span": n, "result": r}, a[key]) for n, a in spans.items()
+                for r, key in (("hit", "hits"), ("miss", "misses")) if a["hits"] or a["misses"]])
+        family("haiterm_span_errors_total", "counter", "Spans that raised.",
+               [({"span": n}, a["errors"]) for n, a in spans.items()])
+        family("haiterm_span_payload_bytes", "gauge", "Payload size of the last span.",
+               [({"span": n}, a["bytes"]) for n, a in spans.items() if a["bytes"]])
+
+        for prefix, (label, groups) in self.collected().items():
+            metrics = sorted({m for stats in groups.values() for m in stats})
+            for m in metrics:
+                samples = [({label: g}, stats[m]) for g, stats in groups.items()
+                           if isinstance(stats.get(m), (int, float))]
+                if samples:
+                    family(f"haiterm_{prefix}_{m}", "gauge", f"{prefix} {m}.", samples)
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Tulis span yang tertunda ke JSON lines + tulis ulang file Prometheus (atomik)."""
+        if not self.sinks:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        with self._io_lock:
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                if pending:
+                    if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > LOG_MAX_BYTES:
+                        os.replace(self.log_path, self.log_path + ".1")
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.writelines(json.dumps({**e, "role": self.role}, default=str) + "\n" for e in pending)
+
+                os.makedirs(os.path.dirname(self.prom_path), exist_ok=True)
+                tmp = f"{self.prom_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self.prometheus_text())
+                os.replace(tmp, self.prom_path)
+            except Exception as e:
+                print(f"Telemetry Flush Error: {e}")
+
+
+# Instance global: semua stage & call keluar dalam satu proses lapor ke sini
+telemetry = Telemetry()